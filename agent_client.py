@@ -0,0 +1,181 @@
+"""Shared HTTP client for the agent REST API.
+
+Used by the REST fallback in direct_agent_request and by batch runs. One
+process-wide session keeps pooled keep-alive connections, every call has a
+timeout, 429/5xx responses are retried with jittered exponential backoff,
+and a circuit breaker per agent id stops hammering an agent that keeps
+failing. Set AIXPLAIN_BASE_URL to point the client at a local mock server.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.aixplain.com"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when an agent's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets a single
+    trial call through once `reset_timeout` seconds have passed."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go through now."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class AgentClient:
+    """Synchronous client for the agent run endpoint."""
+
+    def __init__(self, base_url=None, api_key=None, connect_timeout=5.0, read_timeout=60.0,
+                 retries=3, backoff=0.5, max_backoff=10.0, pool_size=20,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.base_url = (base_url or os.environ.get("AIXPLAIN_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get("AIXPLAIN_API_KEY", "")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def breaker(self, agent_id):
+        """The circuit breaker for an agent id."""
+        with self.lock:
+            if agent_id not in self.breakers:
+                self.breakers[agent_id] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[agent_id]
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def post(self, path, payload, breaker_key=None):
+        """POST JSON to path with retries; returns the decoded JSON body."""
+        breaker = self.breaker(breaker_key or path)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {breaker_key or path}")
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    breaker.record_success()
+                    return response.json()
+                error = requests.HTTPError(f"{response.status_code} from {url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception:
+                # Client errors are not the upstream's fault; don't trip the breaker
+                breaker.record_success()
+                raise
+            if attempt < self.retries:
+                time.sleep(self._delay(attempt, response))
+        breaker.record_failure()
+        raise error
+
+    def run_agent(self, agent_id, prompt):
+        """Run an agent with a prompt."""
+        return self.post(f"agents/{agent_id}/run", {"prompt": prompt}, breaker_key=agent_id)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncAgentClient:
+    """Asyncio wrapper around AgentClient.
+
+    Requests run on a dedicated thread pool sized to the client's connection
+    pool, so `pool_size` bounds both the threads and the open connections.
+    """
+
+    def __init__(self, client=None, pool_size=20, **kwargs):
+        self.client = client or AgentClient(pool_size=pool_size, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    async def _submit(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def post(self, path, payload, breaker_key=None):
+        return await self._submit(self.client.post, path, payload, breaker_key)
+
+    async def run_agent(self, agent_id, prompt):
+        return await self._submit(self.client.run_agent, agent_id, prompt)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.client.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide AgentClient, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = AgentClient()
+        return _shared_client
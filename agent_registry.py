@@ -0,0 +1,168 @@
+"""Process-wide registry of agent handles.
+
+Handles are resolved lazily from their ids with AgentFactory.get and
+memoized, so a warm registry answers without any factory calls. An agent
+that has no id, or whose id the platform reports as not found, is created
+once from AGENT_SPECS, deployed (drafts expire), and its new id is saved
+to the registry file, so later processes reuse it instead of creating
+another one. Other fetch errors are raised rather than creating a
+duplicate on every network blip. Village-shard copies of an agent
+("<agent>@<shard>") are created from the spec of the agent they copy.
+"""
+import json
+import os
+import threading
+
+from metrics import span
+from sharding import base_agent_name, shard_of_name
+
+REGISTRY_FILE = ".agent_registry.json"
+DEFAULT_LLM_ID = "6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+
+# How to create each agent if it does not exist yet
+AGENT_SPECS = {
+    "teacher_recruitment": {
+        "name": "Teacher Recruitment Agent",
+        "description": "Identifies and recruits educated rural youth as teachers"
+    },
+    "training_mentorship": {
+        "name": "Training Mentorship Agent",
+        "description": "Provides educational resources and mentorship"
+    },
+    "incentive_management": {
+        "name": "Incentive Management Agent",
+        "description": "Manages non-monetary incentive distribution"
+    },
+    "community_engagement": {
+        "name": "Community Engagement Agent",
+        "description": "Facilitates communication between stakeholders"
+    },
+    "progress_monitoring": {
+        "name": "Progress Monitoring Agent",
+        "description": "Tracks student outcomes and program growth"
+    },
+    "team": {
+        "name": "Rural Education Team",
+        "description": "Coordinates education initiatives in rural communities"
+    }
+}
+
+
+def is_not_found(error):
+    """Whether a factory error says the agent does not exist (HTTP 404)."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status is not None:
+        return status == 404
+    message = str(error).lower()
+    return "404" in message or "not found" in message or "does not exist" in message
+
+
+class AgentRegistry:
+    """Lazily resolved, memoized agent handles keyed by agent name."""
+
+    def __init__(self, agent_ids, registry_path=REGISTRY_FILE, llm_id=DEFAULT_LLM_ID):
+        self.agent_ids = dict(agent_ids)
+        self.registry_path = registry_path
+        self.llm_id = llm_id
+        self.handles = {}
+        self.locks = {name: threading.Lock() for name in AGENT_SPECS}
+        self.locks_lock = threading.Lock()
+        self.file_lock = threading.Lock()
+        self.count_lock = threading.Lock()
+        self.factory_calls = 0
+        if registry_path and os.path.exists(registry_path):
+            with open(registry_path) as f:
+                self.agent_ids.update(json.load(f))
+
+    def get(self, agent_name):
+        """Return the handle for an agent, fetching or creating it on first use."""
+        handle = self.handles.get(agent_name)
+        if handle is not None:
+            return handle
+        if base_agent_name(agent_name) not in AGENT_SPECS:
+            raise KeyError(f"Unknown agent: {agent_name}")
+        with self.locks_lock:
+            lock = self.locks.setdefault(agent_name, threading.Lock())
+        with lock:
+            # Another thread may have resolved it while we waited
+            if agent_name not in self.handles:
+                self.handles[agent_name] = self._resolve(agent_name)
+        return self.handles[agent_name]
+
+    def _factory(self, agent_name):
+        from aixplain.factories import AgentFactory, TeamAgentFactory
+        return TeamAgentFactory if agent_name == "team" else AgentFactory
+
+    def _count_call(self):
+        with self.count_lock:
+            self.factory_calls += 1
+
+    def _resolve(self, agent_name):
+        factory = self._factory(agent_name)
+        agent_id = self.agent_ids.get(agent_name)
+        if agent_id:
+            try:
+                self._count_call()
+                with span("agent_api", op="get", agent=agent_name):
+                    agent = factory.get(agent_id)
+            except Exception as e:
+                if not is_not_found(e):
+                    raise
+                print(f"{agent_name} ({agent_id}) no longer exists; creating it")
+            else:
+                # Created by an earlier process whose deploy did not go through
+                status = getattr(agent, "status", None)
+                if str(getattr(status, "value", status)).lower() == "draft":
+                    self._deploy(agent_name, agent)
+                return agent
+
+        spec = AGENT_SPECS[base_agent_name(agent_name)]
+        shard = shard_of_name(agent_name)
+        extra = {}
+        if agent_name == "team":
+            extra["agents"] = [self.get(name) for name in AGENT_SPECS if name != "team"]
+        self._count_call()
+        with span("agent_api", op="create", agent=agent_name):
+            agent = factory.create(
+                name=f"{spec['name']} ({shard})" if shard else spec["name"],
+                description=spec["description"],
+                llm_id=self.llm_id,
+                **extra
+            )
+        self._save_id(agent_name, agent.id)
+        self._deploy(agent_name, agent)
+        return agent
+
+    def _deploy(self, agent_name, agent):
+        self._count_call()
+        with span("agent_api", op="deploy", agent=agent_name):
+            agent.deploy()
+
+    def _save_id(self, agent_name, agent_id):
+        self.agent_ids[agent_name] = agent_id
+        if not self.registry_path:
+            return
+        with self.file_lock:
+            saved = {}
+            if os.path.exists(self.registry_path):
+                with open(self.registry_path) as f:
+                    saved = json.load(f)
+            saved[agent_name] = agent_id
+            tmp_path = f"{self.registry_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(saved, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.registry_path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(agent_ids=None):
+    """Return the process-wide registry, creating it from agent_ids on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry(agent_ids or {})
+        return _registry
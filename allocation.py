@@ -0,0 +1,295 @@
+"""Bulk incentive allocation for the Incentive Management agent.
+
+Assigns at most one incentive per teacher across the whole program at once.
+Each teacher can receive their preferred_incentive or one of their
+available_resources; a preferred item is worth more than an available one,
+and every option is weighted by the teacher's teaching contribution
+(suitability_score from teacher_data). Items can have a limited stock,
+kept as incentive_stock.json ({item: count}) next to the data tables.
+
+The assignment is the linear program of a capacitated bipartite matching,
+which has integral optimal solutions, so it is solved exactly with
+scipy's HiGHS solver when scipy is installed and greedily (best value
+first) otherwise. An earlier allocation can be re-solved incrementally:
+only changed teachers, and holders of items whose stock no longer covers
+them, are re-assigned.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import apply_schema, split_multi_value
+
+PREFERENCE_WEIGHTS = {"preferred": 1.0, "available": 0.5}
+
+# Item stock kept next to the data tables
+STOCK_FILE = "incentive_stock.json"
+
+
+def incentive_options(incentives):
+    """One row per (teacher, item) a teacher may receive, with its preference."""
+    teacher_ids = incentives["teacher_id"].astype(str)
+    preferred = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "item": incentives["preferred_incentive"].astype("string"),
+        "preference": PREFERENCE_WEIGHTS["preferred"]
+    })
+    available = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "item": split_multi_value(incentives["available_resources"].astype("string"))
+    }).explode("item")
+    available["preference"] = PREFERENCE_WEIGHTS["available"]
+    options = pd.concat([preferred, available], ignore_index=True).dropna(subset=["item"])
+    options["item"] = options["item"].astype(str).str.strip()
+    options = options[options["item"] != ""]
+    # An item listed both ways keeps its preferred weight
+    options = options.sort_values("preference", ascending=False, kind="stable")
+    return options.drop_duplicates(["teacher_id", "item"]).reset_index(drop=True)
+
+
+def contribution_weights(incentives, teachers=None):
+    """Teaching contribution per teacher, from suitability_score (1.0 when unknown)."""
+    teacher_ids = incentives["teacher_id"].astype(str)
+    if teachers is None or "suitability_score" not in teachers.columns:
+        return pd.Series(1.0, index=teacher_ids)
+    scores = teachers.assign(teacher_id=teachers["teacher_id"].astype(str)).drop_duplicates(
+        "teacher_id", keep="last").set_index("teacher_id")["suitability_score"].astype("float64")
+    return scores.reindex(teacher_ids).fillna(1.0)
+
+
+def _solve_lp(teacher_codes, item_codes, values, n_teachers, capacity):
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix, vstack
+
+    n = len(values)
+    edges = np.arange(n)
+    per_teacher = coo_matrix((np.ones(n), (teacher_codes, edges)), shape=(n_teachers, n))
+    per_item = coo_matrix((np.ones(n), (item_codes, edges)), shape=(len(capacity), n))
+    result = linprog(-values, A_ub=vstack([per_teacher, per_item]).tocsr(),
+                     b_ub=np.r_[np.ones(n_teachers), capacity], bounds=(0, 1), method="highs")
+    if not result.success:
+        raise RuntimeError(f"Allocation LP failed: {result.message}")
+    return result.x > 0.5
+
+
+def _solve_greedy(teacher_codes, item_codes, values, n_teachers, capacity):
+    chosen = np.zeros(len(values), dtype=bool)
+    assigned = np.zeros(n_teachers, dtype=bool)
+    remaining = capacity.copy()
+    for edge in np.argsort(-values, kind="stable"):
+        teacher, item = teacher_codes[edge], item_codes[edge]
+        if assigned[teacher] or remaining[item] < 1:
+            continue
+        chosen[edge] = True
+        assigned[teacher] = True
+        remaining[item] -= 1
+    return chosen
+
+
+def solver_name():
+    """Exact LP when scipy is available, greedy otherwise."""
+    try:
+        import scipy.optimize  # noqa: F401
+        return "lp"
+    except ImportError:
+        return "greedy"
+
+
+def solve(options, weights, stock=None, solver=None):
+    """Assign at most one option per teacher within the item stock.
+
+    options has teacher_id, item and preference columns; weights maps
+    teacher_id to contribution. Items missing from stock are unlimited.
+    Returns the chosen rows of options with their value.
+    """
+    stock = stock or {}
+    solver = solver or solver_name()
+    options = options.assign(value=options["preference"] * weights.reindex(options["teacher_id"]).to_numpy())
+    if options.empty:
+        return options
+
+    # Each teacher can always fall back to their best unlimited item, so only
+    # limited items worth more than that fallback compete for stock and the
+    # solver works on the gain over it.
+    limited = options["item"].isin(list(stock)).to_numpy()
+    fallback = options[~limited].sort_values("value", ascending=False, kind="stable").drop_duplicates("teacher_id")
+    fallback_value = fallback.set_index("teacher_id")["value"].reindex(options["teacher_id"]).fillna(0).to_numpy()
+    worth_more = limited & (options["value"].to_numpy() > fallback_value)
+    contested = options[worth_more]
+    gain = contested["value"].to_numpy(dtype="float64") - fallback_value[worth_more]
+
+    chosen = contested.iloc[0:0]
+    if not contested.empty:
+        teacher_codes, teacher_ids = pd.factorize(contested["teacher_id"])
+        item_codes, items = pd.factorize(contested["item"])
+        capacity = np.array([max(stock[item], 0) for item in items], dtype="float64")
+        solve_with = _solve_lp if solver == "lp" else _solve_greedy
+        chosen = contested[solve_with(teacher_codes, item_codes, gain, len(teacher_ids), capacity)]
+    return pd.concat([chosen, fallback[~fallback["teacher_id"].isin(chosen["teacher_id"])]], ignore_index=True)
+
+
+def allocate(incentives, teachers=None, stock=None, previous=None, changed=None, solver=None):
+    """Allocate incentives for the whole program.
+
+    With previous (teacher_id -> item, e.g. from an earlier run) and changed
+    (teacher ids whose rows changed), only changed teachers and holders of
+    items whose remaining stock no longer covers them are re-solved.
+    Returns (allocation, summary): allocation maps every teacher_id to an
+    item or None.
+    """
+    stock = dict(stock or {})
+    options = incentive_options(incentives)
+    weights = contribution_weights(incentives, teachers)
+    teacher_ids = incentives["teacher_id"].astype(str)
+
+    fixed = pd.Series(dtype="object")
+    if previous is not None and changed is not None:
+        previous = previous.dropna()
+        previous.index = previous.index.astype(str)
+        keep = previous[~previous.index.isin([str(t) for t in changed]) & previous.index.isin(teacher_ids)]
+        valid = options.merge(keep.rename("item").rename_axis("teacher_id").reset_index(), on=["teacher_id", "item"])
+        fixed = valid.set_index("teacher_id")["item"]
+        used = fixed.value_counts()
+        # Items whose stock shrank below what is held are re-solved in full
+        over = [item for item, count in used.items() if item in stock and count > stock[item]]
+        fixed = fixed[~fixed.isin(over)]
+        for item, count in fixed.value_counts().items():
+            if item in stock:
+                stock[item] -= count
+
+    chosen = solve(options[~options["teacher_id"].isin(fixed.index)], weights, stock, solver)
+    allocation = pd.concat([fixed, chosen.set_index("teacher_id")["item"]]).reindex(teacher_ids)
+    allocation = allocation.astype("object").where(allocation.notna(), None)
+
+    preferred = incentives["preferred_incentive"].astype(str).to_numpy()
+    summary = {
+        "teachers": int(len(teacher_ids)),
+        "allocated": int(allocation.notna().sum()),
+        "preferred": int((allocation.to_numpy() == preferred).sum()),
+        "re_solved": int(len(teacher_ids) - len(fixed)),
+        "solver": solver or solver_name()
+    }
+    return allocation, summary
+
+
+def apply_allocation(incentives, allocation):
+    """Copy of incentives with allocated_incentive set from an allocation."""
+    updated = incentives.copy()
+    values = allocation.reindex(updated["teacher_id"].astype(str)).to_numpy()
+    updated["allocated_incentive"] = pd.array(values, dtype="string")
+    return apply_schema(updated, "incentives_data")
+
+
+def changed_teachers(old_incentives, new_incentives, old_teachers=None, new_teachers=None):
+    """Teacher ids whose incentive options or contribution differ between two versions."""
+    columns = ["teacher_id", "preferred_incentive", "available_resources"]
+
+    def rows(df, cols):
+        return df[cols].astype(str).set_index("teacher_id")
+
+    old, new = rows(old_incentives, columns), rows(new_incentives, columns)
+    old = old[~old.index.duplicated(keep="last")]
+    new = new[~new.index.duplicated(keep="last")]
+    old = old.reindex(new.index)
+    changed = set(new.index[(old != new).any(axis=1)])
+    if old_teachers is not None and new_teachers is not None:
+        old_scores = contribution_weights(new_incentives, old_teachers)
+        new_scores = contribution_weights(new_incentives, new_teachers)
+        changed |= set(new_scores.index[old_scores.to_numpy() != new_scores.to_numpy()])
+    return changed
+
+
+def load_stock(path):
+    """Item stock from a JSON file of {item: count}."""
+    with open(path) as f:
+        return {item: int(count) for item, count in json.load(f).items()}
+
+
+def data_stock(data_dir="SampleData"):
+    """Stock from data_dir/incentive_stock.json, or None (every item unlimited) without one."""
+    path = os.path.join(data_dir, STOCK_FILE)
+    return load_stock(path) if os.path.exists(path) else None
+
+
+def remaining_stock(allocation, stock):
+    """{item: count left} for the limited items."""
+    counts = allocation.value_counts()
+    return {item: count - int(counts.get(item, 0)) for item, count in (stock or {}).items()}
+
+
+def summarize_allocation(allocation, summary, teacher_id=None, stock=None):
+    """Render an allocation as a few lines of text for a prompt."""
+    lines = [f"Allocation: {json.dumps(summary)}"]
+    if teacher_id is not None and str(teacher_id) in allocation.index:
+        lines.append(f"Teacher {teacher_id} is allocated: {allocation[str(teacher_id)] or 'nothing (stock exhausted)'}")
+    counts = allocation.value_counts()
+    if stock:
+        lines.append(f"Remaining stock: {json.dumps(remaining_stock(allocation, stock))}")
+    lines.append(f"Most allocated items: {json.dumps(counts.head(5).to_dict())}")
+    return "\n".join(lines)
+
+
+TOOL_TEMPLATE = '''def incentive_allocation(teacher_id: str = "") -> str:
+    """Solved incentive allocation. Pass a teacher_id (e.g. T001) for that
+    teacher's allocated item; leave it empty for program-wide totals."""
+    import json
+    data = json.loads({payload!r})
+    if teacher_id:
+        if teacher_id not in data["allocation"]:
+            return f"No incentive record for teacher {{teacher_id}}"
+        item = data["allocation"][teacher_id]
+        return json.dumps({{"teacher_id": teacher_id,
+                           "allocated_incentive": item or "nothing (stock exhausted)"}})
+    return json.dumps(data["summary"])
+'''
+
+
+def tool_source(allocation, summary, stock=None):
+    """Source of a self-contained tool function embedding an allocation.
+
+    With a stock, the totals also carry the stock and what is left of it.
+    """
+    totals = dict(summary, items=allocation.value_counts().to_dict())
+    if stock:
+        totals.update(stock=stock, remaining_stock=remaining_stock(allocation, stock))
+    payload = {
+        "allocation": {teacher: item for teacher, item in allocation.items()},
+        "summary": totals
+    }
+    return TOOL_TEMPLATE.format(payload=json.dumps(payload))
+
+
+TOOL_DESCRIPTION = "Returns each teacher's allocated incentive from the program-wide allocation"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from data_loader import load_table
+
+    parser = argparse.ArgumentParser(description="Allocate incentives across all teachers")
+    parser.add_argument("--data-dir", default="SampleData")
+    parser.add_argument("--stock", help="JSON file of {item: count}; unlisted items are unlimited "
+                                        f"(default: {STOCK_FILE} in the data directory, if present)")
+    parser.add_argument("--solver", choices=["lp", "greedy"])
+    parser.add_argument("--changed", nargs="*",
+                        help="re-solve only these teacher ids, keeping the current allocated_incentive for the rest")
+    parser.add_argument("--write", action="store_true", help="write allocated_incentive back to incentives_data.csv")
+    args = parser.parse_args()
+
+    incentives_path = os.path.join(args.data_dir, "incentives_data.csv")
+    incentives = load_table(incentives_path, "incentives_data")
+    teachers = load_table(os.path.join(args.data_dir, "teacher_data.csv"), "teacher_data")
+    stock = load_stock(args.stock) if args.stock else data_stock(args.data_dir)
+    previous = None
+    if args.changed is not None:
+        previous = incentives.set_index(incentives["teacher_id"].astype(str))["allocated_incentive"].astype("object")
+
+    allocation, summary = allocate(incentives, teachers, stock, previous, args.changed, args.solver)
+    print(summarize_allocation(allocation, summary, stock=stock))
+    if args.write:
+        updated = apply_allocation(incentives, allocation)
+        updated.to_csv(incentives_path, index=False)
+        print(f"Wrote allocated_incentive for {summary['allocated']} teachers to {incentives_path}")
@@ -0,0 +1,217 @@
+"""Vectorized progress analytics for the Progress Monitoring agent.
+
+Computes per-village and per-teacher aggregates from the student, teacher
+and community tables with pandas/NumPy, so the agent is handed a few
+pre-computed figures instead of reading raw tables: attendance
+distribution, mean and percentile scores per subject, students per teacher
+and, once an earlier snapshot exists, period-over-period changes.
+
+The figures are exposed to the agent as a code tool (tool_source) and as a
+short text summary (summarize) added to progress queries.
+"""
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import columnar_format, read_columnar, write_columnar
+
+# Earlier village snapshots, kept under the data directory for period-over-period deltas
+HISTORY_DIR = ".history"
+
+SUBJECT_COLUMNS = ["math_score", "english_score", "science_score"]
+ATTENDANCE_BINS = [0, 50, 60, 70, 80, 90, 100.01]
+LOW_ATTENDANCE = 75
+
+
+def village_stats(students):
+    """Per-village attendance and subject score aggregates."""
+    subjects = [c for c in SUBJECT_COLUMNS if c in students.columns]
+    columns = ["attendance_percent"] + subjects
+    names = ["attendance"] + [c.replace("_score", "") for c in subjects]
+    grouped = students.groupby("village_id", observed=True)
+
+    means = grouped[columns].mean()
+    medians = grouped[columns].median()
+    stats = pd.DataFrame({"students": grouped.size()})
+    stats["attendance_mean"] = means["attendance_percent"]
+    stats["attendance_p25"] = grouped["attendance_percent"].quantile(0.25)
+    stats["attendance_median"] = medians["attendance_percent"]
+    for column, name in zip(subjects, names[1:]):
+        stats[f"{name}_mean"] = means[column]
+        stats[f"{name}_median"] = medians[column]
+    low = students["attendance_percent"] < LOW_ATTENDANCE
+    stats["low_attendance_share"] = low.groupby(students["village_id"], observed=True).mean()
+    return stats.astype({c: "float64" for c in stats.columns if c != "students"}).round(2)
+
+
+def attendance_distribution(students, bins=ATTENDANCE_BINS):
+    """Share of students in each attendance band."""
+    counts, edges = np.histogram(students["attendance_percent"].to_numpy(dtype="float64"), bins=bins)
+    total = counts.sum() or 1
+    return {
+        f"{int(lo)}-{int(min(hi, 100))}%": round(count / total, 4)
+        for lo, hi, count in zip(edges[:-1], edges[1:], counts)
+    }
+
+
+def subject_scores(students):
+    """Mean and percentile scores per subject across all students."""
+    subjects = [c for c in SUBJECT_COLUMNS if c in students.columns]
+    values = students[subjects].to_numpy(dtype="float32")
+    if np.isnan(values).any():
+        percentiles = np.nanpercentile(values, [10, 50, 90], axis=0)
+    else:
+        percentiles = np.percentile(values, [10, 50, 90], axis=0)
+    means = np.nanmean(values, axis=0, dtype="float64")
+    return {
+        subject.replace("_score", ""): {
+            "mean": round(float(means[i]), 2),
+            "p10": round(float(percentiles[0, i]), 2),
+            "p50": round(float(percentiles[1, i]), 2),
+            "p90": round(float(percentiles[2, i]), 2)
+        }
+        for i, subject in enumerate(subjects)
+    }
+
+
+def teacher_load(teachers, students, community=None):
+    """Teachers and students per teacher for each village.
+
+    Student counts come from student_data, falling back to the
+    community's students_count where no student rows exist.
+    """
+    teachers_per_village = teachers.groupby("village_id", observed=True).size().rename("teachers")
+    students_per_village = students.groupby("village_id", observed=True).size().rename("students")
+    load = pd.concat([teachers_per_village, students_per_village], axis=1)
+    if community is not None and "students_count" in community.columns:
+        reported = community.set_index("village_id")["students_count"]
+        load = load.reindex(load.index.union(reported.index))
+        load["students"] = load["students"].fillna(reported.reindex(load.index).astype("float64"))
+    load = load.fillna(0)
+    load["students_per_teacher"] = (load["students"] / load["teachers"].replace(0, np.nan)).round(1)
+    load.index = load.index.astype(str)
+    return load
+
+
+def period_deltas(current, previous):
+    """Change in village aggregates since an earlier snapshot."""
+    columns = [c for c in current.columns if c in previous.columns and c != "students"]
+    previous = previous.reindex(current.index)
+    return (current[columns] - previous[columns]).dropna(how="all").round(2)
+
+
+def _history_files(history_dir):
+    return sorted(glob.glob(os.path.join(history_dir, f"village_stats-*.{columnar_format()}")))
+
+
+def data_history_dir(data_dir="SampleData"):
+    """Directory of the village snapshots for the data in data_dir."""
+    return os.path.join(data_dir, HISTORY_DIR)
+
+
+def progress_report(data_frames, history_dir=None):
+    """Compute the progress report for the current data.
+
+    With history_dir, the previous village snapshot found there is used for
+    period-over-period deltas and the current one is saved for next time.
+    """
+    students = data_frames["student_data"]
+    villages = village_stats(students)
+    villages.index = villages.index.astype(str)
+
+    report = {
+        "generated": time.strftime("%Y-%m-%d"),
+        "students": int(len(students)),
+        "villages": villages,
+        "attendance_distribution": attendance_distribution(students),
+        "subject_scores": subject_scores(students),
+        "deltas": None
+    }
+    if "teacher_data" in data_frames:
+        report["teacher_load"] = teacher_load(
+            data_frames["teacher_data"], students, data_frames.get("community_data")
+        )
+
+    if history_dir:
+        files = _history_files(history_dir)
+        fmt = columnar_format()
+        today = os.path.join(history_dir, f"village_stats-{report['generated']}.{fmt}")
+        previous = [f for f in files if f != today]
+        if previous:
+            report["deltas"] = period_deltas(villages, read_columnar(previous[-1], fmt).set_index("village_id"))
+        os.makedirs(history_dir, exist_ok=True)
+        write_columnar(villages.rename_axis("village_id").reset_index(), today, fmt)
+    return report
+
+
+def summarize(report, village_id=None, top_n=5):
+    """Render the report as a few lines of text for a prompt."""
+    lines = [
+        f"Students: {report['students']}, villages: {len(report['villages'])}",
+        f"Attendance distribution: {json.dumps(report['attendance_distribution'])}",
+        f"Subject scores: {json.dumps(report['subject_scores'])}"
+    ]
+    villages = report["villages"]
+    if village_id is not None and str(village_id) in villages.index:
+        row = villages.loc[str(village_id)]
+        lines.append(f"Village {village_id}: {json.dumps(row.to_dict())}")
+        if "teacher_load" in report and str(village_id) in report["teacher_load"].index:
+            lines.append(f"Village {village_id} staffing: {json.dumps(report['teacher_load'].loc[str(village_id)].to_dict())}")
+    else:
+        ranked = villages.sort_values("attendance_mean")
+        lines.append(f"Lowest attendance villages: {ranked['attendance_mean'].head(top_n).to_dict()}")
+        lines.append(f"Highest attendance villages: {ranked['attendance_mean'].tail(top_n)[::-1].to_dict()}")
+    deltas = report.get("deltas")
+    if deltas is not None and not deltas.empty and "attendance_mean" in deltas.columns:
+        change = deltas["attendance_mean"].dropna().sort_values(ascending=False)
+        lines.append(f"Most improved attendance since last period: {change.head(top_n).to_dict()}")
+        lines.append(f"Largest attendance drops since last period: {change.tail(top_n)[::-1].to_dict()}")
+    return "\n".join(lines)
+
+
+TOOL_TEMPLATE = '''def progress_analytics(village_id: str = "") -> str:
+    """Pre-computed student progress figures. Pass a village_id (e.g. V001)
+    for that village's attendance, subject scores, staffing and recent
+    change; leave it empty for program-wide figures."""
+    import json
+    data = json.loads({payload!r})
+    if village_id:
+        village = data["villages"].get(village_id)
+        if village is None:
+            return f"No data for village {{village_id}}"
+        return json.dumps({{
+            "village": village,
+            "staffing": data["teacher_load"].get(village_id),
+            "change": data["deltas"].get(village_id)
+        }})
+    return json.dumps(data["overall"])
+'''
+
+
+def tool_source(report, top_n=5):
+    """Source of a self-contained tool function embedding the report's figures."""
+    def records(frame):
+        return {} if frame is None else json.loads(frame.to_json(orient="index"))
+
+    villages = report["villages"]
+    payload = {
+        "villages": records(villages),
+        "teacher_load": records(report.get("teacher_load")),
+        "deltas": records(report.get("deltas")),
+        "overall": {
+            "students": report["students"],
+            "villages": len(villages),
+            "attendance_distribution": report["attendance_distribution"],
+            "subject_scores": report["subject_scores"],
+            "lowest_attendance": villages["attendance_mean"].nsmallest(top_n).to_dict(),
+            "highest_attendance": villages["attendance_mean"].nlargest(top_n).to_dict()
+        }
+    }
+    return TOOL_TEMPLATE.format(payload=json.dumps(payload))
+
+
+TOOL_DESCRIPTION = "Returns pre-computed attendance, score, staffing and trend figures per village"
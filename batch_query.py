@@ -0,0 +1,217 @@
+"""Run a JSONL file of coordinator queries through the agents concurrently.
+
+Each input line is a record like
+    {"query": "...", "action_type": "progress", "village_id": "V001", "teacher_id": null}
+Records are dispatched through an asyncio pipeline with a bounded number of
+requests in flight and a token-bucket rate limit. Results are written as
+JSONL in completion order, one line per record, as soon as each finishes.
+
+The handler is any callable with the signature of direct_agent_request
+(sync or async). From the command line the REST endpoint is used, and
+--base-url can point it at a local stub.
+"""
+import asyncio
+import inspect
+import json
+import sys
+import time
+
+from coordinator import ACTION_AGENTS, AGENT_IDS
+
+# Deployed agent per action type
+ACTION_AGENT_IDS = {action: AGENT_IDS[agent_name] for action, agent_name in ACTION_AGENTS.items()}
+
+# Record fields passed on to the handlers that accept them
+OPTIONAL_FIELDS = ("session_id", "language", "audio")
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second on average
+    with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def read_records(path):
+    """Yield the records of a JSONL file, skipping blank lines.
+
+    A line that is not a JSON object is yielded as {"line": n, "invalid":
+    reason}, so one bad line fails its own record instead of the batch.
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"line": number, "invalid": f"invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"line": number, "invalid": f"expected a JSON object, got {type(record).__name__}"}
+                continue
+            yield record
+
+
+def build_prompt(query, village_id=None, teacher_id=None):
+    """Build the prompt the same way direct_agent_request does."""
+    prompt = query
+    if village_id:
+        prompt += f" (for village {village_id})"
+    if teacher_id:
+        prompt += f" (regarding teacher {teacher_id})"
+    return prompt
+
+
+def rest_handler(base_url=None, agent_ids=None, pool_size=20, client=None):
+    """Return an async request function that calls the agent run endpoint.
+
+    The handler's close() releases the pooled connections of the client it
+    created; a client passed in stays the caller's to close.
+    """
+    from agent_client import AsyncAgentClient
+
+    owned = client is None
+    client = client or AsyncAgentClient(base_url=base_url, pool_size=pool_size)
+    agent_ids = agent_ids or ACTION_AGENT_IDS
+
+    async def request(query, action_type, village_id=None, teacher_id=None):
+        agent_id = agent_ids.get(action_type)
+        if not agent_id:
+            return {"error": f"Unknown action type: {action_type}"}
+        return await client.run_agent(agent_id, build_prompt(query, village_id, teacher_id))
+
+    request.close = client.close if owned else lambda: None
+    return request
+
+
+def accepts(handler, name):
+    """Whether a handler takes a keyword argument (or any, via **kwargs)."""
+    try:
+        parameters = inspect.signature(handler).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in parameters or any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+
+async def call_handler(handler, record):
+    """Call a sync or async handler with a record's fields."""
+    kwargs = {
+        "query": record["query"],
+        "action_type": record["action_type"],
+        "village_id": record.get("village_id"),
+        "teacher_id": record.get("teacher_id")
+    }
+    # Only handlers that keep conversations take a session id, and only the
+    # coordinator's translates and reads out answers; others (rest_handler)
+    # are called without them
+    for name in OPTIONAL_FIELDS:
+        if record.get(name) and accepts(handler, name):
+            kwargs[name] = record[name]
+    if asyncio.iscoroutinefunction(handler):
+        return await handler(**kwargs)
+    return await asyncio.to_thread(handler, **kwargs)
+
+
+async def run_batch(records, handler, out, concurrency=8, rate=None, burst=None):
+    """Dispatch records through handler and write results to out as they finish.
+
+    At most `concurrency` requests are in flight, and if `rate` is set no
+    more than `rate` requests per second are started. Returns a summary of
+    the run.
+    """
+    bucket = TokenBucket(rate, burst) if rate else None
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    summary = {"total": 0, "ok": 0, "failed": 0}
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, record = item
+            if bucket:
+                await bucket.acquire()
+            started = time.perf_counter()
+            result = {"index": index, **record}
+            try:
+                if "invalid" in record:
+                    raise ValueError(f"line {record['line']}: {record['invalid']}")
+                result["response"] = await call_handler(handler, record)
+                if isinstance(result["response"], dict) and "error" in result["response"]:
+                    result["error"] = result["response"]["error"]
+                    summary["failed"] += 1
+                else:
+                    summary["ok"] += 1
+            except Exception as e:
+                result["error"] = str(e)
+                summary["failed"] += 1
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            out.write(json.dumps(result, default=str) + "\n")
+            out.flush()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    started = time.perf_counter()
+    try:
+        for index, record in enumerate(records):
+            summary["total"] += 1
+            await queue.put((index, record))
+    finally:
+        # Even if reading the input fails, finish and write what was already queued
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a JSONL batch of coordinator queries")
+    parser.add_argument("input", help="JSONL file of {query, action_type, village_id, teacher_id}")
+    parser.add_argument("-o", "--output", help="output JSONL file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum requests in flight")
+    parser.add_argument("--rate", type=float, help="maximum requests started per second")
+    parser.add_argument("--burst", type=int, help="token bucket capacity (default: rate)")
+    parser.add_argument("--base-url", help="agent API base URL, e.g. a local stub "
+                                            "(default: $AIXPLAIN_BASE_URL or the public API)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    handler = rest_handler(args.base_url, pool_size=args.concurrency)
+    try:
+        summary = asyncio.run(run_batch(
+            read_records(args.input),
+            handler,
+            out,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            burst=args.burst
+        ))
+    finally:
+        handler.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"Completed {summary['total']} requests ({summary['ok']} ok, {summary['failed']} failed) "
+          f"in {summary['seconds']}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""End-to-end latency/throughput benchmarks against the local mock server.
+
+Drives the project's own entry points (batch queries, retrain_agents.main
+and the fleet reconciler) against mock_server and reports p50/p95/p99
+latency, requests/second at several concurrency levels and prompt bytes
+per call. Results are saved as JSON under benchmarks/results/ so runs can
+be compared.
+
+    python benchmarks/agent_benchmarks.py --latency-ms 200 --requests 400
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_server import install_mock_sdk, start_mock_server  # noqa: E402
+
+SAMPLE_QUERIES = [
+    ("recruitment", "Find qualified female teachers for mathematics education"),
+    ("training", "Suggest interactive mathematics teaching methods for a classroom with no electricity"),
+    ("incentives", "Which incentives are available for teachers who completed 3 months of teaching?"),
+    ("community", "How can we increase parental support for girls' education?"),
+    ("progress", "Which students need support with attendance and science scores?")
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(latencies_ms):
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99)
+    }
+
+
+def make_records(n, village_ids):
+    for i in range(n):
+        action_type, query = SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]
+        yield {"query": query, "action_type": action_type, "village_id": village_ids[i % len(village_ids)]}
+
+
+def retrieval_handler(base_url, data_index, pool_size):
+    """Query handler that sends retrieval context the way direct_agent_request does."""
+    from agent_client import AsyncAgentClient
+    from batch_query import ACTION_AGENT_IDS, build_prompt
+    from retrieval import ACTION_TABLES
+
+    client = AsyncAgentClient(base_url=base_url, pool_size=pool_size)
+
+    async def request(query, action_type, village_id=None, teacher_id=None):
+        prompt = build_prompt(query, village_id, teacher_id)
+        context = data_index.build_context(query, ACTION_TABLES[action_type], village_id=village_id)
+        if context:
+            prompt += f"\n\nRelevant data:\n{context}"
+        return await client.run_agent(ACTION_AGENT_IDS[action_type], prompt)
+
+    request.close = client.close
+    return request
+
+
+def bench_queries(server, n_requests, concurrency_levels, data_frames):
+    """Batch query throughput and latency at each concurrency level."""
+    from batch_query import rest_handler, run_batch
+    from retrieval import DataIndex
+
+    village_ids = sorted(data_frames["community_data"]["village_id"].astype(str).unique())
+    data_index = DataIndex(data_frames)
+    results = []
+    for variant in ["plain", "retrieval"]:
+        for concurrency in concurrency_levels:
+            if variant == "plain":
+                handler = rest_handler(server.url, pool_size=concurrency)
+            else:
+                handler = retrieval_handler(server.url, data_index, concurrency)
+            server.backend.reset_stats()
+            out = io.StringIO()
+            try:
+                summary = asyncio.run(run_batch(make_records(n_requests, village_ids), handler, out,
+                                                concurrency=concurrency))
+            finally:
+                handler.close()
+            rows = [json.loads(line) for line in out.getvalue().splitlines()]
+            stats = server.backend.stats
+            calls = stats["calls"].get("run", 0)
+            results.append(dict(
+                latency_summary([row["latency_ms"] for row in rows if "error" not in row]),
+                variant=variant,
+                concurrency=concurrency,
+                failed=summary["failed"],
+                seconds=summary["seconds"],
+                requests_per_second=round(summary["total"] / summary["seconds"], 2),
+                prompt_bytes_per_call=round(stats["prompt_bytes"] / calls, 1) if calls else None,
+                prompt_tokens_per_call=round(stats["prompt_tokens"] / calls, 1) if calls else None
+            ))
+    return results
+
+
+def bench_retrain(server, state_dir):
+    """Full and incremental retrain runs through retrain_agents.main()."""
+    import retrain_agents
+
+    results = []
+    state_path = os.path.join(state_dir, "retrain_state.json")
+    for label, force in [("full", True), ("incremental_no_changes", False)]:
+        server.backend.reset_stats()
+        started = time.perf_counter()
+        summary = retrain_agents.main(force=force, state_path=state_path)
+        stats = server.backend.stats
+        results.append({
+            "run": label,
+            "seconds": round(time.perf_counter() - started, 3),
+            "pushed": len(summary["pushed"]),
+            "remote_calls": sum(stats["calls"].values()),
+            "description_bytes_per_update": (
+                round(stats["description_bytes"] / stats["calls"]["update"], 1)
+                if stats["calls"].get("update") else None
+            )
+        })
+    return results
+
+
+def bench_reconcile(server, state_dir, worker_levels):
+    """Fleet creation and a no-change rerun through the reconciler."""
+    import reconciler
+
+    results = []
+    for workers in worker_levels:
+        state_path = os.path.join(state_dir, f"fleet_{workers}.json")
+        for label in ["initial", "no_changes"]:
+            server.backend.reset_stats()
+            started = time.perf_counter()
+            report = reconciler.reconcile(state_path=state_path, max_workers=workers, retries=0)
+            results.append({
+                "run": label,
+                "workers": workers,
+                "seconds": round(time.perf_counter() - started, 3),
+                "remote_calls": report["remote_calls"],
+                "failed": len(report["failed"])
+            })
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the agent paths against the mock server")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=200, help="queries per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--output", help="results file (default: benchmarks/results/agents-<time>.json)")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    server = start_mock_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                               error_rate=args.error_rate, seed=0)
+    os.environ["AIXPLAIN_BASE_URL"] = server.url
+    install_mock_sdk(server.url)
+
+    from retrain_agents import load_data
+
+    data_frames = load_data()
+    with tempfile.TemporaryDirectory() as state_dir:
+        results = {
+            "config": vars(args),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "queries": bench_queries(server, args.requests, args.concurrency, data_frames),
+            "retrain": bench_retrain(server, state_dir),
+            "reconcile": bench_reconcile(server, state_dir, args.workers)
+        }
+    server.shutdown()
+
+    print(f"\n{'variant':10} {'conc':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'prompt B':>9}")
+    for row in results["queries"]:
+        print(f"{row['variant']:10} {row['concurrency']:>5} {row['requests_per_second']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['prompt_bytes_per_call']:>9}")
+    for row in results["retrain"] + results["reconcile"]:
+        print(row)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results",
+                                         f"agents-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
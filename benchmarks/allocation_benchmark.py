@@ -0,0 +1,89 @@
+"""Solve-time benchmark for the incentive allocation engine.
+
+Generates --teachers incentive rows over a catalogue of items, limits the
+stock of some items, and times a full solve with each solver and an
+incremental re-solve after --changed rows change.
+
+    python benchmarks/allocation_benchmark.py --teachers 50000
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from allocation import allocate, changed_teachers, solver_name  # noqa: E402
+
+
+def make_data(teachers, items=300, seed=0):
+    rng = np.random.default_rng(seed)
+    catalogue = np.array([f"Item {i:03d}" for i in range(items)])
+    # A few popular items are preferred by most teachers
+    popularity = 1 / np.arange(1, items + 1)
+    popularity /= popularity.sum()
+    teacher_ids = [f"T{i:06d}" for i in range(teachers)]
+    available = rng.choice(catalogue, (teachers, 3))
+    incentives = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "preferred_incentive": rng.choice(catalogue, teachers, p=popularity),
+        "available_resources": [", ".join(row) for row in available],
+        "allocated_incentive": None
+    })
+    teacher_data = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "suitability_score": rng.uniform(0.5, 1.0, teachers)
+    })
+    # Popular items are scarce: stock covers about a third of the demand
+    demand = incentives["preferred_incentive"].value_counts()
+    stock = {item: int(count // 3) for item, count in demand.head(items // 5).items()}
+    return incentives, teacher_data, stock
+
+
+def measure(label, run):
+    started = time.perf_counter()
+    allocation, summary = run()
+    return dict(summary, method=label, seconds=round(time.perf_counter() - started, 3)), allocation
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark incentive allocation")
+    parser.add_argument("--teachers", type=int, default=50_000)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--changed", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    incentives, teachers, stock = make_data(args.teachers, args.items)
+    results = []
+    solvers = ["greedy"] + (["lp"] if solver_name() == "lp" else [])
+    for solver in solvers:
+        row, allocation = measure(f"full solve ({solver})", lambda: allocate(incentives, teachers, stock, solver=solver))
+        results.append(row)
+
+    rng = np.random.default_rng(1)
+    updated = incentives.copy()
+    rows = rng.choice(len(updated), args.changed, replace=False)
+    updated.loc[rows, "preferred_incentive"] = rng.choice(updated["preferred_incentive"].unique(), args.changed)
+    changed = changed_teachers(incentives, updated)
+    row, _ = measure(f"incremental, {len(changed)} changed ({solvers[-1]})",
+                     lambda: allocate(updated, teachers, stock, allocation, changed, solvers[-1]))
+    results.append(row)
+
+    print(f"{args.teachers:,} teachers, {args.items} items, {len(stock)} with limited stock")
+    for row in results:
+        print(f"  {row['method']:36} {row['seconds']:>7.3f}s  allocated {row['allocated']:,}, "
+              f"preferred {row['preferred']:,}, re-solved {row['re_solved']:,}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"teachers": args.teachers, "items": args.items, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Size and render-time benchmark for agent context rendering.
+
+Renders a --rows teacher table with DataFrame.to_string() and with each
+compact format, then renders the five agent descriptions twice with one
+ContextRenderer to show the memoized re-use of shared tables.
+
+    python benchmarks/context_benchmark.py --rows 2000
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rendering import FORMATS, RENDERERS, ContextRenderer, estimate_tokens  # noqa: E402
+
+AGENT_TABLES = {
+    "teacher_recruitment": ["teacher_data"],
+    "incentive_management": ["teacher_data"],
+    "progress_monitoring": ["teacher_data"]
+}
+
+
+def make_teachers(rows, villages=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "teacher_id": [f"T{i:06d}" for i in range(rows)],
+        "name": rng.choice(["Priya Sharma", "Anjali Singh", "Rahul Kumar", "Sunita Devi"], rows),
+        "age": rng.integers(19, 40, rows),
+        "education_level": pd.Categorical(rng.choice(["High School", "Bachelor's", "Master's"], rows)),
+        "subjects": rng.choice(["Math, Science", "English, Hindi", "Social Studies"], rows),
+        "village_id": pd.Categorical([f"V{v:03d}" for v in rng.integers(0, villages, rows)]),
+        "village_needs": rng.choice(["Primary Education", "Digital Literacy", "Women's Education"], rows),
+        "suitability_score": rng.uniform(0.5, 1.0, rows).round(2).astype("float32")
+    })
+
+
+def measure(label, render):
+    started = time.perf_counter()
+    text = render()
+    return {
+        "method": label,
+        "seconds": round(time.perf_counter() - started, 4),
+        "chars": len(text),
+        "tokens": estimate_tokens(text),
+        "spaces": round(text.count(" ") / max(len(text), 1), 3)
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark agent context rendering")
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--budget", type=int, default=8_000, help="token budget per agent for the shared-table run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    teachers = make_teachers(args.rows)
+    results = [measure("to_string()", teachers.to_string)]
+    results += [measure(fmt, lambda fmt=fmt: RENDERERS[fmt](teachers)) for fmt in FORMATS]
+
+    renderer = ContextRenderer()
+    data_frames = {"teacher_data": teachers}
+    started = time.perf_counter()
+    for _ in range(2):
+        for agent, tables in AGENT_TABLES.items():
+            renderer.render_tables(data_frames, tables, args.budget, agent=agent)
+    shared = {"seconds": round(time.perf_counter() - started, 4), "serialized": renderer.misses,
+              "reused": renderer.hits}
+
+    print(f"{args.rows:,} teacher rows")
+    for row in results:
+        print(f"  {row['method']:12} {row['chars']:>10,} chars  ~{row['tokens']:>9,} tokens  "
+              f"{row['spaces']:.0%} spaces  {row['seconds']:.4f}s")
+    print(f"  {len(AGENT_TABLES)} agents x 2 runs at {args.budget:,} tokens: {shared['seconds']:.4f}s, "
+          f"{shared['serialized']} renders serialized, {shared['reused']} reused")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "results": results, "shared": shared}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Offline soak test for the retrain daemon.
+
+Writes a synthetic district to a temporary directory, starts a
+RetrainDaemon over it against the in-process mock server, and then keeps
+editing random tables for --duration seconds: each round rewrites one to
+three tables in a burst of partial writes, with random pauses between
+rounds. Reports how many edits became pushes, push latency percentiles
+and the queue depth seen over the run, and fails if the daemon is still
+behind (pending tables or a running push) after the final --settle
+seconds.
+
+    python benchmarks/daemon_soak.py --villages 100 --duration 120 --debounce 1
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def touch_table(data_frames, data_dir, table, rng, chunks=4):
+    """Rewrite a table with a few changed rows, in several partial writes."""
+    df = data_frames[table]
+    column = df.columns[-1]
+    rows = df.sample(n=max(1, len(df) // 100), random_state=rng.randrange(2 ** 31)).index
+    df.loc[rows, column] = df[column].sample(n=len(rows), random_state=rng.randrange(2 ** 31)).to_numpy()
+    text = df.to_csv(index=False)
+    step = -(-len(text) // chunks)
+    with open(os.path.join(data_dir, f"{table}.csv"), "w") as f:
+        for start in range(0, len(text), step):
+            f.write(text[start:start + step])
+            f.flush()
+            time.sleep(0.01)
+
+
+def main():
+    import argparse
+
+    from mock_server import install_mock_sdk, start_mock_server
+    from retrain_daemon import DATA_TABLES, RetrainDaemon, make_watcher
+    from synthetic_data import generate, write
+
+    parser = argparse.ArgumentParser(description="Soak-test the retrain daemon against the mock server")
+    parser.add_argument("--villages", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of edits")
+    parser.add_argument("--debounce", type=float, default=1.0)
+    parser.add_argument("--max-pause", type=float, default=3.0, help="longest pause between edit rounds")
+    parser.add_argument("--settle", type=float, default=30.0, help="seconds allowed to catch up after the last edit")
+    parser.add_argument("--poll", action="store_true")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = start_mock_server(latency_ms=args.mock_latency_ms)
+    install_mock_sdk(server.url)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, "data")
+        data_frames = generate(args.villages, seed=args.seed)
+        write(data_frames, data_dir)
+        daemon = RetrainDaemon(data_dir, args.debounce, make_watcher(data_dir, args.poll, 0.5), retry_delay=2.0,
+                               status_path=os.path.join(work_dir, "status.json"),
+                               state_path=os.path.join(work_dir, "retrain_state.json"))
+        daemon.start()
+
+        edits, rounds, depths, latencies = 0, 0, [], []
+        last_pushes = daemon.status()["pushes"]
+        deadline = time.monotonic() + args.duration
+        while time.monotonic() < deadline:
+            for table in rng.sample(DATA_TABLES, rng.randint(1, 3)):
+                touch_table(data_frames, data_dir, table, rng)
+                edits += 1
+            rounds += 1
+            time.sleep(rng.uniform(0, args.max_pause))
+            status = daemon.status()
+            depths.append(status["queue_depth"])
+            if status["pushes"] > last_pushes:
+                latencies.append(status["last_push_seconds"])
+                last_pushes = status["pushes"]
+
+        settle_deadline = time.monotonic() + args.settle
+        while time.monotonic() < settle_deadline:
+            status = daemon.status()
+            if not status["queue_depth"] and not status["pushing"] and not status["retry_scheduled"]:
+                break
+            time.sleep(0.2)
+        daemon.stop()
+        status = daemon.status()
+
+    server.shutdown()
+    latencies = sorted(latencies) or [0.0]
+    summary = {
+        "edits": edits,
+        "edit_rounds": rounds,
+        "pushes": status["pushes"],
+        "failed_pushes": status["failed_pushes"],
+        "coalesced_events": status["coalesced"],
+        "push_seconds_p50": round(statistics.median(latencies), 3),
+        "push_seconds_max": round(latencies[-1], 3),
+        "queue_depth_max": max(depths, default=0),
+        "caught_up": not status["queue_depth"] and not status["pushing"],
+    }
+    print(json.dumps(summary, indent=2))
+    if not summary["caught_up"]:
+        print(f"Daemon still behind {args.settle}s after the last edit: {status['pending']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
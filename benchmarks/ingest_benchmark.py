@@ -0,0 +1,75 @@
+"""Load-time and memory benchmark for data_loader at large row counts.
+
+Generates a student_data.csv with --rows rows and compares plain
+pd.read_csv, the typed chunked reader and a warm columnar-cache load.
+
+    python benchmarks/ingest_benchmark.py --rows 1000000
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import load_table, read_table  # noqa: E402
+
+
+def write_students(path, rows, villages=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "student_id": [f"S{i:07d}" for i in range(rows)],
+        "name": rng.choice(["Amit Sharma", "Neha Gupta", "Preeti Singh", "Ravi Kumar"], rows),
+        "village_id": [f"V{v:05d}" for v in rng.integers(0, villages, rows)],
+        "attendance_percent": rng.integers(40, 100, rows),
+        "math_score": rng.integers(20, 100, rows),
+        "english_score": rng.integers(20, 100, rows),
+        "science_score": rng.integers(20, 100, rows)
+    }).to_csv(path, index=False)
+
+
+def measure(label, load):
+    started = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - started
+    return {
+        "method": label,
+        "seconds": round(seconds, 3),
+        "memory_mb": round(df.memory_usage(deep=True).sum() / 2 ** 20, 1)
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark typed CSV ingestion")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "student_data.csv")
+        write_students(path, args.rows)
+        results = [
+            measure("pd.read_csv (inferred dtypes)", lambda: pd.read_csv(path)),
+            measure("typed, chunked", lambda: read_table(path, "student_data", args.chunksize)),
+            measure("cold load_table (parse + write cache)", lambda: load_table(path, "student_data")),
+            measure("warm load_table (columnar cache)", lambda: load_table(path, "student_data"))
+        ]
+
+    print(f"student_data, {args.rows:,} rows")
+    for row in results:
+        print(f"  {row['method']:40} {row['seconds']:>7.3f}s {row['memory_mb']:>8.1f} MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
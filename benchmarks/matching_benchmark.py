@@ -0,0 +1,117 @@
+"""Throughput benchmark for the candidate–village matching engine.
+
+Generates --candidates teachers spread over --villages villages and times
+match_candidates with and without hard filters, against a per-village
+Python loop over the same scores (timed on a few villages and
+extrapolated).
+
+    python benchmarks/matching_benchmark.py --candidates 100000 --villages 5000
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from matching import EDUCATION_LEVELS, match_candidates, stems  # noqa: E402
+
+SUBJECTS = ["Math", "Science", "English", "Mathematics", "Biology", "Physics", "Computer Science",
+            "Regional Language", "Social Studies", "Agricultural Science", "Environmental Science"]
+NEEDS = ["Primary Education", "Digital Literacy", "Women's Education", "Science Education",
+         "Mathematics Education", "Language Skills", "Agricultural Training", "Health Awareness"]
+
+
+def make_data(candidates, villages, seed=0):
+    rng = np.random.default_rng(seed)
+    village_ids = np.array([f"V{v:05d}" for v in range(villages)])
+    subjects = np.array([", ".join(pair) for pair in zip(rng.choice(SUBJECTS, 500), rng.choice(SUBJECTS, 500))])
+    teachers = pd.DataFrame({
+        "teacher_id": [f"T{i:07d}" for i in range(candidates)],
+        "education_level": rng.choice(list(EDUCATION_LEVELS), candidates),
+        "subjects": rng.choice(subjects, candidates),
+        "village_id": rng.choice(village_ids, candidates),
+        "village_needs": rng.choice(NEEDS, candidates),
+        "suitability_score": rng.uniform(0.5, 1.0, candidates).astype("float32")
+    })
+    community = pd.DataFrame({
+        "village_id": village_ids,
+        "students_count": rng.integers(50, 500, villages)
+    })
+    return teachers, community
+
+
+def loop_baseline(teachers, community, sample, top_k=5):
+    """Score candidates one village at a time in Python, as a reference."""
+    candidate_stems = [stems(s) for s in teachers["subjects"]]
+    education = teachers["education_level"].map(EDUCATION_LEVELS).to_numpy() / 5
+    suitability = teachers["suitability_score"].to_numpy()
+    homes = teachers["village_id"].to_numpy()
+    needs = teachers.groupby("village_id")["village_needs"].agg(" ".join)
+    started = time.perf_counter()
+    for village in community["village_id"].head(sample):
+        village_stems = stems(needs.get(village, ""))
+        scores = [
+            0.3 * suitability[i] + 0.1 * education[i]
+            + 0.15 * len(candidate_stems[i] & village_stems) / max(len(village_stems), 1)
+            + 0.15 * (homes[i] == village)
+            for i in range(len(teachers))
+        ]
+        sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:top_k]
+    return (time.perf_counter() - started) / sample * len(community)
+
+
+def measure(label, run):
+    started = time.perf_counter()
+    matches, notes = run()
+    return {
+        "method": label,
+        "seconds": round(time.perf_counter() - started, 3),
+        "candidates": notes["candidates"],
+        "matches": len(matches)
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark candidate-village matching")
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--villages", type=int, default=5_000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--baseline-villages", type=int, default=3,
+                        help="villages to time the Python loop on before extrapolating (0 to skip)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    teachers, community = make_data(args.candidates, args.villages)
+    results = [
+        measure("vectorized, no filters",
+                lambda: match_candidates(teachers, community, top_k=args.top_k, block_size=args.block_size)),
+        measure("vectorized, subject + min education",
+                lambda: match_candidates(teachers, community, subject="Mathematics", min_education="Bachelor's",
+                                         top_k=args.top_k, block_size=args.block_size))
+    ]
+    if args.baseline_villages:
+        results.append({
+            "method": f"python loop (extrapolated from {args.baseline_villages} villages)",
+            "seconds": round(loop_baseline(teachers, community, args.baseline_villages, args.top_k), 3),
+            "candidates": args.candidates,
+            "matches": args.villages * args.top_k
+        })
+
+    print(f"{args.candidates:,} candidates x {args.villages:,} villages, top {args.top_k}")
+    for row in results:
+        print(f"  {row['method']:48} {row['seconds']:>9.3f}s  ({row['candidates']:,} candidates)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"candidates": args.candidates, "villages": args.villages, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Scaling benchmark for the local data and context stages.
+
+For each size, writes a synthetic district with synthetic_data, then runs
+the project's local stages over it in a fresh process: cold and warm
+load_data, update_data with a 1% student delta and the compaction on its
+first read, the progress report, candidate matching, the incentive
+allocation, agent description rendering within the token budgets, and the
+old DataFrame.to_string() rendering for comparison (skipped above
+--to-string-max-rows). Each stage records wall time and the peak RSS of
+the process so far; the rendering stages also record prompt bytes per
+agent.
+
+Results are saved as JSON under benchmarks/results/. With --baseline, a
+stage slower than --tolerance times its baseline fails the run, so the
+benchmark doubles as a regression guard.
+
+    python benchmarks/scaling_benchmark.py --villages 10 100 1000 10000
+    python benchmarks/scaling_benchmark.py --baseline benchmarks/results/scaling-<time>.json
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is in KB on Linux)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def run_stages(villages, students, to_string_max_rows):
+    """Run every stage over one generated data set; returns one row per stage."""
+    from allocation import allocate
+    from analytics import progress_report
+    from data_store import DataStore
+    from matching import match_candidates
+    from rendering import ContextRenderer
+    from retrain_agents import AGENT_TABLES, AGENT_TOKEN_BUDGETS, build_descriptions, load_data, update_data
+    from synthetic_data import generate, write
+
+    rows = []
+
+    def stage(name, run):
+        started = time.perf_counter()
+        result = run()
+        rows.append({"stage": name, "seconds": round(time.perf_counter() - started, 4), "peak_rss_mb": peak_rss_mb()})
+        return result
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        generated = stage("generate", lambda: generate(villages, students))
+        stage("write_csv", lambda: write(generated, data_dir))
+        del generated
+        data_frames = stage("load_data (cold)", lambda: load_data(data_dir))
+        data_frames = stage("load_data (warm cache)", lambda: load_data(data_dir))
+
+    students_df = data_frames["student_data"]
+    delta = students_df.sample(frac=0.01, random_state=0).copy()
+    delta["attendance_percent"] = (delta["attendance_percent"] + 1).clip(upper=100)
+    store = DataStore(data_frames)
+    data_frames = stage("update_data (1% students)",
+                        lambda: update_data(data_frames, {"student_data": delta}, store))
+    stage("compact on first read", lambda: data_frames["student_data"])
+    stage("progress_report", lambda: progress_report(data_frames))
+    stage("match_candidates", lambda: match_candidates(data_frames["teacher_data"], data_frames["community_data"]))
+    stage("allocate", lambda: allocate(data_frames["incentives_data"], data_frames.get("teacher_data")))
+
+    descriptions = stage("build_descriptions",
+                         lambda: build_descriptions(data_frames, renderer=ContextRenderer(), budgets=AGENT_TOKEN_BUDGETS))
+    rows[-1]["prompt_bytes"] = {agent: len(text.encode()) for agent, text in descriptions.items()}
+
+    total_rows = max(sum(len(data_frames[table]) for table in tables) for tables in AGENT_TABLES.values())
+    if total_rows <= to_string_max_rows:
+        rendered = stage("to_string (unbounded)",
+                         lambda: {agent: "".join(data_frames[table].to_string() for table in tables)
+                                  for agent, tables in AGENT_TABLES.items()})
+        rows[-1]["prompt_bytes"] = {agent: len(text.encode()) for agent, text in rendered.items()}
+    else:
+        rows.append({"stage": "to_string (unbounded)", "skipped": f"{total_rows:,} rows"})
+
+    for row in rows:
+        row["villages"] = villages
+    sizes = {table: len(df) for table, df in data_frames.items()}
+    return {"villages": villages, "rows": sizes, "stages": rows}
+
+
+def run_size(villages, students, to_string_max_rows):
+    """Run one size in a fresh interpreter so peak RSS is its own."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--villages", str(villages),
+               "--to-string-max-rows", str(to_string_max_rows)]
+    if students:
+        command += ["--students", str(students)]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{villages} villages failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def regressions(results, baseline, tolerance, min_seconds=0.05):
+    """Stages slower than tolerance times their baseline (ignoring very short stages)."""
+    before = {(row["villages"], row["stage"]): row["seconds"]
+              for size in baseline["sizes"] for row in size["stages"] if "seconds" in row}
+    slower = []
+    for size in results["sizes"]:
+        for row in size["stages"]:
+            previous = before.get((row["villages"], row["stage"]))
+            if previous is None or "seconds" not in row:
+                continue
+            if row["seconds"] > max(previous * tolerance, min_seconds):
+                slower.append(f"{row['villages']} villages, {row['stage']}: {row['seconds']}s vs {previous}s")
+    return slower
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the local stages over synthetic data of growing size")
+    parser.add_argument("--villages", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--students", type=int, help="students per size (default: 100 per village)")
+    parser.add_argument("--to-string-max-rows", type=int, default=200_000,
+                        help="skip to_string() rendering above this many rows per agent")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown against the baseline")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/scaling-<time>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_stages(args.villages[0], args.students, args.to_string_max_rows)))
+        return
+
+    results = {"config": vars(args), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "sizes": []}
+    for villages in args.villages:
+        size = run_size(villages, args.students, args.to_string_max_rows)
+        results["sizes"].append(size)
+        print(f"\n{villages:,} villages: " + ", ".join(f"{table} {rows:,}" for table, rows in size["rows"].items()))
+        for row in size["stages"]:
+            if "skipped" in row:
+                print(f"  {row['stage']:28} skipped ({row['skipped']})")
+                continue
+            prompt = ""
+            if "prompt_bytes" in row:
+                prompt = f"  prompt bytes/agent max {max(row['prompt_bytes'].values()):,}"
+            print(f"  {row['stage']:28} {row['seconds']:>9.3f}s {row['peak_rss_mb']:>9.1f} MB{prompt}")
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"scaling-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        if slower:
+            print("\n".join([f"\nSlower than {args.tolerance}x the baseline:"] + slower))
+            sys.exit(1)
+        print(f"No stage slower than {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
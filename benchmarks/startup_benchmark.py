@@ -0,0 +1,105 @@
+"""Import-cost benchmark for the library entry points.
+
+Imports each module in a fresh interpreter, several times, and reports the
+median import time. Each import also has to leave the heavy dependencies
+(pandas, numpy, the aixplain SDK) unloaded and open no network
+connections. Exits non-zero when a module is over --budget-ms or breaks
+either rule, so it can run as a check.
+
+The scripts are loaded the way users run them, `python scripts/X.py` from
+the repository root (so only scripts/ is on the path), with main() not
+called.
+
+    python benchmarks/startup_benchmark.py --budget-ms 100
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["coordinator", "coordinator_service", "batch_query", "media_cache", "metrics", "response_cache", "sessions"]
+SCRIPTS = ["scripts/CreateAgent.py", "scripts/PipeLineAndRunTest.py"]
+HEAVY_MODULES = ["pandas", "numpy", "aixplain"]
+
+# Run in the child: time the import with socket connects recorded instead of made
+PROBE = """
+import json, socket, sys, time
+connects = []
+def connect(self, address):
+    connects.append(str(address))
+    raise OSError("network access at import time")
+socket.socket.connect = connect
+socket.create_connection = lambda address, *args, **kwargs: connect(None, address)
+started = time.perf_counter()
+{load}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "connects": connects,
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def load_statement(module):
+    """Code importing a module, or running a script as `python <script>` would without calling main()."""
+    if not module.endswith(".py"):
+        return f"import {module}"
+    path = os.path.join(ROOT, module)
+    return (f"import runpy; sys.path[0] = {os.path.dirname(path)!r}; "
+            f"runpy.run_path({path!r}, run_name='__startup__')")
+
+
+def measure(module, runs):
+    samples, last = [], None
+    for _ in range(runs):
+        probe = PROBE.format(load=load_statement(module), heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+        last = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(last["seconds"] * 1000)
+    return {"module": module, "median_ms": round(statistics.median(samples), 2),
+            "max_ms": round(max(samples), 2), "heavy_imports": last["heavy"], "connects": last["connects"]}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark library import cost")
+    parser.add_argument("--modules", nargs="+", default=MODULES + SCRIPTS, help="modules and scripts/*.py paths")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="maximum median import time per module")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = [measure(module, args.runs) for module in args.modules]
+    failures = []
+    print(f"{'module':32} {'median ms':>10} {'max ms':>8}  heavy imports / connects")
+    for row in results:
+        if "error" in row:
+            failures.append(f"{row['module']}: {row['error']}")
+            print(f"{row['module']:32} {'error':>10}")
+            continue
+        print(f"{row['module']:32} {row['median_ms']:>10} {row['max_ms']:>8}  "
+              f"{', '.join(row['heavy_imports']) or '-'} / {len(row['connects'])}")
+        if row["median_ms"] > args.budget_ms:
+            failures.append(f"{row['module']}: {row['median_ms']} ms over the {args.budget_ms} ms budget")
+        if row["heavy_imports"]:
+            failures.append(f"{row['module']}: imports {', '.join(row['heavy_imports'])}")
+        if row["connects"]:
+            failures.append(f"{row['module']}: connects to {', '.join(row['connects'])} at import")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": results}, f, indent=2)
+    if failures:
+        print("\n".join(["", "FAILED:"] + failures))
+        sys.exit(1)
+    print(f"\nAll modules within {args.budget_ms} ms with no heavy imports or connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""Coordinator requests as an importable library.
+
+Importing this module is cheap: it needs only the standard library, makes
+no network calls and reads no data, so worker processes and services can
+import it freely. The data tables, retrieval index, pre-computed figures,
+caches and agent handles are built on the first request (or by warm()),
+and pandas and the aixplain SDK are only imported then.
+
+    from coordinator import direct_agent_request
+    direct_agent_request("Find math teachers", "recruitment", village_id="V001")
+
+full_cycle queries first pass through the local intent router: confident
+single-domain ones go straight to their specialist instead of through the
+team agent's orchestrator (set INTENT_ROUTER_LOG to log every decision).
+With fan_out=True the rest are split across the five specialists, asked
+concurrently, and merged in one synthesis call instead of going to the team.
+
+Agents are resolved in order from handles passed in (e.g. the agent objects
+of a notebook session), through the agent registry, and finally over the
+REST API with AIXPLAIN_API_KEY.
+
+    python coordinator.py                          interactive interface
+    python coordinator.py --query "..." --action progress --village V001
+    python coordinator.py --serve --port 8080      HTTP service
+"""
+import os
+import threading
+
+from metrics import get_metrics, span
+
+# Agent IDs from the deployment
+AGENT_IDS = {
+    "teacher_recruitment": "67dfca08338999cb9696a566",
+    "training_mentorship": "67dfb3fc338999cb9696a525",
+    "incentive_management": "67dfb3fd181c58b7238eb907",
+    "community_engagement": "67dfb3fe338999cb9696a526",
+    "progress_monitoring": "67dfc9f8338999cb9696a565",
+    "team": "7a6d1fd8d107ec1c54e98c995ce4d35114644d43d890d11e2c6024bb11a46212"
+}
+
+# Coordinator actions and what they are for
+ACTIONS = {
+    "recruitment": "Find and recruit teachers",
+    "training": "Get training resources and guidance",
+    "incentives": "Manage teacher incentives",
+    "community": "Community engagement strategies",
+    "progress": "Monitor student and program progress",
+    "full_cycle": "Complete implementation plan"
+}
+
+# Agent behind each coordinator action type
+ACTION_AGENTS = {
+    "recruitment": "teacher_recruitment",
+    "training": "training_mentorship",
+    "incentives": "incentive_management",
+    "community": "community_engagement",
+    "progress": "progress_monitoring",
+    "full_cycle": "team"
+}
+
+# Actions whose answers go on to communities and teachers, so can be
+# translated into their language and read out
+MEDIA_ACTIONS = ("community", "training")
+
+
+class Coordinator:
+    """Builds prompts for coordinator actions and sends them to the agents.
+
+    Everything expensive is built on first use and shared by all threads.
+    """
+
+    def __init__(self, agent_ids=None, agents=None, data_dir="SampleData", route_full_cycle=True,
+                 fan_out=False, fan_out_deadline=60.0, synthesize=None):
+        self.agent_ids = dict(agent_ids or AGENT_IDS)
+        # Agent handles by action type, used before the registry
+        self.agents = dict(agents or {})
+        self.data_dir = data_dir
+        self.route_full_cycle = route_full_cycle
+        self.fan_out = fan_out
+        self.fan_out_deadline = fan_out_deadline
+        # Runs the fan-out merge prompt; an LLM through the aixplain SDK by default
+        self.synthesize = synthesize
+        self._state = None
+        self._router = None
+        self._fanout = None
+        self._sessions = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Data, index, pre-computed figures and caches, loaded on first use."""
+        if self._state is None:
+            with self._lock:
+                if self._state is None:
+                    with span("coordinator_load"):
+                        self._state = self._load()
+        return self._state
+
+    def _load(self):
+        from allocation import allocate, data_stock
+        from analytics import data_history_dir, progress_report
+        from media_cache import MediaCache
+        from response_cache import ResponseCache
+        from retrain_agents import load_data
+        from retrieval import DataIndex
+        from sharding import ShardMap
+
+        data_frames = load_data(self.data_dir)
+        stock = data_stock(self.data_dir)
+        allocation, allocation_summary = allocate(data_frames["incentives_data"], data_frames.get("teacher_data"),
+                                                  stock)
+        return {
+            "data_frames": data_frames,
+            "data_index": DataIndex(data_frames),
+            "progress": progress_report(data_frames, data_history_dir(self.data_dir)),
+            "allocation": allocation,
+            "allocation_summary": allocation_summary,
+            "stock": stock,
+            # Repeated questions against unchanged data are answered from a local cache
+            "response_cache": ResponseCache(),
+            # Notices and lesson audio are translated/synthesized once per language or voice
+            "media_cache": MediaCache(),
+            # Village shards written by `retrain_agents.py --shard`; None when agents are not sharded
+            "shard_map": ShardMap.load()
+        }
+
+    @property
+    def router(self):
+        """Intent router for full_cycle queries, trained on first use."""
+        if self._router is None:
+            with self._lock:
+                if self._router is None:
+                    from intent_router import IntentRouter
+
+                    self._router = IntentRouter(log_path=os.environ.get("INTENT_ROUTER_LOG"))
+        return self._router
+
+    @property
+    def sessions(self):
+        """Conversation sessions, in memory unless a SessionManager was set."""
+        if self._sessions is None:
+            with self._lock:
+                if self._sessions is None:
+                    from sessions import SessionManager
+
+                    self._sessions = SessionManager()
+        return self._sessions
+
+    @sessions.setter
+    def sessions(self, manager):
+        self._sessions = manager
+
+    def warm(self):
+        """Load everything now rather than on the first request."""
+        self.state
+        if self.route_full_cycle:
+            self.router
+        return self
+
+    @property
+    def media_cache(self):
+        return self.state["media_cache"]
+
+    def route_agent(self, action_type, village_id=None):
+        """Agent for a query: its village's shard agent when sharded, else the global agent."""
+        from sharding import route
+
+        return route(ACTION_AGENTS.get(action_type), village_id, self.state["shard_map"])
+
+    def cached_run(self, action_type, prompt, run, agent_name=None):
+        """Return the cached answer for a prompt, or call run(prompt) and cache it."""
+        from retrain_agents import data_version
+
+        agent_name = agent_name or ACTION_AGENTS.get(action_type, action_type)
+        get_metrics().record_prompt(agent_name, prompt)
+
+        def timed_run(prompt):
+            with span("agent_api", op="run", agent=agent_name):
+                return run(prompt)
+
+        return self.state["response_cache"].cached(agent_name, prompt, data_version(agent_name), timed_run)
+
+    def build_prompt(self, query, action_type, village_id=None, teacher_id=None, top_k=5):
+        """Build the agent prompt with the top_k relevant rows per table."""
+        with span("build_prompt", action=action_type):
+            return self._build_prompt(query, action_type, village_id, teacher_id, top_k)
+
+    def _build_prompt(self, query, action_type, village_id, teacher_id, top_k):
+        from allocation import summarize_allocation
+        from analytics import summarize
+        from matching import match_candidates, parse_requirements, summarize_matches
+        from retrieval import ACTION_TABLES
+
+        state = self.state
+        prompt = query
+        if village_id:
+            prompt += f" (for village {village_id})"
+        if teacher_id:
+            prompt += f" (regarding teacher {teacher_id})"
+
+        context = state["data_index"].build_context(
+            query,
+            tables=ACTION_TABLES.get(action_type),
+            top_k=top_k,
+            village_id=village_id,
+            teacher_id=teacher_id
+        )
+        if context:
+            prompt += f"\n\nRelevant data:\n{context}"
+        if action_type == "progress":
+            prompt += f"\n\nPre-computed progress figures:\n{summarize(state['progress'], village_id)}"
+        if action_type == "recruitment":
+            data_frames = state["data_frames"]
+            teachers = data_frames["teacher_data"]
+            matches, notes = match_candidates(teachers, data_frames["community_data"], **parse_requirements(query))
+            prompt += f"\n\nRanked candidates:\n{summarize_matches(matches, notes, teachers, village_id)}"
+        if action_type == "incentives":
+            summary = summarize_allocation(state["allocation"], state["allocation_summary"], teacher_id,
+                                           state["stock"])
+            prompt += f"\n\nSolved allocation:\n{summary}"
+        return prompt
+
+    def request(self, query, action_type, village_id=None, teacher_id=None, session_id=None, language=None,
+                audio=False):
+        """Send a coordinator request to the agent for its action type.
+
+        With a session_id the request is a follow-up in that conversation:
+        it inherits the session's village/teacher scope and the prompt
+        carries the session's compacted history. Community and training
+        answers can be delivered in a language and as audio (see deliver()).
+        """
+        if action_type not in ACTIONS:
+            return {"error": f"Unknown action type: {action_type}"}
+        if session_id is None:
+            response = self._request(query, action_type, village_id, teacher_id)
+        else:
+            session = self.sessions.open(session_id, village_id, teacher_id)
+            response = self._request(query, action_type, session.village_id, session.teacher_id,
+                                     self.sessions.history(session))
+            if not (isinstance(response, dict) and "error" in response):
+                from fanout import answer_text
+
+                self.sessions.record(session, query, answer_text(response))
+        if action_type in MEDIA_ACTIONS and (language or audio):
+            response = self.deliver(response, language, audio)
+        return response
+
+    def deliver(self, response, language=None, audio=False, source="en"):
+        """An answer translated into language and, with audio, read out.
+
+        Translation and speech go through the media cache, so a notice or
+        lesson text is translated once per language and synthesized once per
+        voice however many villages ask. Failed answers are returned as they
+        are, and a failed model call leaves the answer untranslated.
+        """
+        from fanout import answer_text
+        from response_cache import is_failure
+
+        if is_failure(response):
+            return response
+        text = answer_text(response)
+        delivered = {"response": response, "language": language or source, "text": text}
+        try:
+            with span("deliver", language=language or source):
+                if language and language != source:
+                    delivered["text"] = self.media_cache.translate(text, language, source)
+                if audio:
+                    delivered["audio"] = self.media_cache.synthesize(delivered["text"], voice=language)
+        except Exception as e:
+            delivered.update(language=source, text=text, media_error=str(e))
+        return delivered
+
+    def _request(self, query, action_type, village_id=None, teacher_id=None, history=""):
+        if action_type == "full_cycle" and self.route_full_cycle:
+            action_type = self.router.route(query, action_type)
+        if action_type == "full_cycle" and self.fan_out:
+            if history:
+                query += f"\n\nEarlier in this conversation:\n{history}"
+            return self._fan_out_request(query, village_id, teacher_id)
+        prompt = self.build_prompt(query, action_type, village_id, teacher_id)
+        if history:
+            prompt += f"\n\nEarlier in this conversation:\n{history}"
+
+        # Agent objects handed in by the caller
+        agent = self.agents.get(action_type)
+        if agent is not None:
+            return self.cached_run(action_type, prompt, agent.run)
+
+        # Agents resolved through the shared registry: fetched by id once and
+        # memoized, and created only once if missing
+        agent_name = self.route_agent(action_type, village_id)
+        try:
+            agent = self._registry().get(agent_name)
+        except Exception as e:
+            print(f"Error resolving {agent_name}: {e}; using the REST API")
+            return self._rest_request(action_type, agent_name, prompt)
+        return self.cached_run(action_type, prompt, agent.run, agent_name)
+
+    def _fan_out_request(self, query, village_id, teacher_id):
+        """Ask the specialists concurrently and merge their answers."""
+        if self._fanout is None:
+            with self._lock:
+                if self._fanout is None:
+                    from fanout import FanOut, llm_synthesizer
+
+                    synthesize = self.synthesize or llm_synthesizer()
+                    self._fanout = FanOut(
+                        lambda domain, prompt, **context: self.request(prompt, domain, **context),
+                        lambda prompt: self.cached_run("full_cycle", prompt, synthesize, "synthesis"),
+                        self.fan_out_deadline
+                    )
+        return self._fanout.run(query, village_id=village_id, teacher_id=teacher_id)
+
+    def _registry(self):
+        from agent_registry import get_registry
+
+        return get_registry(self.agent_ids)
+
+    def _rest_request(self, action_type, agent_name, prompt):
+        from agent_client import get_client
+
+        if not os.environ.get("AIXPLAIN_API_KEY", ""):
+            return {"error": "AIXPLAIN_API_KEY not set in environment"}
+
+        # Shard agents' ids are in the registry file
+        base_name = ACTION_AGENTS[action_type]
+        agent_id = self.agent_ids.get(base_name)
+        if agent_name != base_name:
+            agent_id = self._registry().agent_ids.get(agent_name, agent_id)
+        if not agent_id:
+            return {"error": f"Unknown action type: {action_type}"}
+
+        # Make API request over the shared pooled client
+        def post(prompt):
+            try:
+                return get_client().run_agent(agent_id, prompt)
+            except Exception as e:
+                return {"error": f"API request failed: {str(e)}"}
+
+        return self.cached_run(action_type, prompt, post, agent_name)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator(agent_ids=None, agents=None):
+    """Return the process-wide coordinator, creating it on first use."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = Coordinator(agent_ids, agents)
+        return _coordinator
+
+
+def direct_agent_request(query, action_type, village_id=None, teacher_id=None, session_id=None, language=None,
+                         audio=False):
+    """Send a coordinator request through the process-wide coordinator."""
+    return get_coordinator().request(query, action_type, village_id, teacher_id, session_id, language, audio)
+
+
+def run_coordinator_interface(request=direct_agent_request):
+    """Simple command-line interface for program coordinators"""
+    import uuid
+
+    # Follow-up questions share one session, so earlier answers need not be pasted back in
+    session_id = uuid.uuid4().hex
+    actions = list(ACTIONS)
+    print("\n==== Rural Education Program Coordinator Interface ====\n")
+    print("Available actions:")
+    for number, action in enumerate(actions, 1):
+        print(f"{number}. {action} - {ACTIONS[action]}")
+    print(f"{len(actions) + 1}. exit - Exit the interface")
+
+    while True:
+        choice = input(f"\nSelect an action (1-{len(actions) + 1}): ")
+        if choice == str(len(actions) + 1):
+            print("Exiting coordinator interface")
+            break
+        if not choice.isdigit() or not 1 <= int(choice) <= len(actions):
+            print(f"Invalid selection. Please choose 1-{len(actions) + 1}.")
+            continue
+        action_type = actions[int(choice) - 1]
+
+        query = input("Enter your question or request: ")
+
+        village_id = None
+        if input("Do you want to specify a village? (y/n): ").lower() == "y":
+            village_id = input("Enter village ID (e.g., V001): ")
+
+        teacher_id = None
+        if action_type in ("training", "incentives") and \
+                input("Do you want to specify a teacher? (y/n): ").lower() == "y":
+            teacher_id = input("Enter teacher ID (e.g., T001): ")
+
+        language = None
+        if action_type in MEDIA_ACTIONS:
+            language = input("Language for the answer (e.g., hi; blank for English): ").strip() or None
+
+        try:
+            result = request(query=query, action_type=action_type, village_id=village_id, teacher_id=teacher_id,
+                             session_id=session_id, language=language)
+            print("\nResponse:")
+            print(result)
+        except Exception as e:
+            print(f"Error: {str(e)}")
+
+
+def run_coordinator_service(request=direct_agent_request, host="127.0.0.1", port=8080, workers=16):
+    """Serve the coordinator actions over HTTP until interrupted"""
+    import asyncio
+
+    from coordinator_service import CoordinatorService
+
+    asyncio.run(CoordinatorService(request, workers=workers).serve(host, port))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Send coordinator requests to the education agents")
+    parser.add_argument("--query", help="send one request and print the answer")
+    parser.add_argument("--action", choices=list(ACTIONS), default="full_cycle")
+    parser.add_argument("--village", help="village id for --query")
+    parser.add_argument("--teacher", help="teacher id for --query")
+    parser.add_argument("--language", help="translate community/training answers to --query into this language")
+    parser.add_argument("--audio", action="store_true", help="also read community/training answers out")
+    parser.add_argument("--serve", action="store_true", help="serve the actions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--data-dir", default="SampleData")
+    parser.add_argument("--sessions-db", help="keep conversation sessions in this SQLite file instead of memory")
+    parser.add_argument("--no-route", action="store_true", help="send full_cycle queries to the team agent as they are")
+    parser.add_argument("--fan-out", action="store_true",
+                        help="answer full_cycle queries by asking the specialists concurrently and merging")
+    parser.add_argument("--fan-out-deadline", type=float, default=60.0, help="seconds to wait for the specialists")
+    args = parser.parse_args(argv)
+
+    coordinator = get_coordinator()
+    coordinator.data_dir = args.data_dir
+    coordinator.route_full_cycle = not args.no_route
+    coordinator.fan_out = args.fan_out
+    coordinator.fan_out_deadline = args.fan_out_deadline
+    if args.sessions_db:
+        from sessions import SessionManager, SqliteSessionStore
+
+        coordinator.sessions = SessionManager(SqliteSessionStore(args.sessions_db))
+    if args.query:
+        print(coordinator.request(args.query, args.action, args.village, args.teacher, language=args.language,
+                                  audio=args.audio))
+    elif args.serve:
+        run_coordinator_service(coordinator.request, args.host, args.port, args.workers)
+    else:
+        run_coordinator_interface(coordinator.request)
+
+
+if __name__ == "__main__":
+    main()
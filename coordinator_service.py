@@ -0,0 +1,373 @@
+"""Local HTTP service for program coordinators.
+
+Exposes the coordinator actions over HTTP so many devices can query the
+agents at once, instead of the single-user input() loop:
+
+    GET  /actions                   list the actions
+    POST /actions/<action>          {"query": ..., "village_id": ..., "teacher_id": ..., "session_id": ...,
+                                     "language": ..., "audio": ...}
+    POST /batch                     JSON list or JSONL of {query, action_type, village_id, teacher_id};
+                                    results stream back as JSON lines in completion order
+    GET  /health, GET /stats
+
+A session_id in the body (or an X-Session-Id header) makes a request a
+follow-up in that conversation, for handlers that keep sessions. With a
+language (and audio) community and training answers come back translated
+(and read out) through the coordinator's media cache.
+
+Requests go through one bounded queue served by a fixed number of
+workers. A full queue is answered with 503 and a client over its
+in-flight limit (by X-Client-Id header, else address) with 429, both with
+Retry-After, so overload turns into backpressure instead of latency. On
+SIGINT/SIGTERM the service stops accepting connections, lets queued and
+running requests finish (up to a timeout) and exits.
+
+The handler has the signature of direct_agent_request. From the command
+line the REST endpoint is used, and --mock runs everything against an
+in-process mock_server:
+
+    python coordinator_service.py --port 8080 --mock
+"""
+import asyncio
+import json
+import signal
+import time
+from urllib.parse import urlsplit
+
+from batch_query import call_handler, rest_handler
+
+ACTIONS = ["recruitment", "training", "incentives", "community", "progress", "full_cycle"]
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 429: "Too Many Requests", 502: "Bad Gateway", 503: "Service Unavailable"}
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    """An error answered with its HTTP status (and Retry-After, if set)."""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CoordinatorService:
+    """Bounded-queue asyncio HTTP front end for an agent request handler."""
+
+    def __init__(self, handler, workers=16, queue_size=256, per_client=8, retry_after=1,
+                 shutdown_timeout=30.0):
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.per_client = per_client
+        self.retry_after = retry_after
+        self.shutdown_timeout = shutdown_timeout
+        self.queue = None
+        self.server = None
+        self.stopping = None
+        self.in_flight = {}
+        self.stats = {"accepted": 0, "completed": 0, "failed": 0, "rejected_queue_full": 0,
+                      "rejected_client_limit": 0, "batches": 0}
+        self._tasks = []
+        self._connections = set()
+        self._idle = set()
+
+    # -- request queue --------------------------------------------------
+
+    async def _worker(self):
+        while True:
+            record, future = await self.queue.get()
+            try:
+                if not future.cancelled():
+                    result = await call_handler(self.handler, record)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, record, client, wait=False):
+        """Queue a record for a client and wait for its result.
+
+        Without wait a full queue or a client over its limit raises
+        HTTPError (503/429) at once; batches pass wait=True and are held
+        back by the queue instead.
+        """
+        if not wait and self.in_flight.get(client, 0) >= self.per_client:
+            self.stats["rejected_client_limit"] += 1
+            raise HTTPError(429, f"Client {client} already has {self.per_client} requests in flight",
+                            self.retry_after)
+        future = asyncio.get_running_loop().create_future()
+        if wait:
+            await self.queue.put((record, future))
+        else:
+            try:
+                self.queue.put_nowait((record, future))
+            except asyncio.QueueFull:
+                self.stats["rejected_queue_full"] += 1
+                raise HTTPError(503, "Request queue is full", self.retry_after)
+        self.stats["accepted"] += 1
+        self.in_flight[client] = self.in_flight.get(client, 0) + 1
+        try:
+            result = await future
+            self.stats["completed"] += 1
+            return result
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.in_flight[client] -= 1
+            if not self.in_flight[client]:
+                del self.in_flight[client]
+
+    # -- HTTP -----------------------------------------------------------
+
+    async def _read_request(self, reader):
+        # A keep-alive connection waiting for its next request is idle and
+        # may be closed at shutdown; one mid-request is left to finish
+        task = asyncio.current_task()
+        self._idle.add(task)
+        try:
+            line = await reader.readline()
+        finally:
+            self._idle.discard(task)
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), urlsplit(target).path, headers, body
+
+    @staticmethod
+    def _head(status, headers):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer, status, body, keep_alive=True, retry_after=None):
+        data = json.dumps(body, default=str).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": len(data),
+                   "Connection": "keep-alive" if keep_alive else "close"}
+        if retry_after is not None:
+            headers["Retry-After"] = retry_after
+        writer.write(self._head(status, headers) + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        peer = writer.get_extra_info("peername")
+        address = peer[0] if peer else "unknown"
+        try:
+            while not self.stopping.is_set():
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                client = headers.get("x-client-id") or address
+                keep_alive = headers.get("connection", "").lower() != "close" and not self.stopping.is_set()
+                try:
+                    if method == "POST" and path == "/batch":
+                        await self._stream_batch(writer, body, client, keep_alive)
+                    else:
+                        payload = await self._route(method, path, body, client, headers.get("x-session-id"))
+                        await self._send_json(writer, 200, payload, keep_alive)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive, e.retry_after)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _route(self, method, path, body, client, session_id=None):
+        if path == "/health":
+            return {"status": "stopping" if self.stopping.is_set() else "ok"}
+        if path == "/stats":
+            return dict(self.stats, queued=self.queue.qsize(), in_flight=sum(self.in_flight.values()),
+                        clients=len(self.in_flight))
+        if path == "/actions":
+            return {"actions": ACTIONS}
+        if path.startswith("/actions/"):
+            action = path[len("/actions/"):]
+            if action not in ACTIONS:
+                raise HTTPError(404, f"Unknown action: {action}")
+            if method != "POST":
+                raise HTTPError(405, "Use POST")
+            params = self._json(body)
+            if not params.get("query"):
+                raise HTTPError(400, "Missing 'query'")
+            record = {"query": params["query"], "action_type": action,
+                      "village_id": params.get("village_id"), "teacher_id": params.get("teacher_id"),
+                      "session_id": params.get("session_id") or session_id,
+                      "language": params.get("language"), "audio": params.get("audio")}
+            started = time.perf_counter()
+            try:
+                response = await self.submit(record, client)
+            except HTTPError:
+                raise
+            except Exception as e:
+                raise HTTPError(502, f"Agent request failed: {e}")
+            return {"action_type": action, "response": response,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+        raise HTTPError(404, f"No route for {method} {path}")
+
+    @staticmethod
+    def _json(body):
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON")
+
+    @staticmethod
+    def _batch_records(body):
+        text = body.decode().strip()
+        if text.startswith("["):
+            records = json.loads(text)
+        else:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        for record in records:
+            if not isinstance(record, dict):
+                raise HTTPError(400, f"Each record must be a JSON object, got {json.dumps(record)[:80]}")
+            if record.get("action_type") not in ACTIONS or not record.get("query"):
+                raise HTTPError(400, f"Each record needs a query and an action_type in {ACTIONS}")
+        return records
+
+    async def _stream_batch(self, writer, body, client, keep_alive=True):
+        """Run a batch and stream one JSON line per record as each finishes."""
+        try:
+            records = self._batch_records(body)
+        except ValueError:
+            raise HTTPError(400, "Body must be a JSON list or JSON lines")
+        self.stats["batches"] += 1
+        writer.write(self._head(200, {"Content-Type": "application/x-ndjson",
+                                      "Transfer-Encoding": "chunked",
+                                      "Connection": "keep-alive" if keep_alive else "close"}))
+        # A batch holds at most per_client queue slots at a time
+        slots = asyncio.Semaphore(self.per_client)
+
+        async def run(index, record):
+            async with slots:
+                started = time.perf_counter()
+                result = {"index": index, **record}
+                try:
+                    result["response"] = await self.submit(record, client, wait=True)
+                except Exception as e:
+                    result["error"] = str(e)
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                return result
+
+        for done in asyncio.as_completed([run(i, record) for i, record in enumerate(records)]):
+            line = (json.dumps(await done, default=str) + "\n").encode()
+            writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # -- lifecycle ------------------------------------------------------
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Start the workers and listen; returns the bound port."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.stopping = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop accepting, let queued and running requests finish, then stop the workers.
+
+        Idle keep-alive connections are closed first: since Python 3.12
+        Server.wait_closed() waits for every connection handler, so an idle
+        client would otherwise hold shutdown open indefinitely.
+        """
+        self.stopping.set()
+        self.server.close()
+        for task in list(self._idle):
+            task.cancel()
+        try:
+            await asyncio.wait_for(self.queue.join(), self.shutdown_timeout)
+            # Give handlers a moment to write the last responses
+            pending = [task for task in self._connections if not task.done()]
+            if pending:
+                await asyncio.wait(pending, timeout=1.0)
+        except asyncio.TimeoutError:
+            print(f"Shutdown timed out with {self.queue.qsize()} requests still queued")
+        connections = list(self._connections)
+        for task in self._tasks + connections:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """Serve until SIGINT/SIGTERM, then shut down gracefully."""
+        port = await self.start(host, port)
+        print(f"Coordinator service on http://{host}:{port} "
+              f"({self.workers} workers, queue {self.queue_size}, {self.per_client} per client)")
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        await stop.wait()
+        print("Shutting down: finishing queued requests...")
+        await self.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the coordinator actions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16, help="requests handled concurrently")
+    parser.add_argument("--queue-size", type=int, default=256, help="requests waiting before 503s")
+    parser.add_argument("--per-client", type=int, default=8, help="in-flight requests per client before 429s")
+    parser.add_argument("--base-url", help="agent API base URL (default: $AIXPLAIN_BASE_URL or the public API)")
+    parser.add_argument("--mock", action="store_true", help="run against an in-process mock server")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url
+    if args.mock:
+        from mock_server import start_mock_server
+
+        base_url = start_mock_server(latency_ms=args.mock_latency_ms).url
+        print(f"Using mock backend at {base_url}")
+    handler = rest_handler(base_url, pool_size=args.workers)
+    service = CoordinatorService(handler, args.workers, args.queue_size, args.per_client)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    finally:
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
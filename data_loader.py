@@ -0,0 +1,234 @@
+"""Schema-aware loading of the five program tables.
+
+Every table is read with explicit dtypes, low-cardinality columns become
+categoricals, and rows whose multi-valued column was written without
+quotes (e.g. teacher subjects "Math,Science") are repaired instead of
+shifting the remaining columns. Large exports can be read in chunks.
+
+A columnar copy of each parsed table is cached next to the CSV (Parquet
+when pyarrow is installed, pickle otherwise) and reused for as long as the
+CSV's mtime and content hash are unchanged.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+from metrics import get_metrics
+
+# Column dtypes per table. Dates are parsed separately.
+SCHEMAS = {
+    "teacher_data": {
+        "columns": {
+            "teacher_id": "string",
+            "name": "string",
+            "age": "Int16",
+            "education_level": "category",
+            "subjects": "string",
+            "village_id": "category",
+            "village_needs": "string",
+            "suitability_score": "float32"
+        },
+        # Unquoted commas in this column are folded back into it
+        "multi_value": "subjects"
+    },
+    "training_data": {
+        "columns": {
+            "training_id": "string",
+            "module_name": "string",
+            "duration_days": "Int16",
+            "materials_required": "string",
+            "schedule_date": "datetime",
+            "village_id": "category",
+            "status": "category"
+        }
+    },
+    "incentives_data": {
+        "columns": {
+            "teacher_id": "string",
+            "preferred_incentive": "category",
+            "available_resources": "string",
+            "allocated_incentive": "category"
+        }
+    },
+    "community_data": {
+        "columns": {
+            "village_id": "category",
+            "population": "Int32",
+            "students_count": "Int32",
+            "main_occupation": "category",
+            "community_leader": "string",
+            "contact_number": "string",
+            "last_meeting_date": "datetime"
+        }
+    },
+    "student_data": {
+        "columns": {
+            "student_id": "string",
+            "name": "string",
+            "village_id": "category",
+            "attendance_percent": "float32",
+            "math_score": "float32",
+            "english_score": "float32",
+            "science_score": "float32"
+        }
+    }
+}
+
+MULTI_VALUE_SEPARATOR = ", "
+CACHE_DIR = ".cache"
+
+
+def split_multi_value(series, separator=","):
+    """Split a multi-valued column (e.g. subjects) into lists of stripped values."""
+    return series.fillna("").str.split(separator).map(lambda values: [v.strip() for v in values if v.strip()])
+
+
+def _read_dtypes(schema):
+    """dtypes to read with; categoricals and dates are applied after all chunks are read."""
+    return {
+        column: ("string" if dtype in ("category", "datetime") else dtype)
+        for column, dtype in schema["columns"].items()
+    }
+
+
+def apply_schema(df, table):
+    """Apply a table's categorical and date columns to a frame in place."""
+    return _finish(df, SCHEMAS[table])
+
+
+def _finish(df, schema):
+    for column, dtype in schema["columns"].items():
+        if column not in df.columns:
+            continue
+        if dtype == "category":
+            df[column] = df[column].astype("category")
+        elif dtype == "datetime":
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    return df
+
+
+def _repair_rows(path, schema, chunksize):
+    """Yield typed chunks of a CSV whose multi-valued column may be unquoted."""
+    columns = list(schema["columns"])
+    position = columns.index(schema["multi_value"])
+    tail = len(columns) - position - 1
+    dtypes = _read_dtypes(schema)
+
+    def parse(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        return pd.read_csv(buffer, header=None, names=columns, dtype=dtypes)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = []
+        for fields in reader:
+            if not fields:
+                continue
+            if len(fields) > len(columns):
+                values = [v.strip() for v in fields[position:len(fields) - tail]]
+                fields = fields[:position] + [MULTI_VALUE_SEPARATOR.join(values)] + fields[len(fields) - tail:]
+            rows.append(fields)
+            if len(rows) == chunksize:
+                yield parse(rows)
+                rows = []
+        if rows:
+            yield parse(rows)
+
+
+def iter_table(path, table, chunksize=100_000):
+    """Yield a CSV table in typed chunks (categoricals and dates not yet applied)."""
+    schema = SCHEMAS[table]
+    if "multi_value" in schema:
+        yield from _repair_rows(path, schema, chunksize)
+        return
+    yield from pd.read_csv(path, dtype=_read_dtypes(schema), chunksize=chunksize)
+
+
+def read_table(path, table, chunksize=100_000):
+    """Parse a CSV table with its schema."""
+    chunks = list(iter_table(path, table, chunksize))
+    if not chunks:
+        return _finish(pd.DataFrame({c: pd.Series(dtype=d) for c, d in _read_dtypes(SCHEMAS[table]).items()}),
+                       SCHEMAS[table])
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    return _finish(df, SCHEMAS[table])
+
+
+def file_hash(path, block_size=1 << 20):
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def columnar_format():
+    """Parquet when pyarrow is available, pickle otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "pickle"
+
+
+def load_table(path, table, use_cache=True, chunksize=100_000):
+    """Load a table, reusing the columnar cache while the CSV is unchanged."""
+    if not use_cache:
+        return read_table(path, table, chunksize)
+
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    fmt = columnar_format()
+    cache_path = os.path.join(cache_dir, f"{table}.{fmt}")
+    meta_path = os.path.join(cache_dir, f"{table}.json")
+    stat = os.stat(path)
+
+    schema_hash = hashlib.sha256(json.dumps(SCHEMAS[table], sort_keys=True).encode()).hexdigest()
+
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(cache_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("schema") != schema_hash:
+            meta = {}
+    if meta and meta["size"] == stat.st_size and meta["mtime"] == stat.st_mtime_ns:
+        get_metrics().record_cache("columnar", True)
+        return read_columnar(cache_path, fmt)
+
+    digest = file_hash(path)
+    get_metrics().record_cache("columnar", bool(meta) and meta["sha256"] == digest)
+    if meta and meta["sha256"] == digest:
+        # Touched but not modified; refresh the recorded mtime
+        df = read_columnar(cache_path, fmt)
+    else:
+        df = read_table(path, table, chunksize)
+        os.makedirs(cache_dir, exist_ok=True)
+        write_columnar(df, cache_path, fmt)
+
+    with open(meta_path, "w") as f:
+        json.dump({"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": digest, "schema": schema_hash}, f)
+    return df
+
+
+def read_columnar(cache_path, fmt):
+    """Read a frame written by write_columnar."""
+    if fmt == "parquet":
+        return pd.read_parquet(cache_path)
+    return pd.read_pickle(cache_path)
+
+
+def write_columnar(df, cache_path, fmt):
+    """Atomically write a frame as Parquet or pickle."""
+    tmp_path = f"{cache_path}.tmp"
+    if fmt == "parquet":
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
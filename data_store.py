@@ -0,0 +1,174 @@
+"""Keyed append-log store for incremental data updates.
+
+New records are appended to a per-table log instead of being concatenated
+onto the full frame, so ingesting a delta costs time proportional to the
+delta. Each table has a primary key and later writes win: compaction merges
+the log into the snapshot and keeps only the newest row per key, so a
+corrected teacher row replaces the stale one instead of sitting next to it.
+
+Compaction happens when a table's log passes compact_ratio of its
+snapshot, or when the table is read. view() gives a {table: frame}
+mapping that compacts a table only when that table is read, so updates
+between reads cost only their deltas.
+
+With a directory, appended deltas and compacted snapshots are also written
+to disk and reloaded on the next start.
+"""
+import glob
+import os
+from collections.abc import Mapping
+
+import pandas as pd
+
+from data_loader import apply_schema, columnar_format, read_columnar, write_columnar
+
+PRIMARY_KEYS = {
+    "teacher_data": "teacher_id",
+    "training_data": "training_id",
+    "incentives_data": "teacher_id",
+    "community_data": "village_id",
+    "student_data": "student_id"
+}
+
+
+class DataStore:
+    """Per-table snapshot plus append log with last-write-wins upserts."""
+
+    def __init__(self, data_frames=None, path=None, compact_ratio=0.25):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.fmt = columnar_format()
+        self.snapshots = {}
+        self.logs = {}
+        self.keys = {}
+        self.dirty = set()
+        if path:
+            self._load(path)
+        for table, df in (data_frames or {}).items():
+            if table not in self.snapshots:
+                # Taken as is; keys are built on the first upsert into the table
+                self.snapshots[table] = df
+                self.logs[table] = []
+
+    def _table_dir(self, table):
+        return os.path.join(self.path, table)
+
+    def _load(self, path):
+        for table in PRIMARY_KEYS:
+            table_dir = os.path.join(path, table)
+            snapshot_path = os.path.join(table_dir, f"snapshot.{self.fmt}")
+            deltas = [read_columnar(delta_path, self.fmt)
+                      for delta_path in sorted(glob.glob(os.path.join(table_dir, f"delta-*.{self.fmt}")))]
+            if os.path.exists(snapshot_path):
+                self.snapshots[table] = read_columnar(snapshot_path, self.fmt)
+            elif deltas:
+                # Deltas written before any snapshot (by an older version) still count
+                self.snapshots[table] = deltas[0].iloc[0:0]
+            else:
+                continue
+            self.logs[table] = deltas
+            self.keys[table] = set(self.snapshots[table][PRIMARY_KEYS[table]].astype(str).tolist())
+            for delta in self.logs[table]:
+                self.keys[table].update(delta[PRIMARY_KEYS[table]].astype(str).tolist())
+
+    def _keys(self, table):
+        """Key set of a table, built from its snapshot on first use."""
+        if table not in self.keys:
+            keys = self.snapshots[table][PRIMARY_KEYS[table]].astype(str).tolist()
+            self.keys[table] = set(keys)
+            if len(self.keys[table]) < len(keys):
+                # Duplicate keys in the initial frame are dropped at the next compaction
+                self.dirty.add(table)
+        return self.keys[table]
+
+    def upsert(self, table, new_df):
+        """Append records to a table's log.
+
+        Returns the number of records that replace an existing key.
+        """
+        if table not in PRIMARY_KEYS:
+            raise KeyError(f"Unknown table: {table}")
+        if table not in self.snapshots:
+            self.snapshots[table] = new_df.iloc[0:0]
+            self.logs[table] = []
+            self.keys[table] = set()
+
+        keys = self._keys(table)
+        new_keys = new_df[PRIMARY_KEYS[table]].astype(str).tolist()
+        replaced = sum(1 for key in new_keys if key in keys)
+        keys.update(new_keys)
+        self.logs[table].append(new_df)
+        if self.path:
+            table_dir = self._table_dir(table)
+            os.makedirs(table_dir, exist_ok=True)
+            snapshot_path = os.path.join(table_dir, f"snapshot.{self.fmt}")
+            if not os.path.exists(snapshot_path):
+                # The rows the log applies to go to disk first, so a restart sees them
+                write_columnar(self.snapshots[table], snapshot_path, self.fmt)
+            sequence = len(glob.glob(os.path.join(table_dir, f"delta-*.{self.fmt}")))
+            write_columnar(new_df, os.path.join(table_dir, f"delta-{sequence:06d}.{self.fmt}"), self.fmt)
+
+        pending = sum(len(delta) for delta in self.logs[table])
+        if pending > self.compact_ratio * max(len(self.snapshots[table]), 1):
+            self.compact(table)
+        return replaced
+
+    def compact(self, table):
+        """Merge a table's log into its snapshot, keeping the last row per key."""
+        frames = [self.snapshots[table]] + self.logs[table]
+        combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        key = PRIMARY_KEYS[table]
+        snapshot = combined.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+        self.snapshots[table] = apply_schema(snapshot, table)
+        self.logs[table] = []
+        self.dirty.discard(table)
+        if table not in self.keys:
+            # Upserts keep the key set current, so it is only built once
+            self.keys[table] = set(snapshot[key].astype(str).tolist())
+
+        if self.path:
+            table_dir = self._table_dir(table)
+            os.makedirs(table_dir, exist_ok=True)
+            write_columnar(self.snapshots[table], os.path.join(table_dir, f"snapshot.{self.fmt}"), self.fmt)
+            for delta_path in glob.glob(os.path.join(table_dir, f"delta-*.{self.fmt}")):
+                os.remove(delta_path)
+        return self.snapshots[table]
+
+    def snapshot(self, table):
+        """Current frame for a table, compacting any pending log first."""
+        if self.logs.get(table) or table in self.dirty:
+            self.compact(table)
+        return self.snapshots[table]
+
+    def frames(self):
+        """Current frames of all tables (compacts every table with a pending log)."""
+        return {table: self.snapshot(table) for table in self.snapshots}
+
+    def view(self):
+        """Mapping of the current frames that compacts a table only when it is read."""
+        return TableView(self)
+
+
+class TableView(Mapping):
+    """Read-only {table: frame} view of a DataStore.
+
+    Reading a table compacts its pending log; tables that are not read
+    are left alone. update_data returns one and reuses its store.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, table):
+        if table not in self.store.snapshots:
+            raise KeyError(table)
+        return self.store.snapshot(table)
+
+    def __contains__(self, table):
+        return table in self.store.snapshots
+
+    def __iter__(self):
+        return iter(self.store.snapshots)
+
+    def __len__(self):
+        return len(self.store.snapshots)
@@ -0,0 +1,187 @@
+"""Parallel specialist fan-out for full_cycle planning queries.
+
+The team agent consults the five specialists one after another, so a
+full_cycle answer costs about six sequential LLM calls. In fan-out mode the
+query is split into one sub-prompt per domain, the specialists are asked
+concurrently with a shared deadline, and their answers are merged in a
+single synthesis call. Latency approaches the slowest specialist plus one
+merge. The specialists run on one long-lived pool per FanOut; each call's
+deadline counts from when it starts running, so time spent queued behind
+other requests is not charged to it, and a call still queued after
+queue_timeout is dropped without running.
+
+Specialists that fail or miss the deadline are left out of the merge and
+reported in the result instead of blocking it (a late answer still lands
+in the response cache for next time). If the synthesis call fails, the
+partial answers are returned one after another.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import get_metrics, span
+from response_cache import is_failure
+
+DOMAINS = ["recruitment", "training", "incentives", "community", "progress"]
+
+# What each specialist is asked to cover
+DOMAIN_FOCUS = {
+    "recruitment": "recruiting teachers: who to recruit, where, and how",
+    "training": "training and mentoring the teachers",
+    "incentives": "the non-monetary incentives for the teachers",
+    "community": "engaging parents, village elders and the community",
+    "progress": "tracking student outcomes and program progress"
+}
+
+SUB_PROMPT = "{query}\n\nAnswer only the part about {focus}; other specialists cover the rest."
+
+MERGE_TEMPLATE = """You are coordinating a rural education program. Specialists answered parts of this request:
+
+{query}
+
+{answers}
+
+Combine their answers into one coherent plan. Keep concrete figures, names and ids, resolve overlaps,
+and say which parts have no specialist answer{missing}."""
+
+
+def answer_text(response):
+    """The text of an agent or model response (SDK object, REST dict or plain string)."""
+    if isinstance(response, str):
+        return response
+    data = response.get("data") if isinstance(response, dict) else getattr(response, "data", None)
+    if isinstance(data, dict):
+        data = data.get("output", data)
+    elif data is not None and hasattr(data, "output"):
+        data = data.output
+    return str(data if data is not None else response)
+
+
+def error_text(response):
+    """Why a failed response failed."""
+    if isinstance(response, dict):
+        return str(response.get("error") or response.get("error_message") or f"status {response.get('status')}")
+    status = getattr(response, "status", None)
+    return str(getattr(response, "error_message", None) or f"status {getattr(status, 'value', status)}")
+
+
+def sub_prompts(query, domains=DOMAINS):
+    """{domain: prompt asking that specialist for its part of the query}."""
+    return {domain: SUB_PROMPT.format(query=query, focus=DOMAIN_FOCUS[domain]) for domain in domains}
+
+
+def merge_prompt(query, answers, missing=()):
+    """Prompt for the synthesis call over {domain: answer text}."""
+    blocks = "\n\n".join(f"## {domain}\n{text}" for domain, text in answers.items())
+    return MERGE_TEMPLATE.format(query=query, answers=blocks,
+                                 missing=f" ({', '.join(missing)})" if missing else "")
+
+
+def concatenate(answers, missing=()):
+    """Partial answers one after another, for when synthesis is unavailable."""
+    text = "\n\n".join(f"## {domain}\n{answer}" for domain, answer in answers.items())
+    if missing:
+        text += f"\n\n(No answer from: {', '.join(missing)})"
+    return text
+
+
+def llm_synthesizer(llm_id=None):
+    """Synthesis function that runs the merge prompt on an LLM through the aixplain SDK."""
+    model = None
+    lock = threading.Lock()
+
+    def synthesize(prompt):
+        nonlocal model
+        with lock:
+            if model is None:
+                from aixplain.factories import ModelFactory
+
+                from agent_registry import DEFAULT_LLM_ID
+
+                model = ModelFactory.get(llm_id or DEFAULT_LLM_ID)
+        return model.run(prompt)
+
+    return synthesize
+
+
+class FanOut:
+    """Asks the specialists concurrently and merges their answers.
+
+    ask(domain, prompt, **context) sends a sub-prompt to a specialist and
+    synthesize(prompt) runs the merge; both may return {"error": ...}.
+    """
+
+    def __init__(self, ask, synthesize, deadline=60.0, domains=DOMAINS, max_workers=16, queue_timeout=None):
+        self.ask = ask
+        self.synthesize = synthesize
+        self.deadline = deadline
+        self.queue_timeout = deadline if queue_timeout is None else queue_timeout
+        self.domains = list(domains)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+
+    def _ask(self, domain, prompt, context, started):
+        started[domain] = time.monotonic()
+        response = self.ask(domain, prompt, **context)
+        return response, time.monotonic() - started[domain]
+
+    def _wait(self, futures, started, submitted):
+        """Wait until every call is done, has run for deadline, or sat queued for queue_timeout."""
+        def due(domain):
+            start = started.get(domain)
+            return submitted + self.queue_timeout if start is None else start + self.deadline
+
+        while True:
+            now = time.monotonic()
+            waiting = [domain for domain, future in futures.items() if not future.done() and due(domain) > now]
+            if not waiting:
+                return
+            wait([futures[domain] for domain in waiting], timeout=min(due(domain) for domain in waiting) - now,
+                 return_when=FIRST_COMPLETED)
+
+    def run(self, query, **context):
+        """Merged answer as {"data": {"output": text}, "specialists": {domain: status}}.
+
+        context (e.g. village_id, teacher_id) is passed on to every ask().
+        """
+        metrics = get_metrics()
+        with span("fan_out"):
+            started, submitted = {}, time.monotonic()
+            futures = {domain: self.executor.submit(self._ask, domain, prompt, context, started)
+                       for domain, prompt in sub_prompts(query, self.domains).items()}
+            self._wait(futures, started, submitted)
+
+            answers, specialists = {}, {}
+            for domain, future in futures.items():
+                if not future.done() and future.cancel():
+                    specialists[domain] = {"status": "timeout", "error": "not started within the queue timeout"}
+                elif not future.done():
+                    specialists[domain] = {"status": "timeout"}
+                elif future.exception() is not None:
+                    specialists[domain] = {"status": "failed", "error": str(future.exception())}
+                else:
+                    response, seconds = future.result()
+                    if is_failure(response):
+                        specialists[domain] = {"status": "failed", "error": error_text(response)}
+                    else:
+                        answers[domain] = answer_text(response)
+                        specialists[domain] = {"status": "ok", "seconds": round(seconds, 3)}
+                metrics.inc("fan_out_specialists_total", domain=domain, status=specialists[domain]["status"])
+
+            missing = [domain for domain in self.domains if domain not in answers]
+            if not answers:
+                return {"error": "No specialist answered in time", "specialists": specialists}
+            try:
+                with span("fan_out_merge"):
+                    merged = self.synthesize(merge_prompt(query, answers, missing))
+                if is_failure(merged):
+                    raise RuntimeError(error_text(merged))
+                output = answer_text(merged)
+            except Exception as e:
+                metrics.inc("fan_out_merge_failures_total")
+                print(f"Synthesis failed ({e}); returning the specialist answers as they are")
+                output = concatenate(answers, missing)
+        return {"data": {"output": output}, "specialists": specialists}
+
+    def close(self):
+        """Stop the pool; queued calls are dropped and running ones finish in the background."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
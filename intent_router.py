@@ -0,0 +1,307 @@
+"""Local intent router for full_cycle queries.
+
+full_cycle queries go to the Rural Education Team agent, whose orchestrator
+spends one or more LLM round trips just choosing a specialist. Most such
+queries are clearly about one domain ("which incentives are available..."),
+so the router classifies them locally and sends confident single-domain
+queries straight to the specialist agent, escalating only ambiguous or
+multi-domain ones to the team.
+
+Classification is CPU-only: keyword rules per domain plus a TF-IDF
+(unigrams and bigrams) softmax regression trained on labeled example
+prompts, including multi-domain ones labeled full_cycle. Every decision is
+counted under route_decisions_total{target, reason} with its confidence,
+and optionally appended to a JSON lines log, so the team hops saved can be
+read off.
+
+    python intent_router.py "Which incentives are available for new teachers?"
+    python intent_router.py --file queries.jsonl
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from metrics import get_metrics
+
+DOMAINS = ["recruitment", "training", "incentives", "community", "progress"]
+TEAM_ACTION = "full_cycle"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Village, teacher and student ids (v001, t004, ...) and plain numbers say nothing about the domain
+ID_PATTERN = re.compile(r"[a-z]?\d+")
+
+# Function words that say nothing about the domain either
+STOPWORDS = frozenset("""
+a about all an and any are as at be by can could do does for from get give had has have he her his how i
+if in is it its me my of on or our please should she so tell than that the their them there these they
+this to us was we were what when where which who whom why will with would you your
+""".split())
+
+# Terms that on their own point at a domain
+KEYWORDS = {
+    "recruitment": ["recruit", "recruitment", "hire", "hiring", "candidate", "candidates", "vacancy",
+                    "qualified", "shortlist", "applicant", "applicants"],
+    "training": ["training", "train", "mentor", "mentorship", "pedagogy", "lesson", "lessons",
+                 "teaching method", "teaching methods", "workshop", "module", "modules", "curriculum"],
+    "incentives": ["incentive", "incentives", "reward", "rewards", "scholarship", "scholarships", "ration",
+                   "rations", "seeds", "farming tools", "allocate", "allocation", "compensation"],
+    "community": ["community", "parent", "parents", "parental", "elder", "elders", "village meeting",
+                  "meeting", "leader", "leaders", "awareness", "outreach", "notice"],
+    "progress": ["progress", "attendance", "score", "scores", "outcome", "outcomes", "performance",
+                 "improvement", "report", "dropout", "trend", "trends", "results"]
+}
+
+# Phrases that ask for a plan across domains
+MULTI_DOMAIN_CUES = ["implementation plan", "end to end", "new district", "expand", "expansion",
+                     "overall strategy", "every aspect", "all aspects", "whole program", "full cycle",
+                     "roadmap", "launch the program"]
+
+# Labeled example prompts the model is trained on
+EXAMPLES = [
+    ("Find qualified female teachers for mathematics education", "recruitment"),
+    ("Which candidates with a bachelor's degree could teach science in V003?", "recruitment"),
+    ("Shortlist educated youth who can become part-time teachers", "recruitment"),
+    ("We need two more English teachers for the primary school, who should we approach?", "recruitment"),
+    ("Recruit women with high school education to teach in their home village", "recruitment"),
+    ("Who are the most suitable teaching candidates near village V010?", "recruitment"),
+    ("Suggest interactive mathematics teaching methods for a classroom with no electricity", "training"),
+    ("What training modules should a new teacher complete first?", "training"),
+    ("How can I mentor a teacher struggling with a mixed-age classroom?", "training"),
+    ("Prepare lesson ideas for teaching science with household items", "training"),
+    ("When is the next pedagogy workshop scheduled and what materials are needed?", "training"),
+    ("Give guidance on teaching reading in the local language", "training"),
+    ("Which incentives are available for teachers who completed three months of teaching?", "incentives"),
+    ("Allocate farming tools and ration kits to active teachers", "incentives"),
+    ("Is teacher T004 eligible for a scholarship?", "incentives"),
+    ("Which rewards are running low in stock?", "incentives"),
+    ("How should we distribute seeds and books fairly among teachers?", "incentives"),
+    ("What non-monetary compensation does T012 prefer?", "incentives"),
+    ("How can we increase parental support for girls' education?", "community"),
+    ("Plan a village meeting with elders about school attendance of girls", "community"),
+    ("Draft a notice for parents about the new school timings", "community"),
+    ("How do we address community concerns about sending daughters to school?", "community"),
+    ("Who is the community leader in V002 and how do we contact them?", "community"),
+    ("Organize an awareness campaign with local leaders", "community"),
+    ("Which students need support with attendance and science scores?", "progress"),
+    ("Which village shows the most improvement in student attendance?", "progress"),
+    ("Create a progress report on math scores for V005", "progress"),
+    ("Are there dropout risks among students in V001?", "progress"),
+    ("Compare learning outcomes across villages this term", "progress"),
+    ("What is the average english score and attendance trend?", "progress"),
+    ("We need to expand our program to a new district with 5 villages, how should we approach it?", TEAM_ACTION),
+    ("Create a complete implementation plan for recruitment, training and incentives", TEAM_ACTION),
+    ("Design an overall strategy covering teachers, parents and student outcomes", TEAM_ACTION),
+    ("How should we launch the program in ten new villages end to end?", TEAM_ACTION),
+    ("Recruit teachers, train them and set up incentives for the new villages", TEAM_ACTION),
+    ("Give me a roadmap for every aspect of the program next year", TEAM_ACTION)
+]
+
+
+def tokenize(text):
+    """Lowercase alphanumeric terms."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def features(tokens):
+    """Unigram and bigram counts."""
+    terms = Counter(tokens)
+    terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return terms
+
+
+def softmax(scores):
+    top = max(scores.values())
+    exp = {label: math.exp(score - top) for label, score in scores.items()}
+    total = sum(exp.values())
+    return {label: value / total for label, value in exp.items()}
+
+
+class TfidfClassifier:
+    """Softmax regression over L2-normalized TF-IDF vectors, trained by gradient descent."""
+
+    def __init__(self, epochs=100, learning_rate=5.0, l2=1e-4):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.labels = []
+        self.idf = {}
+        self.weights = {}
+        self.bias = {}
+
+    def vector(self, text):
+        counts = features(tokenize(text))
+        vector = {term: (1 + math.log(count)) * self.idf[term] for term, count in counts.items() if term in self.idf}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    def fit(self, examples):
+        examples = list(examples)
+        self.labels = sorted({label for _, label in examples})
+        document_frequency = Counter()
+        for text, _ in examples:
+            document_frequency.update(set(features(tokenize(text))))
+        self.idf = {term: math.log((1 + len(examples)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+        vectors = [(self.vector(text), label) for text, label in examples]
+        self.weights = {label: {} for label in self.labels}
+        self.bias = dict.fromkeys(self.labels, 0.0)
+        step = self.learning_rate / len(vectors)
+        for _ in range(self.epochs):
+            gradients = {label: Counter() for label in self.labels}
+            bias_gradients = dict.fromkeys(self.labels, 0.0)
+            for vector, label in vectors:
+                for other, probability in self.predict_vector(vector).items():
+                    error = probability - (other == label)
+                    bias_gradients[other] += error
+                    for term, value in vector.items():
+                        gradients[other][term] += error * value
+            for label in self.labels:
+                weights = self.weights[label]
+                for term, gradient in gradients[label].items():
+                    weights[term] = weights.get(term, 0.0) * (1 - self.learning_rate * self.l2) - step * gradient
+                self.bias[label] -= step * bias_gradients[label]
+        return self
+
+    def predict_vector(self, vector):
+        return softmax({label: self.bias[label] + sum(self.weights[label].get(term, 0.0) * value
+                                                       for term, value in vector.items())
+                        for label in self.labels})
+
+    def predict(self, text):
+        """{label: probability} for a text."""
+        return self.predict_vector(self.vector(text))
+
+
+def content_terms(text):
+    """Terms of a text that can point at a domain: no function words or ids."""
+    return [token for token in tokenize(text) if token not in STOPWORDS and not ID_PATTERN.fullmatch(token)]
+
+
+def keyword_hits(text):
+    """{domain: number of its keywords in text}, and the multi-domain cues found."""
+    padded = " " + " ".join(tokenize(text)) + " "
+    hits = {}
+    for domain, terms in KEYWORDS.items():
+        count = sum(f" {term} " in padded for term in terms)
+        if count:
+            hits[domain] = count
+    cues = [cue for cue in MULTI_DOMAIN_CUES if f" {cue} " in padded]
+    return hits, cues
+
+
+class IntentRouter:
+    """Routes full_cycle queries to one specialist action when confident."""
+
+    def __init__(self, examples=EXAMPLES, threshold=0.5, margin=0.2, keyword_weight=0.3, min_coverage=0.5,
+                 log_path=None):
+        self.threshold = threshold
+        self.margin = margin
+        self.min_coverage = min_coverage
+        self.keyword_weight = keyword_weight
+        self.log_path = log_path
+        self.model = TfidfClassifier().fit(examples)
+        self.lock = threading.Lock()
+        self.decisions = Counter()
+
+    @classmethod
+    def from_file(cls, path, include_defaults=True, **kwargs):
+        """Router trained on a JSON lines file of {query, action_type} (plus the built-in examples)."""
+        with open(path) as f:
+            examples = [(record["query"], record["action_type"])
+                        for record in map(json.loads, filter(str.strip, f))]
+        return cls((EXAMPLES if include_defaults else []) + examples, **kwargs)
+
+    def coverage(self, query):
+        """Share of the query's content terms seen in the training examples (0 when it has none)."""
+        terms = content_terms(query)
+        return sum(term in self.model.idf for term in terms) / len(terms) if terms else 0.0
+
+    def classify(self, query):
+        """Routing decision for a query: {action, confidence, reason, scores}.
+
+        A query is only sent to a specialist on a keyword of that domain or
+        when at least min_coverage of its content terms are known; otherwise
+        the classifier would be scoring function words and ids alone ("What
+        is the weather in V001").
+        """
+        probabilities = self.model.predict(query)
+        hits, cues = keyword_hits(query)
+        scores = {label: probabilities.get(label, 0.0) + self.keyword_weight * min(hits.get(label, 0), 3)
+                  for label in DOMAINS + [TEAM_ACTION]}
+        total = sum(scores.values())
+        scores = {label: round(score / total, 4) for label, score in scores.items()}
+        ranked = sorted(DOMAINS, key=scores.get, reverse=True)
+        best, runner_up = ranked[0], ranked[1]
+        confidence = scores[best]
+
+        if cues:
+            reason = "multi_domain_cue"
+        elif len(hits) >= 3:
+            reason = "multi_domain_keywords"
+        elif scores[TEAM_ACTION] >= confidence:
+            reason = "team_intent"
+        elif best not in hits and self.coverage(query) < self.min_coverage:
+            reason = "unknown_terms"
+        elif confidence < self.threshold:
+            reason = "low_confidence"
+        elif confidence - scores[runner_up] < self.margin:
+            reason = "ambiguous"
+        else:
+            return {"action": best, "confidence": confidence, "reason": "confident", "scores": scores}
+        return {"action": TEAM_ACTION, "confidence": confidence, "reason": reason, "scores": scores}
+
+    def route(self, query, action_type=TEAM_ACTION):
+        """Action to send a query to; only full_cycle queries are rerouted."""
+        if action_type != TEAM_ACTION:
+            return action_type
+        decision = self.classify(query)
+        self.record(query, decision)
+        return decision["action"]
+
+    def record(self, query, decision):
+        metrics = get_metrics()
+        metrics.inc("route_decisions_total", target=decision["action"], reason=decision["reason"])
+        metrics.observe("route_confidence", decision["confidence"], (0.2, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+                        target=decision["action"])
+        with self.lock:
+            self.decisions[decision["action"]] += 1
+            if self.log_path:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(dict(decision, query=query, time=time.time())) + "\n")
+
+    def stats(self):
+        """Decisions per target and the team hops saved by routing to a specialist."""
+        with self.lock:
+            decisions = dict(self.decisions)
+        routed = sum(decisions.values())
+        saved = routed - decisions.get(TEAM_ACTION, 0)
+        return {"decisions": decisions, "routed": routed, "team_hops_saved": saved,
+                "saved_share": round(saved / routed, 4) if routed else 0.0}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show where full_cycle queries would be routed")
+    parser.add_argument("queries", nargs="*", help="queries to classify")
+    parser.add_argument("--file", help="JSON lines file of {query, ...} records to classify")
+    parser.add_argument("--examples", help="extra labeled examples, JSON lines of {query, action_type}")
+    args = parser.parse_args(argv)
+
+    router = IntentRouter.from_file(args.examples) if args.examples else IntentRouter()
+    queries = list(args.queries)
+    if args.file:
+        with open(args.file) as f:
+            queries += [json.loads(line)["query"] for line in f if line.strip()]
+    for query in queries:
+        decision = router.classify(query)
+        router.record(query, decision)
+        print(f"{decision['action']:12} {decision['confidence']:.2f} {decision['reason']:22} {query}")
+    print(router.stats())
+
+
+if __name__ == "__main__":
+    main()
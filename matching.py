@@ -0,0 +1,302 @@
+"""Batch candidate–village matching for the Teacher Recruitment agent.
+
+Scores every candidate against every village in one vectorized pass and
+returns the top-k candidates per village, so the agent is handed a ranked
+shortlist instead of scanning the teacher table itself. A candidate's
+score for a village combines:
+
+- suitability_score and education level of the candidate,
+- how well the candidate's subjects fit the requested subject and the
+  village's needs (village_needs),
+- how much the village needs a teacher (students per existing teacher),
+- proximity: the candidate's home village, or distance when the community
+  table has latitude/longitude columns.
+
+Hard requirements (minimum education, requested subject, gender when the
+data has a gender column) are applied as boolean masks. Villages are
+scored in candidate blocks so memory stays bounded at 100k x 5k.
+"""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+EDUCATION_LEVELS = {
+    "High School": 1,
+    "Associate's": 2,
+    "Bachelor's": 3,
+    "Master's": 4,
+    "Ph.D.": 5
+}
+
+DEFAULT_WEIGHTS = {
+    "suitability": 0.30,
+    "education": 0.10,
+    "subject": 0.20,
+    "needs_fit": 0.15,
+    "village_need": 0.10,
+    "proximity": 0.15
+}
+
+# Words too generic to say anything about a subject or need
+STOPWORDS = {"education", "educational", "studies", "skills", "skill", "and", "of", "the",
+             "teaching", "training", "development", "awareness", "programs", "advanced"}
+
+GENDER_WORDS = {"female": "F", "women": "F", "woman": "F", "girl": "F", "male": "M", "men": "M", "man": "M"}
+
+
+def stems(text):
+    """Normalized subject stems of a text ("Mathematics" and "Math" share "math")."""
+    return {word[:4] for word in re.findall(r"[a-z]+", str(text).lower()) if word not in STOPWORDS}
+
+
+def _per_text(series, func):
+    """Apply func once per distinct text of a column and broadcast the results."""
+    codes, texts = pd.factorize(series.astype(str))
+    return np.array([func(text) for text in texts])[codes] if len(texts) else np.array([])
+
+
+def _stem_matrix(texts, vocabulary):
+    index = {stem: i for i, stem in enumerate(vocabulary)}
+    matrix = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for stem in stems(text):
+            column = index.get(stem)
+            if column is not None:
+                matrix[row, column] = 1.0
+    return matrix
+
+
+def village_need(teachers, community):
+    """Need for another teacher per village, scaled to [0, 1]."""
+    villages = community["village_id"].astype(str)
+    staffed = teachers["village_id"].astype(str).value_counts().reindex(villages, fill_value=0).to_numpy()
+    if "students_count" in community.columns:
+        students = community["students_count"].astype("float64").fillna(0).to_numpy()
+    else:
+        students = np.ones(len(community))
+    need = students / (1.0 + staffed)
+    return need / need.max() if need.max() > 0 else need
+
+
+def _has_coordinates(teachers, community):
+    columns = {"latitude", "longitude"}
+    return columns <= set(teachers.columns) and columns <= set(community.columns)
+
+
+def _proximity(candidates, community, home_codes, rows):
+    """Proximity of the given candidates to every village, in [0, 1]."""
+    if _has_coordinates(candidates, community):
+        lat1 = np.radians(candidates["latitude"].to_numpy(dtype="float64")[rows, None])
+        lon1 = np.radians(candidates["longitude"].to_numpy(dtype="float64")[rows, None])
+        lat2 = np.radians(community["latitude"].to_numpy(dtype="float64")[None, :])
+        lon2 = np.radians(community["longitude"].to_numpy(dtype="float64")[None, :])
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        km = 6371 * 2 * np.arcsin(np.sqrt(a))
+        return np.exp(-km / 10.0).astype(np.float32)
+    return (home_codes[rows, None] == np.arange(len(community))[None, :]).astype(np.float32)
+
+
+def _top_per_pattern(pattern, candidate_terms, k):
+    """Indexes of the k best candidates (by candidate_terms) per stem pattern."""
+    order = np.lexsort((-candidate_terms, pattern))
+    starts = np.flatnonzero(np.r_[True, np.diff(pattern[order]) != 0])
+    position = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return np.sort(order[position < k])
+
+
+def candidate_mask(teachers, subject=None, min_education=None, gender=None):
+    """Boolean mask of candidates meeting the hard requirements.
+
+    The gender requirement is only applied when the data has a gender
+    column; the second return value says whether it was.
+    """
+    mask = np.ones(len(teachers), dtype=bool)
+    if min_education:
+        levels = teachers["education_level"].astype(str).map(EDUCATION_LEVELS).fillna(0).to_numpy()
+        mask &= levels >= EDUCATION_LEVELS[min_education]
+    if subject:
+        wanted = stems(subject)
+        mask &= _per_text(teachers["subjects"], lambda text: bool(stems(text) & wanted)).astype(bool)
+    gender_applied = False
+    if gender and "gender" in teachers.columns:
+        mask &= teachers["gender"].astype(str).str.upper().str[0].to_numpy() == gender[0].upper()
+        gender_applied = True
+    return mask, gender_applied
+
+
+def match_candidates(teachers, community, subject=None, min_education=None, gender=None,
+                     top_k=5, weights=None, block_size=2048):
+    """Top-k candidates per village.
+
+    Returns a DataFrame of (village_id, rank, teacher_id, score) and a dict
+    of notes (e.g. whether the gender filter could be applied).
+    """
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    mask, gender_applied = candidate_mask(teachers, subject, min_education, gender)
+    candidates = teachers[mask].reset_index(drop=True)
+    villages = community["village_id"].astype(str).to_numpy()
+    n_villages = len(villages)
+    notes = {"candidates": int(mask.sum()), "gender_filter_applied": gender_applied}
+    if gender and not gender_applied:
+        notes["gender_filter_skipped"] = "teacher data has no gender column"
+    if candidates.empty or n_villages == 0:
+        return pd.DataFrame(columns=["village_id", "rank", "teacher_id", "score"]), notes
+
+    # Per-candidate terms
+    suitability = candidates["suitability_score"].to_numpy(dtype=np.float32)
+    education = candidates["education_level"].astype(str).map(EDUCATION_LEVELS).fillna(0).to_numpy(np.float32)
+    education /= max(EDUCATION_LEVELS.values())
+    if subject:
+        wanted = stems(subject)
+        subject_fit = _per_text(candidates["subjects"], lambda text: len(stems(text) & wanted) / len(wanted))
+        subject_fit = subject_fit.astype(np.float32)
+    else:
+        subject_fit = np.zeros(len(candidates), dtype=np.float32)
+    candidate_terms = (weights["suitability"] * suitability + weights["education"] * education
+                       + weights["subject"] * subject_fit)
+
+    # Per-village terms
+    need = (weights["village_need"] * village_need(teachers, community)).astype(np.float32)
+    # A village's needs are the union of the needs recorded by its teachers
+    needs = teachers[["village_id", "village_needs"]].astype(str).drop_duplicates()
+    needs = needs[needs["village_id"].isin(villages)]
+    need_codes, need_texts = pd.factorize(needs["village_needs"])
+    vocabulary = sorted(set().union(*(stems(text) for text in need_texts)))
+    village_stems = np.zeros((n_villages, len(vocabulary)), dtype=np.float32)
+    village_codes = pd.Categorical(needs["village_id"], categories=villages).codes
+    np.maximum.at(village_stems, village_codes, _stem_matrix(need_texts, vocabulary)[need_codes])
+    village_stems /= np.maximum(village_stems.sum(axis=1, keepdims=True), 1.0)
+    subject_codes, subject_texts = pd.factorize(candidates["subjects"].astype(str))
+    subject_stems = _stem_matrix(subject_texts, vocabulary)
+    candidate_stems = subject_stems[subject_codes]
+    home_codes = pd.Categorical(candidates["village_id"].astype(str), categories=villages).codes
+
+    if _has_coordinates(candidates, community):
+        pool = np.arange(len(candidates))
+    else:
+        # Away from home a candidate's score differs between villages only
+        # through their subject stems, so only the k best candidates per
+        # distinct stem pattern can make any village's top k; home villages
+        # are scored separately below.
+        _, pattern = np.unique(subject_stems, axis=0, return_inverse=True)
+        pool = _top_per_pattern(pattern.ravel()[subject_codes], candidate_terms, top_k)
+
+    # Running top-k per village across candidate blocks
+    k = min(top_k, len(pool))
+    best_scores = np.full((k, n_villages), -np.inf, dtype=np.float32)
+    best_index = np.zeros((k, n_villages), dtype=np.int64)
+    for start in range(0, len(pool), block_size):
+        rows = pool[start:start + block_size]
+        scores = candidate_terms[rows, None] + need[None, :]
+        scores += weights["needs_fit"] * (candidate_stems[rows] @ village_stems.T)
+        scores += weights["proximity"] * _proximity(candidates, community, home_codes, rows)
+        merged_scores = np.vstack([best_scores, scores])
+        merged_index = np.vstack([best_index, np.broadcast_to(rows[:, None], scores.shape)])
+        top = np.argpartition(-merged_scores, k - 1, axis=0)[:k]
+        best_scores = np.take_along_axis(merged_scores, top, axis=0)
+        best_index = np.take_along_axis(merged_index, top, axis=0)
+
+    scored = pd.DataFrame({
+        "village": np.tile(np.arange(n_villages), k),
+        "candidate": best_index.ravel(),
+        "score": best_scores.ravel()
+    })
+    if not _has_coordinates(candidates, community):
+        home = np.flatnonzero(home_codes >= 0)
+        village = home_codes[home]
+        home_scores = (candidate_terms[home] + need[village] + weights["proximity"]
+                       + weights["needs_fit"] * (candidate_stems[home] * village_stems[village]).sum(axis=1))
+        scored = pd.concat([scored, pd.DataFrame({"village": village, "candidate": home, "score": home_scores})],
+                           ignore_index=True)
+
+    scored = scored[np.isfinite(scored["score"])].drop_duplicates(["village", "candidate"])
+    scored = scored.sort_values(["village", "score"], ascending=[True, False], kind="stable")
+    scored = scored.groupby("village", sort=False).head(top_k)
+    matches = pd.DataFrame({
+        "village_id": villages[scored["village"].to_numpy()],
+        "rank": scored.groupby("village", sort=False).cumcount().to_numpy() + 1,
+        "teacher_id": candidates["teacher_id"].astype(str).to_numpy()[scored["candidate"].to_numpy()],
+        "score": scored["score"].to_numpy().round(4)
+    })
+    return matches, notes
+
+
+def parse_requirements(query):
+    """Pull subject, minimum education and gender requirements out of a query."""
+    text = query.lower()
+    requirements = {"subject": None, "min_education": None, "gender": None}
+    for word, gender in GENDER_WORDS.items():
+        if re.search(rf"\b{word}\b", text):
+            requirements["gender"] = gender
+            break
+    for level in sorted(EDUCATION_LEVELS, key=EDUCATION_LEVELS.get):
+        if level.lower().rstrip("'s.").replace(".", "") in text.replace(".", ""):
+            requirements["min_education"] = level
+            break
+    match = re.search(r"teach(?:ers?|ing)?\s+(?:for\s+)?([a-z ]+?)(?:\s+(?:education|in|for|to)\b|[.,?]|$)", text)
+    if match:
+        requirements["subject"] = match.group(1).strip() or None
+    return requirements
+
+
+def summarize_matches(matches, notes, teachers, village_id=None, max_villages=5):
+    """Render a shortlist as a few lines of text for a prompt."""
+    if matches.empty:
+        return f"No candidates meet the requirements ({notes})."
+    if village_id is not None:
+        matches = matches[matches["village_id"] == str(village_id)]
+    else:
+        best = matches[matches["rank"] == 1].nlargest(max_villages, "score")["village_id"]
+        matches = matches[matches["village_id"].isin(best)]
+    details = teachers.assign(teacher_id=teachers["teacher_id"].astype(str)).set_index("teacher_id")
+    columns = [c for c in ["name", "education_level", "subjects", "village_id"] if c in details.columns]
+    shortlist = matches.join(details[columns].add_prefix("candidate_"), on="teacher_id")
+    lines = [f"Matching notes: {notes}", shortlist.to_csv(index=False).strip()]
+    return "\n".join(lines)
+
+
+TOOL_TEMPLATE = '''def recruitment_matches(village_id: str = "") -> str:
+    """Ranked teacher candidates per village, scored on suitability,
+    education, subject fit with village needs, village need and proximity.
+    Pass a village_id (e.g. V001) for that village's shortlist."""
+    import json
+    data = json.loads({payload!r})
+    if village_id:
+        return json.dumps(data.get(village_id, []))
+    return json.dumps({{v: rows[:1] for v, rows in data.items()}})
+'''
+
+
+def tool_source(matches):
+    """Source of a self-contained tool function embedding a shortlist."""
+    payload = {
+        village: group[["rank", "teacher_id", "score"]].to_dict(orient="records")
+        for village, group in matches.groupby("village_id", sort=True)
+    }
+    return TOOL_TEMPLATE.format(payload=json.dumps(payload))
+
+
+TOOL_DESCRIPTION = "Returns ranked teacher candidates per village with match scores"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from retrain_agents import load_data
+
+    parser = argparse.ArgumentParser(description="Rank teacher candidates for each village")
+    parser.add_argument("--data-dir", default="SampleData")
+    parser.add_argument("--subject")
+    parser.add_argument("--min-education", choices=list(EDUCATION_LEVELS))
+    parser.add_argument("--gender")
+    parser.add_argument("--village-id")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    data_frames = load_data(args.data_dir)
+    teachers = data_frames["teacher_data"]
+    matches, notes = match_candidates(teachers, data_frames["community_data"], args.subject,
+                                      args.min_education, args.gender, args.top_k)
+    print(summarize_matches(matches, notes, teachers, args.village_id))
@@ -0,0 +1,222 @@
+"""Content-addressed cache for translation and speech-synthesis calls.
+
+The Community Engagement and Training agents send the same notices and
+lesson texts through the translation (OPUS-MT) and text-to-speech models
+for every village and every run. MediaCache sits in front of those model
+calls: outputs are keyed by the hash of (model id, source text, target
+language or voice), translations are stored in a SQLite index and audio as
+files next to it, and the least recently used entries are evicted once
+the cache grows past max_bytes.
+
+Translation misses are deduplicated and batched: short single-line texts
+for the same language pair are joined into one request of up to
+max_batch_chars and split back line by line, so a notice sent to 500
+villages that share a language costs one translation.
+
+    cache = MediaCache()
+    by_village = cache.localize(notice, {"V001": "hi", "V002": "hi", "V003": "ta"})
+    audio_path = cache.synthesize(by_village["V001"], voice="hi")
+
+Model calls go through run_model(model_id, payload), which defaults to the
+aixplain SDK; pass a different one to use a local stub.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import get_metrics, span
+
+MEDIA_CACHE_DIR = ".media_cache"
+TRANSLATION_MODEL_ID = "61b097551efecf30109d32da"  # aiXplain - Translation (OPUS-MT)
+SPEECH_MODEL_ID = "6171efa6159531495cadefc2"  # aiXplain - Text to Speech
+BATCH_SEPARATOR = "\n"
+
+
+def media_key(model_id, text, target):
+    """Key of a model output for a source text and target language or voice."""
+    payload = "\x1f".join([model_id, text.strip(), target or ""])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def aixplain_run(model_id, payload):
+    """Run a model through the aixplain SDK and return its output data."""
+    from aixplain.factories import ModelFactory
+
+    result = ModelFactory.get(model_id).run(payload)
+    data = result.get("data") if isinstance(result, dict) else getattr(result, "data", result)
+    if data is None:
+        raise RuntimeError(f"Model {model_id} returned no data: {result}")
+    return data
+
+
+def download(url):
+    """Bytes at a URL (speech models return a link to the audio file)."""
+    import requests
+
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+class MediaCache:
+    """Translation and speech outputs cached by content hash, bounded in bytes."""
+
+    def __init__(self, path=MEDIA_CACHE_DIR, max_bytes=512 * 1024 * 1024, run_model=aixplain_run,
+                 fetch=download, translation_model=TRANSLATION_MODEL_ID, speech_model=SPEECH_MODEL_ID,
+                 max_batch_chars=4000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.run_model = run_model
+        self.fetch = fetch
+        self.translation_model = translation_model
+        self.speech_model = speech_model
+        self.max_batch_chars = max_batch_chars
+        self.model_calls = 0
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " key TEXT PRIMARY KEY, kind TEXT, last_access REAL, size INTEGER, value TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS media_lru ON media (last_access)")
+        self.db.commit()
+
+    # -- index ------------------------------------------------------------
+
+    def _get(self, key, kind):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM media WHERE key = ?", (key,)).fetchone()
+            if row is not None and kind == "speech" and not os.path.exists(self._file(row[0])):
+                self.db.execute("DELETE FROM media WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self.db.execute("UPDATE media SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        get_metrics().record_cache(kind, row is not None)
+        return None if row is None else row[0]
+
+    def _put(self, key, kind, value, size):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?)",
+                            (key, kind, time.time(), size, value))
+            self._evict(key)
+            self.db.commit()
+
+    def _evict(self, keep):
+        """Drop least recently used entries until under max_bytes, never the one just stored.
+
+        An entry larger than max_bytes on its own is kept until the next put,
+        so the path synthesize() returns always exists.
+        """
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM media").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, kind, size, value in self.db.execute(
+                "SELECT key, kind, size, value FROM media WHERE key != ? ORDER BY last_access",
+                (keep,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM media WHERE key = ?", (key,))
+            if kind == "speech" and os.path.exists(self._file(value)):
+                os.remove(self._file(value))
+            total -= size
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _call(self, kind, model_id, payload):
+        with self.lock:
+            self.model_calls += 1
+        with span("media_model", kind=kind):
+            return self.run_model(model_id, payload)
+
+    # -- translation ------------------------------------------------------
+
+    def translate(self, texts, target, source="en"):
+        """Translations of texts into target, in order; only uncached distinct texts are sent."""
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        target_key = f"{source}>{target}"
+        results, missing = {}, []
+        for text in dict.fromkeys(texts):
+            cached = self._get(media_key(self.translation_model, text, target_key), "translation")
+            if cached is None:
+                missing.append(text)
+            else:
+                results[text] = cached
+        for batch in self._batches(missing):
+            for text, translated in zip(batch, self._translate_batch(batch, source, target)):
+                results[text] = translated
+                self._put(media_key(self.translation_model, text, target_key), "translation",
+                          translated, len(translated.encode()))
+        translated = [results[text] for text in texts]
+        return translated[0] if single else translated
+
+    def _batches(self, texts):
+        """Group texts into requests of up to max_batch_chars; multi-line texts go alone."""
+        batch, size = [], 0
+        for text in texts:
+            if BATCH_SEPARATOR in text.strip():
+                yield [text]
+                continue
+            if batch and size + len(text) + 1 > self.max_batch_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += len(text) + 1
+        if batch:
+            yield batch
+
+    def _translate_batch(self, batch, source, target):
+        payload = {"sourcelanguage": source, "targetlanguage": target}
+        output = self._call("translation", self.translation_model,
+                            dict(payload, data=BATCH_SEPARATOR.join(text.strip() for text in batch)))
+        lines = str(output).split(BATCH_SEPARATOR) if len(batch) > 1 else [str(output)]
+        if len(lines) == len(batch):
+            return [line.strip() for line in lines]
+        # The model merged or split lines; translate one by one instead
+        return [str(self._call("translation", self.translation_model, dict(payload, data=text.strip())))
+                for text in batch]
+
+    def localize(self, text, languages, source="en"):
+        """{recipient: text in their language} for {recipient: language}; one call per language."""
+        translations = {language: text if language == source else self.translate(text, language, source)
+                        for language in set(languages.values())}
+        return {recipient: translations[language] for recipient, language in languages.items()}
+
+    # -- speech -----------------------------------------------------------
+
+    def synthesize(self, text, voice=None, extension="mp3"):
+        """Path of an audio file with text spoken in voice, synthesized at most once."""
+        key = media_key(self.speech_model, text, voice)
+        name = self._get(key, "speech")
+        if name is not None:
+            return self._file(name)
+        payload = {"data": text.strip()}
+        if voice:
+            payload["voice"] = voice
+        output = self._call("speech", self.speech_model, payload)
+        audio = output if isinstance(output, bytes) else self.fetch(output)
+        name = f"{key}.{extension}"
+        tmp_path = self._file(f"{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, self._file(name))
+        self._put(key, "speech", name, len(audio))
+        return self._file(name)
+
+    def stats(self):
+        """Model calls made by this instance and the stored entries and bytes by kind."""
+        with self.lock:
+            rows = self.db.execute("SELECT kind, COUNT(*), SUM(size) FROM media GROUP BY kind").fetchall()
+            model_calls = self.model_calls
+        return {"model_calls": model_calls,
+                "entries": {kind: count for kind, count, _ in rows},
+                "bytes": sum(size for _, _, size in rows)}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
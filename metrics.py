@@ -0,0 +1,291 @@
+"""Timings, sizes and cache counters for the hot paths.
+
+Spans time an operation (data loading, context rendering, and agent API
+calls such as AgentFactory.get/create and agent.run/update/deploy, all
+under "agent_api" with an op label) into a latency histogram per
+operation and labels. Counters record prompt bytes and estimated tokens per agent and
+hits and misses per cache, so hit rates can be read off at the end of a
+run.
+
+Exporters are pluggable: PrometheusExporter rewrites a text-format file on
+flush(), and JsonLinesExporter appends every span as it finishes plus a
+snapshot on flush(). The process-wide instance from get_metrics() is
+configured from METRICS_PROMETHEUS_FILE and METRICS_JSONL_FILE and flushed
+at exit. profile() wraps a run in cProfile and dumps the stats to a file.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, count at or below it) pairs, ending with +Inf."""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by name and labels."""
+
+    def __init__(self, exporters=None):
+        self.exporters = list(exporters or [])
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time a block into the <name>_seconds histogram; errors also count in <name>_errors_total."""
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe(f"{name}_seconds", seconds, **labels)
+            event = {"type": "span", "name": name, "labels": labels, "seconds": round(seconds, 6),
+                     "ok": ok, "time": time.time()}
+            for exporter in self.exporters:
+                exporter.event(event)
+
+    def instrumented(self, fn, name, **labels):
+        """fn wrapped in a span."""
+        def call(*args, **kwargs):
+            with self.span(name, **labels):
+                return fn(*args, **kwargs)
+        return call
+
+    def record_prompt(self, agent, text, kind="query"):
+        """Count the bytes and estimated tokens of a prompt or description sent to an agent."""
+        from tokens import estimate_tokens
+
+        tokens = estimate_tokens(text)
+        self.inc("prompt_bytes_total", len(text.encode()), agent=agent, kind=kind)
+        self.inc("prompt_tokens_total", tokens, agent=agent, kind=kind)
+        self.observe("prompt_tokens", tokens, TOKEN_BUCKETS, agent=agent, kind=kind)
+
+    def record_cache(self, cache, hit):
+        self.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+    def hit_rates(self):
+        """{cache: share of requests that hit}."""
+        totals = {}
+        for (name, labels), value in list(self.counters.items()):
+            if name != "cache_requests_total":
+                continue
+            labels = dict(labels)
+            hits, requests = totals.get(labels["cache"], (0, 0))
+            totals[labels["cache"]] = (hits + (value if labels["result"] == "hit" else 0), requests + value)
+        return {cache: round(hits / requests, 4) for cache, (hits, requests) in totals.items() if requests}
+
+    def snapshot(self):
+        """All counters and histogram summaries as plain data."""
+        with self.lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self.counters.items()]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": round(h.sum, 6)}
+                          for (name, labels), h in self.histograms.items()]
+        return {"counters": counters, "histograms": histograms, "hit_rates": self.hit_rates()}
+
+    def flush(self):
+        for exporter in self.exporters:
+            exporter.flush(self)
+
+    def close(self):
+        """Flush, then release the exporters' files."""
+        self.flush()
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+def prometheus_text(metrics):
+    """Render metrics in the Prometheus text exposition format."""
+    lines = []
+    with metrics.lock:
+        counters = sorted(metrics.counters.items())
+        histograms = sorted(metrics.histograms.items(), key=lambda item: item[0])
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels_text(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_labels_text(labels, [('le', le)])} {count}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels_text(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter:
+    """Rewrites a Prometheus text-format file on every flush."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def event(self, event):
+        pass
+
+    def flush(self, metrics):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(prometheus_text(metrics))
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        pass
+
+
+class JsonLinesExporter:
+    """Appends every span, and a snapshot on flush, to a JSON lines file.
+
+    The file stays open (line-buffered) until close(), so a span costs one
+    write rather than an open and close.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", buffering=1)
+            self.file.write(line)
+
+    def event(self, event):
+        self._write(event)
+
+    def flush(self, metrics):
+        self._write(dict(metrics.snapshot(), type="snapshot", time=time.time()))
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+@contextmanager
+def profile(path=None):
+    """Run a block under cProfile and dump the stats to path (no-op without a path)."""
+    if not path:
+        yield None
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def _exporters(prometheus_path=None, jsonl_path=None):
+    exporters = []
+    if prometheus_path:
+        exporters.append(PrometheusExporter(prometheus_path))
+    if jsonl_path:
+        exporters.append(JsonLinesExporter(jsonl_path))
+    return exporters
+
+
+def configure(prometheus_path=None, jsonl_path=None):
+    """Replace the process-wide metrics with ones exporting to the given files."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is not None:
+            _metrics.close()
+        _metrics = Metrics(_exporters(prometheus_path, jsonl_path))
+        return _metrics
+
+
+def get_metrics():
+    """Return the process-wide metrics, configured from the environment on first use."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(_exporters(os.environ.get("METRICS_PROMETHEUS_FILE"),
+                                          os.environ.get("METRICS_JSONL_FILE")))
+        return _metrics
+
+
+@atexit.register
+def _flush_at_exit():
+    if _metrics is not None:
+        _metrics.close()
+
+
+def span(name, **labels):
+    """Span on the process-wide metrics."""
+    return get_metrics().span(name, **labels)
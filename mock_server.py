@@ -0,0 +1,318 @@
+"""Local stand-in for the aiXplain agent endpoints.
+
+Serves agent create/get/list/update/deploy/delete/run over HTTP with configurable
+latency, error rate and token accounting, so the retrain, deploy and query
+paths can be measured and regression-tested without the live platform.
+
+    python mock_server.py --port 8900 --latency-ms 400 --error-rate 0.02
+
+Point AgentClient at it with AIXPLAIN_BASE_URL=http://127.0.0.1:8900. Code
+that goes through the aixplain SDK (retrain_agents, reconciler) can be run
+against it with install_mock_sdk(url), which swaps the SDK's factories for
+thin HTTP clients of this server.
+"""
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Same estimate as the context budgeter, so mock accounting matches the budgets
+from tokens import estimate_tokens
+
+
+class MockBackend:
+    """State and behaviour of the mock platform."""
+
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, error_rate=0.0,
+                 completion_tokens=150, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.completion_tokens = completion_tokens
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.agents = {}
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {
+                "calls": {},
+                "errors": 0,
+                "prompt_bytes": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "description_bytes": 0
+            }
+
+    def _count(self, endpoint):
+        with self.lock:
+            self.stats["calls"][endpoint] = self.stats["calls"].get(endpoint, 0) + 1
+
+    def delay(self):
+        """Sleep for the configured latency and decide whether to fail."""
+        with self.lock:
+            latency = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms))
+            fail = self.random.random() < self.error_rate
+        time.sleep(latency / 1000)
+        if fail:
+            with self.lock:
+                self.stats["errors"] += 1
+        return fail
+
+    def create(self, payload):
+        self._count("create")
+        agent_id = f"mock{next(self.ids):06d}"
+        with self.lock:
+            self.agents[agent_id] = dict(payload, id=agent_id, status="draft")
+            self.stats["description_bytes"] += len(payload.get("description", "").encode())
+        return self.agents[agent_id]
+
+    def get(self, agent_id):
+        self._count("get")
+        with self.lock:
+            if agent_id not in self.agents:
+                # Unknown ids behave like agents deployed before the mock started
+                self.agents[agent_id] = {"id": agent_id, "name": agent_id, "description": "", "status": "onboarded"}
+            return self.agents[agent_id]
+
+    def search(self, payload):
+        self._count("list")
+        query = payload.get("query") or ""
+        with self.lock:
+            return {"results": [agent for agent in self.agents.values() if query in (agent.get("name") or "")]}
+
+    def update(self, agent_id, payload):
+        self._count("update")
+        with self.lock:
+            agent = self.agents.setdefault(agent_id, {"id": agent_id})
+            agent.update(payload)
+            self.stats["description_bytes"] += len(payload.get("description", "").encode())
+            return agent
+
+    def deploy(self, agent_id):
+        self._count("deploy")
+        with self.lock:
+            self.agents.setdefault(agent_id, {"id": agent_id})["status"] = "onboarded"
+            return self.agents[agent_id]
+
+    def delete(self, agent_id):
+        self._count("delete")
+        with self.lock:
+            self.agents.pop(agent_id, None)
+        return {"id": agent_id, "deleted": True}
+
+    def run(self, agent_id, payload):
+        self._count("run")
+        prompt = payload.get("prompt", "")
+        prompt_tokens = estimate_tokens(prompt)
+        with self.lock:
+            self.stats["prompt_bytes"] += len(prompt.encode())
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += self.completion_tokens
+        return {
+            "completed": True,
+            "data": {"output": f"[mock {agent_id}] answer to: {prompt[:80]}"},
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": self.completion_tokens}
+        }
+
+
+ROUTES = [
+    ("POST", re.compile(r"^/agents$"), "create"),
+    ("POST", re.compile(r"^/agents/search$"), "search"),
+    ("GET", re.compile(r"^/agents/([^/]+)$"), "get"),
+    ("POST", re.compile(r"^/agents/([^/]+)/update$"), "update"),
+    ("POST", re.compile(r"^/agents/([^/]+)/deploy$"), "deploy"),
+    ("DELETE", re.compile(r"^/agents/([^/]+)$"), "delete"),
+    ("POST", re.compile(r"^/agents/([^/]+)/run$"), "run")
+]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        backend = self.server.backend
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length)) if length else {}
+
+        if self.path == "/stats":
+            if method == "DELETE":
+                backend.reset_stats()
+            return self._send(200, backend.stats)
+
+        for route_method, pattern, action in ROUTES:
+            match = pattern.match(self.path)
+            if route_method != method or not match:
+                continue
+            if backend.delay():
+                return self._send(503, {"error": "mock upstream error"})
+            handler = getattr(backend, action)
+            args = match.groups()
+            if action in ("create", "search", "update", "run"):
+                args += (payload,)
+            return self._send(200, handler(*args))
+        self._send(404, {"error": f"no route for {method} {self.path}"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, **config):
+    """Start the mock server on a background thread.
+
+    Returns the server; server.url is its base URL and server.backend its
+    state. Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.backend = MockBackend(**config)
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class MockAgent:
+    """SDK-shaped agent handle backed by the mock server."""
+
+    def __init__(self, client, data):
+        self._client = client
+        self.id = data["id"]
+        self.name = data.get("name")
+        self.description = data.get("description", "")
+        self.llm_id = data.get("llm_id")
+        self.tools = data.get("tools", [])
+        self.agents = data.get("agents", [])
+
+    def run(self, prompt, **kwargs):
+        return self._client.call("POST", f"/agents/{self.id}/run", {"prompt": prompt})
+
+    def update(self):
+        self._client.call("POST", f"/agents/{self.id}/update", {
+            "name": self.name,
+            "description": self.description,
+            "llm_id": self.llm_id,
+            "tools": [getattr(tool, "model", str(tool)) for tool in self.tools or []]
+        })
+
+    def deploy(self):
+        self._client.call("POST", f"/agents/{self.id}/deploy")
+        return self.id
+
+    def delete(self):
+        self._client.call("DELETE", f"/agents/{self.id}")
+
+
+class MockClient:
+    """Pooled HTTP session to the mock server."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+
+    def call(self, method, path, payload=None):
+        response = self.session.request(method, self.base_url + path, json=payload, timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+
+def install_mock_sdk(base_url):
+    """Replace the aixplain SDK modules with clients of the mock server.
+
+    Modules that import AgentFactory, TeamAgentFactory or ModelTool after
+    this call get the mock versions. Returns the MockClient in use.
+    """
+    client = MockClient(base_url)
+
+    class MockAgentFactory:
+        @staticmethod
+        def get(agent_id):
+            return MockAgent(client, client.call("GET", f"/agents/{agent_id}"))
+
+        @staticmethod
+        def list(query=None, **kwargs):
+            data = client.call("POST", "/agents/search", {"query": query})
+            return {"results": [MockAgent(client, agent) for agent in data["results"]]}
+
+        @staticmethod
+        def create(name, description="", llm_id=None, tools=None, agents=None, **kwargs):
+            data = client.call("POST", "/agents", {
+                "name": name,
+                "description": description,
+                "llm_id": llm_id,
+                "tools": [getattr(tool, "model", str(tool)) for tool in tools or []],
+                "agents": [agent.id for agent in agents or []]
+            })
+            return MockAgent(client, data)
+
+    class MockModelTool:
+        def __init__(self, model=None, description="", **kwargs):
+            self.model = model
+            self.description = description
+
+    modules = {
+        name: types.ModuleType(name)
+        for name in [
+            "aixplain",
+            "aixplain.factories",
+            "aixplain.modules",
+            "aixplain.modules.agent",
+            "aixplain.modules.agent.tool",
+            "aixplain.modules.agent.tool.model_tool"
+        ]
+    }
+    modules["aixplain.factories"].AgentFactory = MockAgentFactory
+    modules["aixplain.factories"].TeamAgentFactory = MockAgentFactory
+    modules["aixplain.modules.agent"].Agent = MockAgent
+    modules["aixplain.modules.agent.tool.model_tool"].ModelTool = MockModelTool
+    sys.modules.update(modules)
+    return client
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the mock aiXplain agent server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    server.daemon_threads = True
+    server.backend = MockBackend(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    print(f"Mock aiXplain server on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
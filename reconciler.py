@@ -0,0 +1,323 @@
+"""Reconcile the deployed agent fleet against a declarative manifest.
+
+The manifest (agents_manifest.json) lists the desired agents with their
+LLM, model tools, code tools computed from the data (code_tools) and data
+sources. Each run renders the desired spec of every agent, compares it
+with what was last applied (recorded in a local state file) and issues
+only the create/update/deploy/delete calls needed to close the gap,
+running them concurrently on a bounded thread pool. A run with no changes
+makes no remote calls.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aixplain.factories import AgentFactory, TeamAgentFactory
+from aixplain.modules.agent.tool.model_tool import ModelTool
+
+from allocation import data_stock
+from analytics import data_history_dir
+from metrics import span
+from retrain_agents import (AGENT_TOKEN_BUDGETS, CONTEXT_RENDERER, DESCRIPTION_TEMPLATES, code_tool, code_tool_specs,
+                            describe_table, load_data)
+
+MANIFEST_FILE = "agents_manifest.json"
+FLEET_STATE_FILE = ".fleet_state.json"
+
+# Tools that manifest entries can refer to by name
+TOOL_MODELS = {
+    "speech_synthesis": (
+        "6171efa6159531495cadefc2",  # aiXplain - Text to Speech
+        "Converts text to speech for creating audio learning materials"
+    ),
+    "translation": (
+        "61b097551efecf30109d32da",  # aiXplain - Translation (OPUS-MT)
+        "Translates content between languages to support multilingual education"
+    )
+}
+
+
+def load_manifest(manifest_path=MANIFEST_FILE):
+    """Load the desired fleet from a JSON manifest."""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for entry in manifest["agents"]:
+        entry.setdefault("llm_id", manifest.get("llm_id"))
+    return manifest
+
+
+def load_fleet_state(state_path=FLEET_STATE_FILE):
+    """Load the record of applied agents, keyed by manifest key."""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_fleet_state(state, state_path=FLEET_STATE_FILE):
+    """Write the fleet state file atomically."""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def render_spec(entry, data_frames, inline_data=True, stock=None, history_dir=None):
+    """Render the full desired spec of a manifest entry.
+
+    An entry's tables share its token_budget, or the agent's default in
+    AGENT_TOKEN_BUDGETS. Its code_tools are computed from the same data (and
+    incentive stock), so a change that alters a tool also updates the agent.
+    """
+    template = entry.get("description") or DESCRIPTION_TEMPLATES[entry["key"]]
+    if inline_data:
+        budget = entry.get("token_budget", AGENT_TOKEN_BUDGETS.get(entry["key"]))
+        tables = CONTEXT_RENDERER.render_tables(data_frames, entry.get("data", []), budget, agent=entry["key"])
+    else:
+        tables = {table: describe_table(data_frames, table, False) for table in entry.get("data", [])}
+    return {
+        "name": entry["name"],
+        "llm_id": entry["llm_id"],
+        "description": template.format(**tables) if tables else template,
+        "tools": sorted(entry.get("tools", [])),
+        "code_tools": code_tool_specs(data_frames, entry.get("code_tools", []), stock, history_dir),
+        "agents": list(entry.get("agents", []))
+    }
+
+
+def spec_hash(spec, member_ids=None):
+    """Hash of a spec. Team specs also depend on their members' ids."""
+    payload = dict(spec, member_ids=member_ids or [])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def plan(manifest, data_frames, state, inline_data=True, stock=None, history_dir=None):
+    """Diff the manifest against the state.
+
+    Returns (specialist ops, team ops, delete ops). Each op is a tuple of
+    (action, key, spec). Team agents are planned in a second phase because
+    their members may be created or replaced in the first.
+    """
+    specialists, teams, deletes = [], [], []
+    wanted = set()
+    for entry in manifest["agents"]:
+        key = entry["key"]
+        wanted.add(key)
+        spec = render_spec(entry, data_frames, inline_data, stock, history_dir)
+        record = state.get(key)
+        if record is None and entry.get("id"):
+            # Adopt an agent deployed before the manifest existed
+            record = state[key] = {"id": entry["id"], "spec": None, "deployed": True, "team": bool(entry.get("agents"))}
+        phase = teams if spec["agents"] else specialists
+        if record is None:
+            phase.append(("create", key, spec))
+        elif spec["agents"]:
+            # Member ids are only known after the first phase; decided later
+            phase.append(("sync", key, spec))
+        elif record["spec"] != spec_hash(spec):
+            phase.append(("update", key, spec))
+        elif not record.get("deployed"):
+            phase.append(("deploy", key, spec))
+    for key, record in state.items():
+        if key not in wanted:
+            deletes.append(("delete", key, None))
+    return specialists, teams, deletes
+
+
+def with_retries(operation, retries=3, backoff=1.0):
+    """Call operation(), retrying failures with jittered exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+def find_agent(factory, name):
+    """The agent named name on the platform, or None."""
+    listing = factory.list(query=name)
+    results = listing.get("results", []) if isinstance(listing, dict) else listing
+    return next((agent for agent in results if agent.name == name), None)
+
+
+class Reconciler:
+    """Apply planned operations on a bounded thread pool."""
+
+    def __init__(self, state, max_workers=4, retries=3, backoff=1.0):
+        self.state = state
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.lock = threading.Lock()
+        self.report = {"create": [], "update": [], "deploy": [], "delete": [], "unchanged": [], "failed": {}}
+        self.remote_calls = 0
+
+    def _call(self, fn, *args, **kwargs):
+        def attempt():
+            with self.lock:
+                self.remote_calls += 1
+            with span("agent_api", op=getattr(fn, "__name__", "call")):
+                return fn(*args, **kwargs)
+        return with_retries(attempt, self.retries, self.backoff)
+
+    def _create(self, factory, spec, **extra):
+        """Create an agent, adopting one with the same name instead of retrying blindly.
+
+        create is not idempotent: a call that timed out may still have
+        created the agent, so every retry first looks it up by name.
+        """
+        attempts = 0
+
+        def create(**kwargs):
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                existing = find_agent(factory, kwargs["name"])
+                if existing is not None:
+                    return existing
+            return factory.create(**kwargs)
+
+        return self._call(create, name=spec["name"], description=spec["description"], llm_id=spec["llm_id"],
+                          **extra)
+
+    def _tools(self, spec):
+        tools = [ModelTool(model=TOOL_MODELS[name][0], description=TOOL_MODELS[name][1]) for name in spec["tools"]]
+        code_tools = [code_tool(tool) for _, tool in sorted(spec.get("code_tools", {}).items())]
+        return tools + [tool for tool in code_tools if tool is not None]
+
+    def _members(self, spec):
+        return [self._call(AgentFactory.get, self.state[key]["id"]) for key in spec["agents"]]
+
+    def _member_ids(self, spec):
+        return [self.state.get(key, {}).get("id") for key in spec["agents"]]
+
+    def _apply(self, action, key, spec):
+        record = self.state.get(key)
+        is_team = bool(spec and spec["agents"])
+        factory = TeamAgentFactory if is_team else AgentFactory
+        digest = spec_hash(spec, self._member_ids(spec) if is_team else None) if spec else None
+
+        if action == "sync":
+            if record["spec"] == digest:
+                if record.get("deployed"):
+                    return "unchanged"
+                action = "deploy"
+            else:
+                action = "update"
+
+        if action == "create":
+            extra = {"agents": self._members(spec)} if is_team else {"tools": self._tools(spec)}
+            agent = self._create(factory, spec, **extra)
+            record = {"id": agent.id, "spec": digest, "deployed": False, "team": is_team}
+            self._record(key, record)
+            self._call(agent.deploy)
+            self._record(key, dict(record, deployed=True))
+        elif action == "update":
+            agent = self._call(factory.get, record["id"])
+            agent.name = spec["name"]
+            agent.description = spec["description"]
+            agent.llm_id = spec["llm_id"]
+            if is_team:
+                agent.agents = self._members(spec)
+            else:
+                agent.tools = self._tools(spec)
+            self._call(agent.update)
+            if not record.get("deployed"):
+                self._call(agent.deploy)
+            self._record(key, dict(record, spec=digest, deployed=True, team=is_team))
+        elif action == "deploy":
+            agent = self._call(factory.get, record["id"])
+            self._call(agent.deploy)
+            self._record(key, dict(record, deployed=True))
+        elif action == "delete":
+            factory = TeamAgentFactory if record.get("team") else AgentFactory
+            agent = self._call(factory.get, record["id"])
+            self._call(agent.delete)
+            self._record(key, None)
+        return action
+
+    def _record(self, key, record):
+        with self.lock:
+            if record is None:
+                self.state.pop(key, None)
+            else:
+                self.state[key] = record
+
+    def run(self, operations):
+        """Run a batch of operations concurrently and wait for all of them."""
+        if not operations:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._apply, *op): op[1] for op in operations}
+            for future, key in futures.items():
+                try:
+                    action = future.result()
+                    self.report[action].append(key)
+                except Exception as e:
+                    self.report["failed"][key] = str(e)
+
+
+def reconcile(manifest_path=MANIFEST_FILE, data_dir="SampleData", state_path=FLEET_STATE_FILE,
+              inline_data=True, max_workers=4, retries=3, dry_run=False):
+    """Bring the deployed fleet in line with the manifest and report what changed."""
+    manifest = load_manifest(manifest_path)
+    state = load_fleet_state(state_path)
+    specialists, teams, deletes = plan(manifest, load_data(data_dir), state, inline_data, data_stock(data_dir),
+                                       data_history_dir(data_dir))
+
+    if dry_run:
+        return {"planned": [(action, key) for action, key, _ in specialists + teams + deletes]}
+
+    reconciler = Reconciler(state, max_workers=max_workers, retries=retries)
+    # Teams are deleted before their members and created after them
+    reconciler.run([op for op in deletes if state[op[1]].get("team")] + specialists)
+    reconciler.run(teams)
+    reconciler.run([op for op in deletes if op[1] in state])
+    save_fleet_state(state, state_path)
+
+    report = dict(reconciler.report, remote_calls=reconciler.remote_calls)
+    return report
+
+
+def print_report(report):
+    """Print a reconcile summary."""
+    if "planned" in report:
+        print("Planned operations:")
+        for action, key in report["planned"]:
+            print(f"  {action:8} {key}")
+        return
+    for action in ["create", "update", "deploy", "delete", "unchanged"]:
+        if report[action]:
+            print(f"{action}: {', '.join(report[action])}")
+    for key, error in report["failed"].items():
+        print(f"failed: {key}: {error}")
+    print(f"Remote calls: {report['remote_calls']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconcile deployed agents against the manifest")
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    parser.add_argument("--data-dir", default="SampleData")
+    parser.add_argument("--state-file", default=FLEET_STATE_FILE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--no-inline-data", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without calling the platform")
+    args = parser.parse_args()
+    print_report(reconcile(
+        manifest_path=args.manifest,
+        data_dir=args.data_dir,
+        state_path=args.state_file,
+        inline_data=not args.no_inline_data,
+        max_workers=args.workers,
+        retries=args.retries,
+        dry_run=args.dry_run
+    ))
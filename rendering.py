@@ -0,0 +1,236 @@
+"""Compact, token-budgeted rendering of tables for agent contexts.
+
+DataFrame.to_string() pads every column to align it, and the padding is
+paid for as prompt tokens on every run. Tables are rendered here in one of
+three compact formats instead:
+
+- "csv": plain CSV without the index,
+- "json": column-oriented JSON ({column: [values]}),
+- "dict": CSV where repeated text values (village_id, education_level,
+  ...) are replaced by codes into a dictionary printed above the rows.
+
+Each agent gets a token budget that is shared between its tables. A table
+that does not fit its share is cut to the rows that do, picked evenly
+across the table (or the first rows) so the result is deterministic.
+Rendered text is memoized by frame hash, so a table shared by several
+agents is serialized once.
+"""
+import hashlib
+import json
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from metrics import get_metrics
+from tokens import CHARS_PER_TOKEN, estimate_tokens  # noqa: F401 (re-exported)
+
+FORMATS = ("csv", "json", "dict")
+
+# A text column is dictionary-encoded when it has at most this share of distinct values
+DICTIONARY_MAX_DISTINCT = 0.5
+
+
+def frame_hash(df):
+    """Content hash of a data frame, including its column names."""
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _is_text(series):
+    return (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype)
+            or series.dtype == object)
+
+
+def _plain(df):
+    """Frame with dates as plain dates and float32 values at their printed precision."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            dates = series.dropna()
+            fmt = "%Y-%m-%d" if (dates == dates.dt.normalize()).all() else "%Y-%m-%d %H:%M:%S"
+            df[column] = series.dt.strftime(fmt)
+        elif series.dtype == np.float32:
+            df[column] = series.astype("float64").round(6)
+    return df
+
+
+def render_csv(df):
+    """CSV without the index."""
+    return _plain(df).to_csv(index=False).strip()
+
+
+def render_json(df):
+    """Column-oriented JSON: {column: [values]}."""
+    df = _plain(df)
+    columns = [f"{json.dumps(str(column))}:{df[column].to_json(orient='values')}" for column in df.columns]
+    return "{" + ",".join(columns) + "}"
+
+
+def render_dict(df):
+    """CSV with repeated text values replaced by codes into a dictionary."""
+    df = _plain(df)
+    dictionary = {}
+    for column in df.columns:
+        series = df[column]
+        if not _is_text(series) or series.notna().sum() == 0:
+            continue
+        codes, values = pd.factorize(series)
+        if len(values) > DICTIONARY_MAX_DISTINCT * series.notna().sum():
+            continue
+        dictionary[str(column)] = [str(value) for value in values]
+        df[column] = pd.array(np.where(codes < 0, None, codes), dtype="Int32")
+    rows = df.to_csv(index=False).strip()
+    if not dictionary:
+        return rows
+    legend = json.dumps(dictionary, separators=(",", ":"))
+    return f"dictionary (a coded value is its position in the list): {legend}\n{rows}"
+
+
+RENDERERS = {
+    "csv": render_csv,
+    "json": render_json,
+    "dict": render_dict
+}
+
+
+def select_rows(total, count, strategy="sample"):
+    """Positions of count rows out of total: evenly spread ("sample") or the first ("head")."""
+    if count >= total:
+        return np.arange(total)
+    if strategy == "head" or count <= 1:
+        return np.arange(count)
+    return np.unique(np.linspace(0, total - 1, count).round().astype(int))
+
+
+def split_budget(sizes, budget):
+    """Share a token budget between tables of the given full sizes.
+
+    Every table starts with an equal share; tables that need less pass the
+    rest on to the larger ones.
+    """
+    shares = {}
+    remaining = budget
+    order = sorted(sizes, key=lambda table: (sizes[table], table))
+    for position, table in enumerate(order):
+        share = remaining // (len(order) - position)
+        shares[table] = min(sizes[table], share)
+        remaining -= shares[table]
+    return shares
+
+
+class ContextRenderer:
+    """Renders tables in a compact format within a token budget.
+
+    Rendered text is memoized by (frame hash, format, rows), keeping the
+    max_entries most recent renders. Frame hashes are memoized per frame
+    object in an LRU of the same size that holds frames by weak reference,
+    so the renderer never keeps an old data version alive. Every
+    render_tables() call adds one row per table to report.
+    """
+
+    def __init__(self, fmt="csv", truncate="sample", max_entries=256):
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unknown context format {fmt!r}; expected one of {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.truncate = truncate
+        self.max_entries = max_entries
+        self.report = []
+        self.hits = 0
+        self.misses = 0
+        self._renders = OrderedDict()
+        self._hashes = OrderedDict()
+
+    def frame_hash(self, df):
+        """frame_hash(df), computed once per frame object.
+
+        A frame whose shape or columns changed is hashed again; after
+        changing values in place, call forget(df).
+        """
+        # Keyed by object identity; the weak reference tells a reused id apart
+        key = id(df)
+        layout = (df.shape, tuple(df.columns))
+        cached = self._hashes.get(key)
+        if cached is not None and cached[0]() is df and cached[1] == layout:
+            self._hashes.move_to_end(key)
+            return cached[2]
+        digest = frame_hash(df)
+        self._hashes[key] = (weakref.ref(df), layout, digest)
+        self._hashes.move_to_end(key)
+        if len(self._hashes) > self.max_entries:
+            self._hashes.popitem(last=False)
+        return digest
+
+    def forget(self, df):
+        """Drop the memoized hash of a frame that was changed in place."""
+        self._hashes.pop(id(df), None)
+
+    def _render(self, df, fmt, count=None):
+        key = (self.frame_hash(df), fmt, None if count is None else (self.truncate, count))
+        text = self._renders.get(key)
+        get_metrics().record_cache("render", text is not None)
+        if text is not None:
+            self.hits += 1
+            self._renders.move_to_end(key)
+            return text
+        self.misses += 1
+        if count is None:
+            text = RENDERERS[fmt](df)
+        else:
+            rows = df.iloc[select_rows(len(df), count, self.truncate)]
+            text = RENDERERS[fmt](rows)
+            how = "evenly sampled" if self.truncate == "sample" else "first rows"
+            text += f"\n(showing {len(rows)} of {len(df)} rows, {how})"
+        self._renders[key] = text
+        if len(self._renders) > self.max_entries:
+            self._renders.popitem(last=False)
+        return text
+
+    def render(self, df, max_tokens=None, fmt=None):
+        """Render a frame, cut to the rows that fit max_tokens.
+
+        Returns (text, info) where info has the format, rows shown, total
+        rows and estimated tokens.
+        """
+        fmt = fmt or self.fmt
+        text = self._render(df, fmt)
+        rows = len(df)
+        if max_tokens is not None and estimate_tokens(text) > max_tokens:
+            # Largest row count whose rendering fits
+            low, high = 0, len(df) - 1
+            while low < high:
+                middle = (low + high + 1) // 2
+                if estimate_tokens(self._render(df, fmt, middle)) <= max_tokens:
+                    low = middle
+                else:
+                    high = middle - 1
+            rows = low
+            text = self._render(df, fmt, rows)
+        return text, {"format": fmt, "rows": rows, "total_rows": len(df), "tokens": estimate_tokens(text)}
+
+    def render_tables(self, data_frames, tables, budget=None, agent=None, fmt=None):
+        """Render several tables sharing one token budget. Returns {table: text}."""
+        with get_metrics().span("render_context", agent=agent):
+            frames = {table: data_frames.get(table, pd.DataFrame()) for table in tables}
+            shares = dict.fromkeys(tables)
+            if budget is not None:
+                sizes = {table: estimate_tokens(self._render(df, fmt or self.fmt)) for table, df in frames.items()}
+                shares = split_budget(sizes, budget)
+            rendered = {}
+            for table, df in frames.items():
+                rendered[table], info = self.render(df, shares[table], fmt)
+                self.report.append(dict(info, agent=agent, table=table))
+        return rendered
+
+    def format_report(self):
+        """Tokens used per agent and table, as text."""
+        lines = []
+        for row in self.report:
+            cut = f" (cut from {row['total_rows']})" if row["rows"] < row["total_rows"] else ""
+            lines.append(f"  {row['agent'] or '-'}/{row['table']}: ~{row['tokens']} tokens, "
+                         f"{row['rows']} rows{cut}, {row['format']}")
+        lines.append(f"  renders: {self.misses} serialized, {self.hits} reused")
+        return "\n".join(lines)
@@ -0,0 +1,137 @@
+"""On-disk cache of agent responses.
+
+Responses are keyed by the agent, the normalized prompt and the version of
+the data the agent was last trained on, so pushing new data with
+retrain_agents makes older answers unreachable. Entries expire after a TTL
+and the least recently used ones are evicted once the cache is full.
+"""
+import hashlib
+import pickle
+import re
+import sqlite3
+import threading
+import time
+
+from metrics import get_metrics
+
+RESPONSE_CACHE_FILE = ".response_cache.sqlite"
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so trivially different prompts share a key.
+
+    Case is kept: prompts embed data rows, and ids or values that differ
+    only in case are different questions.
+    """
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def is_failure(result):
+    """Whether an agent result is a failure: an {"error": ...} dict, or a
+    REST dict or SDK response whose status is FAILED."""
+    if isinstance(result, dict):
+        status = result.get("status")
+        return "error" in result or str(status).upper() == "FAILED" or result.get("completed") is False
+    status = getattr(result, "status", None)
+    return status is not None and str(getattr(status, "value", status)).upper() == "FAILED"
+
+
+def cache_key(agent, prompt, data_version):
+    """Key of a response for an agent, prompt and data version."""
+    payload = "\x1f".join([agent, normalize_prompt(prompt), data_version or ""])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and LRU eviction."""
+
+    def __init__(self, path=RESPONSE_CACHE_FILE, ttl=24 * 3600, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, agent TEXT, created REAL, last_access REAL, value BLOB)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_agent ON responses (agent)")
+        self.db.commit()
+
+    def get(self, agent, prompt, data_version=None):
+        """Return the cached response, or None on a miss."""
+        key = cache_key(agent, prompt, data_version)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT created, value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[0] > self.ttl):
+                if row is not None:
+                    self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.db.commit()
+                self.misses += 1
+                get_metrics().record_cache("response", False)
+                return None
+            self.db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+        get_metrics().record_cache("response", True)
+        return pickle.loads(row[1])
+
+    def put(self, agent, prompt, data_version, value):
+        """Store a response and evict the least recently used entries if full."""
+        key = cache_key(agent, prompt, data_version)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, agent, now, now, pickle.dumps(value))
+            )
+            overflow = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.db.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (overflow,)
+                )
+            self.db.commit()
+
+    def invalidate(self, agent=None):
+        """Drop all entries for an agent (or every entry). Returns the count removed."""
+        with self.lock:
+            if agent is None:
+                cursor = self.db.execute("DELETE FROM responses")
+            else:
+                cursor = self.db.execute("DELETE FROM responses WHERE agent = ?", (agent,))
+            self.db.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        """Hit/miss counters for this process and the number of stored entries."""
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+    def cached(self, agent, prompt, data_version, run):
+        """Return the cached response for prompt, or call run(prompt) and cache it.
+
+        Failures (see is_failure) are not cached.
+        """
+        result = self.get(agent, prompt, data_version)
+        if result is not None:
+            return result
+        result = run(prompt)
+        if not is_failure(result):
+            self.put(agent, prompt, data_version, result)
+        return result
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,7 +1,23 @@
+import hashlib
+import json
 import os
+import threading
 import pandas as pd
-from aixplain.factories import AgentFactory, TeamAgentFactory
-from aixplain.modules.agent.tool.model_tool import ModelTool
+
+from agent_registry import get_registry
+import allocation
+from allocation import allocate, data_stock
+import analytics
+from analytics import data_history_dir, progress_report
+from coordinator import ACTION_AGENTS  # noqa: F401 (re-exported)
+from data_loader import load_table
+from data_store import PRIMARY_KEYS, DataStore, TableView
+import matching
+from matching import match_candidates
+from metrics import configure, get_metrics, profile, span
+from rendering import FORMATS, ContextRenderer, frame_hash
+from sharding import SHARD_FILE, ShardMap, base_agent_name, load_groups, partition, shard_agent_name, summary_frames
+from response_cache import ResponseCache
 
 # Agent IDs from previous deployment
 AGENT_IDS = {
@@ -12,8 +28,12 @@ AGENT_IDS = {
     "progress_monitoring": "67e0fc36338999cb9696a941"
 }
 
-def load_data(data_dir="SampleData"):
-    """Load all data files from the specified directory."""
+def load_data(data_dir="SampleData", use_cache=True, chunksize=100_000):
+    """Load all data files from the specified directory.
+
+    Tables are parsed with their schemas from data_loader and served from
+    the columnar cache while the CSV files are unchanged.
+    """
     data_frames = {}
     required_files = [
         'teacher_data.csv',
@@ -26,103 +46,388 @@ def load_data(data_dir="SampleData"):
     for file_name in required_files:
         file_path = os.path.join(data_dir, file_name)
         if os.path.exists(file_path):
-            data_frames[file_name.replace('.csv', '')] = pd.read_csv(file_path)
+            table = file_name.replace('.csv', '')
+            with span("load_table", table=table):
+                data_frames[table] = load_table(file_path, table, use_cache=use_cache, chunksize=chunksize)
         else:
             print(f"Warning: {file_name} not found in {data_dir}")
     
     return data_frames
 
-def update_data(data_frames, new_data):
-    """Update existing data frames with new data."""
+def update_data(data_frames, new_data, store=None):
+    """Update existing data frames with new data.
+
+    Records are upserted by primary key into a DataStore, so a corrected row
+    replaces the stale one. Returns a view of the store that compacts a
+    table only when it is read; passing that view (or the store) back in
+    keeps ingestion proportional to each delta.
+    """
+    if store is None:
+        store = data_frames.store if isinstance(data_frames, TableView) else DataStore(data_frames)
     for key, new_df in new_data.items():
-        if key in data_frames:
-            # Append new data to existing data
-            data_frames[key] = pd.concat([data_frames[key], new_df], ignore_index=True)
-            print(f"Updated {key} with {len(new_df)} new records")
+        if key in PRIMARY_KEYS:
+            replaced = store.upsert(key, new_df)
+            print(f"Updated {key} with {len(new_df)} new records ({replaced} replacing existing rows)")
         else:
             print(f"Warning: Unknown data type {key}")
     
-    return data_frames
+    return store.view()
 
-def update_agents(data_frames):
-    """Update existing agents with new data."""
-    # Speech synthesis tool
-    speech_synthesis_tool = ModelTool(
-        model="6171efa6159531495cadefc2",  # aiXplain - Text to Speech
-        description="Converts text to speech for creating audio learning materials"
-    )
+# Renders tables compactly and reuses a table's text across agents
+CONTEXT_RENDERER = ContextRenderer()
 
-    # Translation tool
-    translation_tool = ModelTool(
-        model="61b097551efecf30109d32da",  # aiXplain - Translation (OPUS-MT)
-        description="Translates content between languages to support multilingual education"
-    )
+def describe_table(data_frames, table, inline_data=True, renderer=None, max_tokens=None):
+    """Render a table for an agent description.
 
-    # Update each agent with new data
-    agents = {}
-    
-    # Teacher Recruitment Agent
-    agents["teacher_recruitment"] = AgentFactory.get(AGENT_IDS["teacher_recruitment"])
-    agents["teacher_recruitment"].description = f"""You are an agent that helps identify and recruit educated rural youth
+    With inline_data=False the table is left out and the rows are supplied
+    per query by the retrieval index instead.
+    """
+    if not inline_data:
+        return "(relevant rows are provided with each request)"
+    renderer = renderer or CONTEXT_RENDERER
+    return renderer.render(data_frames.get(table, pd.DataFrame()), max_tokens)[0]
+
+# Tables each agent's description is rendered from
+AGENT_TABLES = {
+    "teacher_recruitment": ["teacher_data", "community_data"],
+    "training_mentorship": ["training_data"],
+    "incentive_management": ["incentives_data", "teacher_data"],
+    "community_engagement": ["community_data"],
+    "progress_monitoring": ["student_data", "teacher_data", "community_data"]
+}
+
+DESCRIPTION_TEMPLATES = {
+    "teacher_recruitment": """You are an agent that helps identify and recruit educated rural youth
     to become part-time teachers in their villages. You prioritize women candidates when
     appropriate and match candidates with teaching opportunities based on their skills,
     education level, and village proximity.
 
     Here's the updated teacher data you have access to:
-    {data_frames.get('teacher_data', pd.DataFrame()).to_string()}
+    {teacher_data}
 
     Here's the updated community data you have access to:
-    {data_frames.get('community_data', pd.DataFrame()).to_string()}"""
-
-    # Training and Mentorship Agent
-    agents["training_mentorship"] = AgentFactory.get(AGENT_IDS["training_mentorship"])
-    agents["training_mentorship"].description = f"""You are an agent that provides educational resources, training materials,
+    {community_data}""",
+    "training_mentorship": """You are an agent that provides educational resources, training materials,
     and ongoing mentorship to rural part-time teachers.
 
     Here's the updated training data you have access to:
-    {data_frames.get('training_data', pd.DataFrame()).to_string()}"""
-    agents["training_mentorship"].tools = [speech_synthesis_tool]
-
-    # Incentive Management Agent
-    agents["incentive_management"] = AgentFactory.get(AGENT_IDS["incentive_management"])
-    agents["incentive_management"].description = f"""You are an agent that tracks teacher participation and manages the
+    {training_data}""",
+    "incentive_management": """You are an agent that tracks teacher participation and manages the
     non-monetary incentives program.
 
     Here's the updated incentives data you have access to:
-    {data_frames.get('incentives_data', pd.DataFrame()).to_string()}
+    {incentives_data}
 
     Here's the updated teacher data you have access to:
-    {data_frames.get('teacher_data', pd.DataFrame()).to_string()}"""
-
-    # Community Engagement Agent
-    agents["community_engagement"] = AgentFactory.get(AGENT_IDS["community_engagement"])
-    agents["community_engagement"].description = f"""You are an agent that facilitates communication between teachers, parents,
+    {teacher_data}""",
+    "community_engagement": """You are an agent that facilitates communication between teachers, parents,
     and village elders.
 
     Here's the updated community data you have access to:
-    {data_frames.get('community_data', pd.DataFrame()).to_string()}"""
-    agents["community_engagement"].tools = [translation_tool, speech_synthesis_tool]
-
-    # Progress Monitoring Agent
-    agents["progress_monitoring"] = AgentFactory.get(AGENT_IDS["progress_monitoring"])
-    agents["progress_monitoring"].description = f"""You are an agent that tracks student attendance, learning outcomes,
+    {community_data}""",
+    "progress_monitoring": """You are an agent that tracks student attendance, learning outcomes,
     and program growth.
 
     Here's the updated student data you have access to:
-    {data_frames.get('student_data', pd.DataFrame()).to_string()}
+    {student_data}
 
     Here's the updated teacher data you have access to:
-    {data_frames.get('teacher_data', pd.DataFrame()).to_string()}
+    {teacher_data}
 
     Here's the updated community data you have access to:
-    {data_frames.get('community_data', pd.DataFrame()).to_string()}"""
+    {community_data}"""
+}
+
+# Prompt tokens each agent's description may spend on data, shared between its tables
+AGENT_TOKEN_BUDGETS = {
+    "teacher_recruitment": 8000,
+    "training_mentorship": 4000,
+    "incentive_management": 8000,
+    "community_engagement": 4000,
+    "progress_monitoring": 12000
+}
+
+# Local record of what each agent was last pushed with
+RETRAIN_STATE_FILE = ".retrain_state.json"
+
+def build_descriptions(data_frames, inline_data=True, agent_names=None, renderer=None, budgets=None):
+    """Render the descriptions of the given agents (all agents by default).
+
+    Each agent's tables share its token budget (AGENT_TOKEN_BUDGETS unless
+    budgets is given); the tokens used per table are added to the
+    renderer's report.
+    """
+    renderer = renderer or CONTEXT_RENDERER
+    budgets = AGENT_TOKEN_BUDGETS if budgets is None else budgets
+    descriptions = {}
+    for agent_name in agent_names or list(DESCRIPTION_TEMPLATES):
+        if inline_data:
+            tables = renderer.render_tables(data_frames, AGENT_TABLES[agent_name],
+                                            budgets.get(agent_name), agent=agent_name)
+        else:
+            tables = {table: describe_table(data_frames, table, False) for table in AGENT_TABLES[agent_name]}
+        descriptions[agent_name] = DESCRIPTION_TEMPLATES[agent_name].format(**tables)
+        get_metrics().record_prompt(agent_name, descriptions[agent_name], kind="description")
+    return descriptions
+
+# Code tools computed from the data, by the agent that carries them
+AGENT_CODE_TOOLS = {
+    "progress_monitoring": ["analytics"],
+    "teacher_recruitment": ["matching"],
+    "incentive_management": ["allocation"]
+}
+
+def code_tool_results(data_frames, names, stock=None, history_dir=None):
+    """Compute what the named code tools embed, for those whose tables are loaded.
+
+    Returns {"analytics": progress report, "matching": candidate shortlist,
+    "allocation": (allocation, summary)}; stock limits the allocation (see
+    allocation.data_stock), and history_dir holds the snapshots the report's
+    period-over-period deltas come from (see analytics.data_history_dir).
+    """
+    results = {}
+    if "analytics" in names and "student_data" in data_frames:
+        results["analytics"] = progress_report(data_frames, history_dir)
+    if "matching" in names and {"teacher_data", "community_data"} <= set(data_frames):
+        results["matching"] = match_candidates(data_frames["teacher_data"], data_frames["community_data"])[0]
+    if "allocation" in names and "incentives_data" in data_frames:
+        results["allocation"] = allocate(data_frames["incentives_data"], data_frames.get("teacher_data"), stock)
+    return results
+
+def slice_tool_results(results, villages, teacher_ids):
+    """Program-wide tool results cut to a shard's villages and teachers.
+
+    Program-wide totals are kept as they are; per-village and per-teacher
+    figures are limited to the shard.
+    """
+    villages = {str(village) for village in villages}
+    sliced = {}
+    if "analytics" in results:
+        report = dict(results["analytics"])
+        for key in ("villages", "teacher_load", "deltas"):
+            if report.get(key) is not None:
+                report[key] = report[key][report[key].index.astype(str).isin(villages)]
+        sliced["analytics"] = report
+    if "matching" in results:
+        matches = results["matching"]
+        sliced["matching"] = matches[matches["village_id"].astype(str).isin(villages)]
+    if "allocation" in results:
+        solved, summary = results["allocation"]
+        sliced["allocation"] = (solved[solved.index.isin([str(teacher) for teacher in teacher_ids])], summary)
+    return sliced
+
+def tool_specs(results, stock=None):
+    """Source and description of the code tool for each of code_tool_results.
+
+    Returns {name: {"code": ..., "description": ...}}; the reconciler hashes
+    these into agent specs, and code_tool turns them into SDK tools.
+    """
+    specs = {}
+    if "analytics" in results:
+        specs["analytics"] = {"code": analytics.tool_source(results["analytics"]),
+                              "description": analytics.TOOL_DESCRIPTION}
+    if "matching" in results:
+        specs["matching"] = {"code": matching.tool_source(results["matching"]),
+                             "description": matching.TOOL_DESCRIPTION}
+    if "allocation" in results:
+        specs["allocation"] = {"code": allocation.tool_source(*results["allocation"], stock),
+                               "description": allocation.TOOL_DESCRIPTION}
+    return specs
+
+def code_tool_specs(data_frames, names, stock=None, history_dir=None):
+    """Code tool specs (see tool_specs) of the named tools, computed from data_frames."""
+    return tool_specs(code_tool_results(data_frames, names, stock, history_dir), stock)
+
+def code_tool(spec):
+    """Create a custom Python code tool from a code_tool_specs entry.
+
+    Returns None when the installed aixplain SDK cannot create code tools.
+    """
+    from aixplain.factories import AgentFactory
+
+    create = getattr(AgentFactory, "create_custom_python_code_tool", None)
+    return None if create is None else create(code=spec["code"], description=spec["description"])
+
+def update_agents(data_frames, inline_data=True, descriptions=None, registry=None, stock=None, tool_results=None,
+                  history_dir=None):
+    """Update existing agents with new data.
+
+    If descriptions is given, only the agents it names are fetched and
+    updated with those pre-rendered descriptions. Village-shard agents
+    ("<agent>@<shard>") are resolved through registry, which creates them
+    on first use. Code tools are built from tool_results (see
+    code_tool_results) when given, else computed from data_frames, with
+    stock limiting the incentive allocation and history_dir giving the
+    progress deltas.
+    """
+    from aixplain.factories import AgentFactory
+    from aixplain.modules.agent.tool.model_tool import ModelTool
+
+    if descriptions is None:
+        descriptions = build_descriptions(data_frames, inline_data)
+    wanted = {base_agent_name(name) for name in descriptions}
+
+    # Speech synthesis tool
+    speech_synthesis_tool = ModelTool(
+        model="6171efa6159531495cadefc2",  # aiXplain - Text to Speech
+        description="Converts text to speech for creating audio learning materials"
+    )
+
+    # Translation tool
+    translation_tool = ModelTool(
+        model="61b097551efecf30109d32da",  # aiXplain - Translation (OPUS-MT)
+        description="Translates content between languages to support multilingual education"
+    )
+
+    agent_tools = {
+        "training_mentorship": [speech_synthesis_tool],
+        "community_engagement": [translation_tool, speech_synthesis_tool]
+    }
+
+    # Pre-computed figures, shortlists and allocations, so the agents need not read raw tables
+    for agent_name, names in AGENT_CODE_TOOLS.items():
+        if agent_name in wanted:
+            if tool_results is None:
+                specs = code_tool_specs(data_frames, names, stock, history_dir)
+            else:
+                specs = tool_specs({name: tool_results[name] for name in names if name in tool_results}, stock)
+            tools = [code_tool(spec) for spec in specs.values()]
+            tools = [tool for tool in tools if tool is not None]
+            if tools:
+                agent_tools[agent_name] = agent_tools.get(agent_name, []) + tools
+
+    # Update each agent with new data
+    agents = {}
+    for agent_name, description in descriptions.items():
+        if registry is not None:
+            agents[agent_name] = registry.get(agent_name)
+        else:
+            with span("agent_api", op="get", agent=agent_name):
+                agents[agent_name] = AgentFactory.get(AGENT_IDS[agent_name])
+        agents[agent_name].description = description
+        if base_agent_name(agent_name) in agent_tools:
+            agents[agent_name].tools = agent_tools[base_agent_name(agent_name)]
 
     return agents
 
-def main():
-    # Load existing data
-    print("Loading existing data...")
-    data_frames = load_data()
+def hash_table(df):
+    """Content hash of a data frame, including its column names."""
+    return frame_hash(df)
+
+def hash_text(text):
+    """Content hash of a rendered description."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def load_state(state_path=RETRAIN_STATE_FILE):
+    """Load the retrain state file, or an empty state if there is none."""
+    if not os.path.exists(state_path):
+        return {"agents": {}}
+    with open(state_path) as f:
+        return json.load(f)
+
+def save_state(state, state_path=RETRAIN_STATE_FILE):
+    """Write the retrain state file atomically."""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+# Pushed description hashes per state file, reused while the file is unchanged:
+# {path: (file identity, {agent: version}, version of agents without a record)}
+_versions = {}
+_versions_lock = threading.Lock()
+
+def _data_versions(state_path):
+    try:
+        stat = os.stat(state_path)
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        identity = None
+    with _versions_lock:
+        cached = _versions.get(state_path)
+        if cached is None or cached[0] != identity:
+            agents = load_state(state_path)["agents"] if identity else {}
+            versions = {name: record["description"] for name, record in agents.items()}
+            combined = hash_text("".join(versions[name] for name in sorted(versions)))
+            cached = _versions[state_path] = (identity, versions, combined)
+    return cached[1], cached[2]
+
+def data_version(agent_name, state_path=RETRAIN_STATE_FILE):
+    """Hash of the description an agent was last pushed with, if known.
+
+    Agents without their own record (e.g. the team agent) are versioned by
+    all pushed descriptions together. The state file is parsed again only
+    when it changes, so the per-query cost does not grow with the fleet.
+    """
+    versions, combined = _data_versions(state_path)
+    return versions.get(agent_name, combined)
+
+def context_settings(renderer, budgets=None):
+    """How an agent's data is rendered; a change re-renders every agent."""
+    return {"format": renderer.fmt, "truncate": renderer.truncate,
+            "budgets": AGENT_TOKEN_BUDGETS if budgets is None else budgets}
+
+def tool_hash(specs, agent_name):
+    """Hash of the code tool specs (see tool_specs) an agent carries, or None without any."""
+    own = {name: specs[name] for name in AGENT_CODE_TOOLS.get(agent_name, []) if name in specs}
+    return hash_text(json.dumps(own, sort_keys=True)) if own else None
+
+def stock_hash(stock):
+    """Hash of the incentive stock (see allocation.data_stock), or None when every item is unlimited."""
+    return None if stock is None else hash_text(json.dumps(stock, sort_keys=True))
+
+def plan_updates(data_frames, state, inline_data=True, force=False, renderer=None, budgets=None, shard=None,
+                 specs=None, stock=None):
+    """Decide which agents need to be pushed.
+
+    An agent is a candidate when one of its source tables, its code tool
+    specs (specs, see tool_specs), the incentive stock (for the agent that
+    carries the allocation) or the context settings changed since its last
+    successful push. Candidates whose rendered description and tools
+    are unchanged are still skipped, and their record in state takes the
+    new hashes so they are not re-rendered on the next run. With a shard,
+    data_frames hold that shard's rows and the agents are its copies
+    ("<agent>@<shard>"). Returns (descriptions to push, state record per
+    agent without its description hash), keyed by agent name.
+    """
+    renderer = renderer or CONTEXT_RENDERER
+    context = context_settings(renderer, budgets)
+    table_hashes = {table: renderer.frame_hash(df) for table, df in data_frames.items()}
+    candidates = []
+    records = {}
+    for agent_name, tables in AGENT_TABLES.items():
+        name = shard_agent_name(agent_name, shard)
+        records[name] = {"tables": {table: table_hashes.get(table) for table in tables},
+                         "inline_data": inline_data, "context": context,
+                         "tools": tool_hash(specs or {}, agent_name)}
+        if "allocation" in AGENT_CODE_TOOLS.get(agent_name, []):
+            records[name]["stock"] = stock_hash(stock)
+        record = state["agents"].get(name, {})
+        if force or any(record.get(key) != value for key, value in records[name].items()):
+            candidates.append(agent_name)
+
+    descriptions = {}
+    if candidates:
+        descriptions = build_descriptions(data_frames, inline_data, candidates, renderer, budgets)
+    to_push = {}
+    for agent_name, description in descriptions.items():
+        name = shard_agent_name(agent_name, shard)
+        record = state["agents"].get(name, {})
+        if (force or record.get("description") != hash_text(description)
+                or any(record.get(key) != records[name].get(key) for key in ("tools", "stock"))):
+            to_push[name] = description
+        else:
+            # Same description and tools from changed tables: nothing to push, but the record catches up
+            record.update(records[name])
+    return to_push, records
+
+def main(inline_data=True, force=False, state_path=RETRAIN_STATE_FILE, context_format="csv", token_budget=None,
+         shard=False, groups_path=None, villages_per_shard=1, shard_path=SHARD_FILE, data_dir="SampleData",
+         data_frames=None):
+    # Load existing data (retrain_daemon passes the tables it already holds)
+    if data_frames is None:
+        print("Loading existing data...")
+        data_frames = load_data(data_dir)
     
     # Here you would typically load new data from files or input
     # For example:
@@ -135,20 +440,119 @@ def main():
     # Update data with new records
     # data_frames = update_data(data_frames, new_data)
     
-    # Update agents with new data
-    print("Updating agents with new data...")
-    agents = update_agents(data_frames)
+    # Each target is (shard, frames the descriptions are rendered from).
+    # Sharded, the global agents only hold per-village summaries and every
+    # shard gets its own copies.
+    targets = [(None, data_frames)]
+    registry = None
+    if shard:
+        groups = load_groups(groups_path) if groups_path else None
+        shard_map = ShardMap.build(data_frames, groups, villages_per_shard)
+        shard_map.save(shard_path)
+        shard_villages = {}
+        for village, name in shard_map.shards.items():
+            shard_villages.setdefault(name, []).append(village)
+        targets = [(None, summary_frames(data_frames))]
+        targets += list(partition(data_frames, shard_map).items())
+        registry = get_registry(AGENT_IDS)
+        print(f"Sharding {len(shard_map.shards)} villages into {len(targets) - 1} shards")
+    elif os.path.exists(shard_path):
+        # Queries must stop routing to shard agents
+        os.remove(shard_path)
+
+    # Limited incentive items, kept next to the data
+    stock = data_stock(data_dir)
+
+    # Work out which agents actually changed since the last push
+    state = load_state(state_path)
+    renderer = ContextRenderer(context_format)
+    budgets = None if token_budget is None else dict.fromkeys(AGENT_TABLES, token_budget)
+    descriptions, records, agents = {}, {}, {}
+    # Code tool results are computed once from all the data and cut per
+    # shard. Their specs are part of each agent's plan: allocation shares
+    # the stock and a village's best match may teach in another shard, so
+    # a change anywhere can change a shard's tools.
+    names = [name for names in AGENT_CODE_TOOLS.values() for name in names]
+    all_results = code_tool_results(data_frames, names, stock, data_history_dir(data_dir))
+    for shard_name, frames in targets:
+        tool_results = all_results
+        if shard_name is not None:
+            teachers = frames.get("incentives_data", frames.get("teacher_data"))
+            teacher_ids = [] if teachers is None else teachers["teacher_id"].astype(str).tolist()
+            tool_results = slice_tool_results(all_results, shard_villages[shard_name], teacher_ids)
+        planned, planned_records = plan_updates(frames, state, inline_data, force, renderer, budgets, shard_name,
+                                                tool_specs(tool_results, stock), stock)
+        records.update(planned_records)
+        if planned:
+            descriptions.update(planned)
+            # Update agents with new data
+            agents.update(update_agents(frames, inline_data=inline_data, descriptions=planned,
+                                        registry=registry, stock=stock, tool_results=tool_results))
+    if renderer.report and not shard:
+        print(f"Context tokens per table:\n{renderer.format_report()}")
+    skipped = [name for name in records if name not in descriptions]
+    if not descriptions:
+        print("No agent data changed; nothing to update.")
+        save_state(state, state_path)
+        return {"pushed": [], "skipped": skipped, "failed": []}
+    print(f"Updating agents with new data: {', '.join(descriptions)}")
     
     # Deploy updated agents
     print("Deploying updated agents...")
+    pushed, failed = [], []
     for agent_name, agent in agents.items():
         try:
-            agent.update()
+            with span("agent_api", op="update", agent=agent_name):
+                agent.update()
             print(f"Successfully updated {agent_name}")
         except Exception as e:
             print(f"Error updating {agent_name}: {str(e)}")
+            failed.append(agent_name)
+            continue
+        pushed.append(agent_name)
+        state["agents"][agent_name] = dict(records[agent_name], description=hash_text(descriptions[agent_name]))
+    save_state(state, state_path)
+
+    # Answers cached against the old data are no longer valid
+    if pushed:
+        cache = ResponseCache()
+        for agent_name in pushed + ["team"]:
+            cache.invalidate(agent_name)
+        cache.close()
     
-    print("\nUpdate complete! All agents have been updated with new data.")
+    print(f"\nUpdate complete! Pushed: {pushed or 'none'}; skipped unchanged: {skipped or 'none'}")
+    if failed:
+        print(f"Failed (will be retried next run): {failed}")
+    print(f"Cache hit rates: {get_metrics().hit_rates()}")
+    return {"pushed": pushed, "skipped": skipped, "failed": failed}
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retrain agents with the latest data")
+    parser.add_argument("--no-inline-data", action="store_true",
+                        help="leave tables out of agent descriptions and rely on per-query retrieval")
+    parser.add_argument("--force", action="store_true",
+                        help="push every agent even if its data is unchanged")
+    parser.add_argument("--state-file", default=RETRAIN_STATE_FILE,
+                        help="where to record what each agent was last pushed with")
+    parser.add_argument("--context-format", choices=FORMATS, default="csv",
+                        help="how tables are rendered into agent descriptions")
+    parser.add_argument("--token-budget", type=int,
+                        help="prompt tokens per agent for its tables (default: AGENT_TOKEN_BUDGETS)")
+    parser.add_argument("--shard", action="store_true",
+                        help="give every village shard its own agent copies; global agents get per-village summaries")
+    parser.add_argument("--shard-groups",
+                        help="JSON file of {district: [village_ids]} to shard by district instead of by village")
+    parser.add_argument("--villages-per-shard", type=int, default=1,
+                        help="villages per shard for villages in no district group")
+    parser.add_argument("--metrics-prom", help="write timings, prompt sizes and cache counters here (Prometheus text)")
+    parser.add_argument("--metrics-jsonl", help="append every timed operation here as JSON lines")
+    parser.add_argument("--profile", help="dump cProfile stats of the run to this file")
+    args = parser.parse_args()
+    if args.metrics_prom or args.metrics_jsonl:
+        configure(args.metrics_prom, args.metrics_jsonl)
+    with profile(args.profile):
+        main(inline_data=not args.no_inline_data, force=args.force, state_path=args.state_file,
+             context_format=args.context_format, token_budget=args.token_budget, shard=args.shard,
+             groups_path=args.shard_groups, villages_per_shard=args.villages_per_shard)
@@ -0,0 +1,369 @@
+"""Long-running retrain daemon that watches the data directory.
+
+Instead of running retrain_agents.py by hand, the daemon watches the CSV
+files and the incentive stock file of a data directory (inotify on Linux, polling elsewhere or with
+--poll) and pushes new data to the agents on its own:
+
+- bursts of writes are debounced: a push starts once the files have been
+  quiet for --debounce seconds;
+- changes that arrive while a push is running are coalesced into a single
+  follow-up push;
+- only the tables that changed are reloaded, and retrain_agents pushes
+  only the agents whose descriptions changed.
+
+Queue depth (tables waiting for a push), last-push latency and counters
+are written to --status-file after every change and push, and pushes are
+timed under retrain_push_seconds. With --mock the agents live on an
+in-process mock server, so the daemon can be soak-tested offline:
+
+    python retrain_daemon.py --data-dir SampleData --debounce 2 --mock
+"""
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import threading
+import time
+
+from metrics import get_metrics, span
+
+DATA_TABLES = ["teacher_data", "training_data", "incentives_data", "community_data", "student_data"]
+# The incentive stock (allocation.STOCK_FILE) is watched like a table: a
+# change re-solves the allocation behind the incentive agent's tool
+STOCK_TABLE = "incentive_stock"
+WATCHED_TABLES = DATA_TABLES + [STOCK_TABLE]
+STATUS_FILE = ".retrain_daemon.json"
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_of(table):
+    """File name in the data directory that a watched table is kept in."""
+    return f"{table}.json" if table == STOCK_TABLE else f"{table}.csv"
+
+
+def table_of(file_name):
+    """Watched table a file in the data directory holds, or None for other files."""
+    table, _ = os.path.splitext(file_name)
+    return table if table in WATCHED_TABLES and file_of(table) == file_name else None
+
+
+class PollingWatcher:
+    """Detects changed tables by comparing file mtimes and sizes."""
+
+    def __init__(self, data_dir, interval=1.0):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.seen = self._scan()
+
+    def _scan(self):
+        files = {}
+        for table in WATCHED_TABLES:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, file_of(table)))
+            except FileNotFoundError:
+                continue
+            files[table] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def changes(self, timeout):
+        """Tables changed since the last call, waiting up to timeout seconds."""
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {table for table in set(current) | set(self.seen) if current.get(table) != self.seen.get(table)}
+        self.seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Reports changed tables from inotify events on the data directory (Linux only)."""
+
+    def __init__(self, data_dir):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(data_dir), IN_WATCH_MASK) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {data_dir}")
+
+    def changes(self, timeout):
+        """Tables with events, waiting up to timeout seconds for the first one."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed, offset = set(), 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            table = table_of(os.fsdecode(name))
+            if table and mask & IN_WATCH_MASK:
+                changed.add(table)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(data_dir, poll=False, interval=1.0):
+    """inotify watcher when available, else a polling one."""
+    if not poll:
+        try:
+            return InotifyWatcher(data_dir)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {interval}s")
+    return PollingWatcher(data_dir, interval)
+
+
+class RetrainDaemon:
+    """Debounces table changes and pushes them through retrain(data_frames).
+
+    retrain defaults to retrain_agents.main with retrain_options; it may
+    return a summary with a "failed" list, and failed pushes are retried
+    after retry_delay seconds.
+    """
+
+    def __init__(self, data_dir="SampleData", debounce=2.0, watcher=None, retrain=None, retry_delay=30.0,
+                 status_path=STATUS_FILE, **retrain_options):
+        self.data_dir = data_dir
+        self.debounce = debounce
+        self.watcher = watcher or make_watcher(data_dir)
+        self.retrain = retrain or self._retrain
+        self.retry_delay = retry_delay
+        self.status_path = status_path
+        self.retrain_options = retrain_options
+        self.data_frames = {}
+        self.pending = set()
+        self.last_event = 0.0
+        self.retry_at = None
+        self.pushing = False
+        self.stopping = False
+        self.cond = threading.Condition()
+        self.status_lock = threading.Lock()
+        self.stats = {"events": 0, "pushes": 0, "failed_pushes": 0, "coalesced": 0, "last_push_seconds": None,
+                      "last_push_at": None, "last_push_tables": [], "last_result": None, "last_error": None}
+        self.threads = []
+
+    def _retrain(self, data_frames):
+        import retrain_agents
+
+        # data_dir so the incentive stock is read from the watched directory
+        return retrain_agents.main(data_frames=data_frames, data_dir=self.data_dir, **self.retrain_options)
+
+    # -- change tracking --------------------------------------------------
+
+    def notify(self, tables):
+        """Record changed tables; a push follows once they have been quiet for debounce seconds."""
+        with self.cond:
+            self.stats["events"] += 1
+            if self.pushing or self.pending:
+                self.stats["coalesced"] += 1
+            self.pending |= set(tables)
+            self.last_event = time.monotonic()
+            self.cond.notify_all()
+        get_metrics().inc("retrain_change_events_total")
+        self.write_status()
+
+    def _watch_loop(self):
+        while not self.stopping:
+            tables = self.watcher.changes(0.5)
+            if tables:
+                self.notify(tables)
+
+    def _wait(self):
+        """Seconds until a push is due (0 when due now), or None when nothing is waiting.
+
+        A scheduled retry holds back the pending tables too (the failed push
+        put them back), so a failing retrain runs once per retry_delay rather
+        than again as soon as the debounce has passed.
+        """
+        now = time.monotonic()
+        due = []
+        if self.pending:
+            due.append(self.last_event + self.debounce)
+        if self.retry_at is not None:
+            due.append(self.retry_at)
+        return max(0.0, max(due) - now) if due else None
+
+    def _push_loop(self):
+        while True:
+            with self.cond:
+                while not self.stopping and self._wait() != 0.0:
+                    self.cond.wait(self._wait())
+                if self.stopping:
+                    return
+                tables, self.pending, self.retry_at = self.pending, set(), None
+                self.pushing = True
+            try:
+                self.push(tables)
+            finally:
+                with self.cond:
+                    self.pushing = False
+            self.write_status()
+
+    # -- pushing ----------------------------------------------------------
+
+    def load(self):
+        """Load every table (at start)."""
+        from retrain_agents import load_data
+
+        self.data_frames = load_data(self.data_dir)
+
+    def reload(self, tables):
+        """Reload only the given tables; tables whose file is gone are dropped.
+
+        The stock is not held here: retrain reads it from data_dir on every push.
+        """
+        from data_loader import load_table
+
+        for table in sorted(set(tables) - {STOCK_TABLE}):
+            path = os.path.join(self.data_dir, f"{table}.csv")
+            if not os.path.exists(path):
+                print(f"Warning: {table}.csv was removed from {self.data_dir}")
+                self.data_frames.pop(table, None)
+                continue
+            with span("load_table", table=table):
+                self.data_frames[table] = load_table(path, table)
+
+    def push(self, tables):
+        """Reload the changed tables and push the agents that depend on them."""
+        started = time.perf_counter()
+        print(f"Pushing changes to: {', '.join(sorted(tables)) or 'failed agents'}")
+        try:
+            with span("retrain_push"):
+                self.reload(tables)
+                result = self.retrain(self.data_frames)
+        except Exception as e:
+            print(f"Push failed: {e}; retrying in {self.retry_delay}s")
+            with self.cond:
+                self.pending |= set(tables)
+                self.retry_at = time.monotonic() + self.retry_delay
+                self.stats["failed_pushes"] += 1
+                self.stats["last_error"] = str(e)
+            return None
+        with self.cond:
+            self.stats["pushes"] += 1
+            self.stats["last_push_seconds"] = round(time.perf_counter() - started, 3)
+            self.stats["last_push_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.stats["last_push_tables"] = sorted(tables)
+            self.stats["last_result"] = result
+            self.stats["last_error"] = None
+            if isinstance(result, dict) and result.get("failed"):
+                # Agents that failed to update are picked up by the next push
+                self.retry_at = time.monotonic() + self.retry_delay
+        return result
+
+    def status(self):
+        """Queue depth, whether a push is running, and push counters and latency."""
+        with self.cond:
+            return dict(self.stats, queue_depth=len(self.pending), pending=sorted(self.pending),
+                        pushing=self.pushing, retry_scheduled=self.retry_at is not None)
+
+    def write_status(self):
+        if not self.status_path:
+            return
+        status = self.status()
+        with self.status_lock:
+            tmp_path = f"{self.status_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(status, f, indent=2, default=str)
+            os.replace(tmp_path, self.status_path)
+
+    # -- lifecycle --------------------------------------------------------
+
+    def start(self, initial_push=True):
+        """Load the tables, optionally push what changed since the last run, and start watching."""
+        self.load()
+        if initial_push:
+            self.push(set())
+        self.threads = [threading.Thread(target=self._watch_loop, name="retrain-watch", daemon=True),
+                        threading.Thread(target=self._push_loop, name="retrain-push", daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        self.write_status()
+
+    def stop(self, timeout=None):
+        """Stop watching; a running push is allowed to finish."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.watcher.close()
+        self.write_status()
+
+    def run_forever(self):
+        """Run until SIGINT/SIGTERM."""
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        self.start()
+        print(f"Watching {self.data_dir} (debounce {self.debounce}s); status in {self.status_path}")
+        while not stop.wait(1.0):
+            pass
+        print("Stopping: waiting for a running push to finish...")
+        self.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    from metrics import configure
+    from rendering import FORMATS
+
+    parser = argparse.ArgumentParser(description="Watch the data directory and push changes to the agents")
+    parser.add_argument("--data-dir", default="SampleData")
+    parser.add_argument("--debounce", type=float, default=2.0, help="seconds of quiet before a push")
+    parser.add_argument("--poll", action="store_true", help="poll file mtimes instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--retry-delay", type=float, default=30.0, help="seconds before a failed push is retried")
+    parser.add_argument("--status-file", default=STATUS_FILE, help="queue depth and push latency are written here")
+    parser.add_argument("--state-file", help="retrain state file (default: retrain_agents' own)")
+    parser.add_argument("--no-inline-data", action="store_true")
+    parser.add_argument("--context-format", choices=FORMATS, default="csv")
+    parser.add_argument("--token-budget", type=int)
+    parser.add_argument("--mock", action="store_true", help="push to an in-process mock server instead of aiXplain")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--metrics-prom", help="write timings and counters here (Prometheus text)")
+    parser.add_argument("--metrics-jsonl", help="append every timed operation here as JSON lines")
+    args = parser.parse_args(argv)
+
+    if args.metrics_prom or args.metrics_jsonl:
+        configure(args.metrics_prom, args.metrics_jsonl)
+    if args.mock:
+        from mock_server import install_mock_sdk, start_mock_server
+
+        server = start_mock_server(latency_ms=args.mock_latency_ms)
+        install_mock_sdk(server.url)
+        print(f"Using mock backend at {server.url}")
+
+    options = {"inline_data": not args.no_inline_data, "context_format": args.context_format,
+               "token_budget": args.token_budget}
+    if args.state_file:
+        options["state_path"] = args.state_file
+    daemon = RetrainDaemon(args.data_dir, args.debounce, make_watcher(args.data_dir, args.poll, args.poll_interval),
+                           retry_delay=args.retry_delay, status_path=args.status_file, **options)
+    daemon.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Local retrieval over the program data tables.
+
+Instead of pasting every table into the agent description, a query is sent
+with only the rows that are keyed to its village/teacher or rank highest
+for its text.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+# Columns that identify a row and can be looked up directly
+KEY_COLUMNS = ["village_id", "teacher_id", "student_id"]
+
+# Tables each action type is allowed to draw context from
+ACTION_TABLES = {
+    "recruitment": ["teacher_data", "community_data"],
+    "training": ["training_data"],
+    "incentives": ["incentives_data", "teacher_data"],
+    "community": ["community_data"],
+    "progress": ["student_data", "teacher_data", "community_data"],
+    "full_cycle": [
+        "teacher_data",
+        "training_data",
+        "incentives_data",
+        "community_data",
+        "student_data"
+    ]
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric terms."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class BM25Index:
+    """Okapi BM25 index over a list of tokenized documents."""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.doc_lengths) / len(documents)) if documents else 0.0
+        self.postings = defaultdict(list)
+        for doc_id, doc in enumerate(documents):
+            for term, freq in Counter(doc).items():
+                self.postings[term].append((doc_id, freq))
+        n_docs = len(documents)
+        self.idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def scores(self, query, candidates=None):
+        """Return {doc_id: score} for documents matching any query term."""
+        result = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[term]:
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1.0)
+                result[doc_id] += idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+        return result
+
+    def search(self, query, top_k=5, candidates=None):
+        """Return the top_k (doc_id, score) pairs for a query."""
+        ranked = sorted(self.scores(query, candidates).items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+
+class DataIndex:
+    """Keyed and lexical index over the program data tables.
+
+    Rows can be looked up directly by village_id, teacher_id or student_id,
+    and ranked against free-text queries with BM25. This lets a query carry
+    only the handful of rows relevant to it instead of every table.
+    """
+
+    def __init__(self, data_frames):
+        self.tables = {}
+        self.keys = {}
+        self.text_index = {}
+        for name, df in data_frames.items():
+            self.tables[name] = df
+            self.keys[name] = self._build_keys(df)
+            self.text_index[name] = BM25Index(self._documents(df))
+
+    @staticmethod
+    def _build_keys(df):
+        keys = {}
+        for column in KEY_COLUMNS:
+            if column in df.columns:
+                positions = defaultdict(list)
+                for position, value in enumerate(df[column].astype(str)):
+                    positions[value].append(position)
+                keys[column] = dict(positions)
+        return keys
+
+    @staticmethod
+    def _documents(df):
+        text_columns = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c]) or c in KEY_COLUMNS]
+        if not text_columns:
+            return [[] for _ in range(len(df))]
+        joined = df[text_columns].astype(str).agg(" ".join, axis=1)
+        return [tokenize(text) for text in joined]
+
+    def lookup(self, table, village_id=None, teacher_id=None, student_id=None):
+        """Return row positions in a table matching the given keys.
+
+        Returns None when none of the given keys apply to the table.
+        """
+        wanted = {"village_id": village_id, "teacher_id": teacher_id, "student_id": student_id}
+        matches = None
+        for column, value in wanted.items():
+            if value is None or column not in self.keys.get(table, {}):
+                continue
+            positions = set(self.keys[table][column].get(str(value), []))
+            matches = positions if matches is None else matches & positions
+        return matches
+
+    def search(self, table, query, top_k=5, village_id=None, teacher_id=None, student_id=None):
+        """Return the top_k rows of a table for a query as a DataFrame."""
+        df = self.tables.get(table)
+        if df is None:
+            return pd.DataFrame()
+        candidates = self.lookup(table, village_id, teacher_id, student_id)
+        ranked = [doc_id for doc_id, _ in self.text_index[table].search(query, top_k, candidates)]
+        if candidates is not None and len(ranked) < top_k:
+            # Keyed matches are relevant even when they share no query terms
+            extra = sorted(candidates.difference(ranked))
+            ranked.extend(extra[:top_k - len(ranked)])
+        return df.iloc[ranked]
+
+    def build_context(self, query, tables=None, top_k=5, village_id=None, teacher_id=None, student_id=None):
+        """Render the relevant rows of each table as a compact text block."""
+        sections = []
+        for table in tables or list(self.tables):
+            rows = self.search(table, query, top_k, village_id, teacher_id, student_id)
+            if rows.empty:
+                continue
+            sections.append(f"{table}:\n{rows.to_csv(index=False).strip()}")
+        return "\n\n".join(sections)
@@ -1,206 +1,314 @@
 #@title  setup environment
+# Nothing runs on import: main() uploads the data, creates, tests and deploys
+# the agents. The aixplain SDK, pandas and google.colab are imported on use.
 
 import os
-import pandas as pd
-from aixplain.factories import AgentFactory, TeamAgentFactory
-from aixplain.modules.agent.tool.model_tool import ModelTool
-from google.colab import files
+import sys
+
+# Run as `python scripts/CreateAgent.py` the library modules are one directory up;
+# pasted into a notebook cell there is no __file__ and they are importable already
+if "__file__" in globals():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import get_metrics, span
+
+
+# Agent API calls are timed under agent_api{op, agent}; set METRICS_PROMETHEUS_FILE
+# or METRICS_JSONL_FILE to export the timings
+def timed(op, agent, fn):
+    return get_metrics().instrumented(fn, "agent_api", op=op, agent=agent)
 
 
 # Step 2: Upload and prepare data files
-print("Please upload your CSV files (teacher_data.csv, training_data.csv, incentives_data.csv, community_data.csv, student_data.csv)")
-uploaded = files.upload()  # This will prompt you to upload files
+def upload_data():
+    """Ask for the CSV files in Colab and read them; outside Colab read SampleData.
+
+    Uploads are parsed with the typed loader, like SampleData, so unquoted
+    multi-value fields are repaired the same way."""
+    from data_loader import SCHEMAS, read_table
 
-# Reading the uploaded CSV files
-file_names = list(uploaded.keys())
-data_frames = {}
+    try:
+        from google.colab import files
+    except ImportError:
+        from retrain_agents import load_data
+        print("Not running in Colab; reading the tables from SampleData")
+        return load_data()
+
+    print("Please upload your CSV files (teacher_data.csv, training_data.csv, incentives_data.csv, community_data.csv, student_data.csv)")
+    uploaded = files.upload()  # This will prompt you to upload files
+
+    # Reading the uploaded CSV files
+    data_frames = {}
+    for file_name in uploaded.keys():
+        # Skip non-CSV files if any
+        if not file_name.endswith('.csv'):
+            continue
+        table = file_name.replace('.csv', '')
+        if table not in SCHEMAS:
+            print(f"Skipping {file_name}: not one of the program tables")
+            continue
+        with span("load_table", table=table):
+            data_frames[table] = read_table(file_name, table)
+    return data_frames
 
-for file_name in file_names:
-    # Skip non-CSV files if any
-    if not file_name.endswith('.csv'):
-        continue
-    data_frames[file_name.replace('.csv', '')] = pd.read_csv(file_name)
 
 # Step 3: Create agents without vector tools (simplified version)
+def create_tools(data_frames, stock=None, history_dir=None):
+    """Tools per agent name: model tools plus code tools with pre-computed figures.
+
+    stock ({item: count}) limits the incentive allocation, and history_dir
+    holds the village snapshots behind the progress deltas."""
+    from aixplain.modules.agent.tool.model_tool import ModelTool
+
+    from retrain_agents import AGENT_CODE_TOOLS, code_tool, code_tool_specs
+
+    def code_tools(agent_name):
+        """An agent's code tools with pre-computed figures (none if the SDK has no code tools)"""
+        specs = code_tool_specs(data_frames, AGENT_CODE_TOOLS[agent_name], stock, history_dir)
+        return [tool for tool in map(code_tool, specs.values()) if tool is not None]
+
+    # Speech synthesis tool
+    speech_synthesis_tool = ModelTool(
+        model="6171efa6159531495cadefc2",  # aiXplain - Text to Speech
+        description="Converts text to speech for creating audio learning materials"
+    )
+
+    # Translation tool
+    translation_tool = ModelTool(
+        model="61b097551efecf30109d32da",  # aiXplain - Translation (OPUS-MT)
+        description="Translates content between languages to support multilingual education"
+    )
+
+    return {
+        "teacher_recruitment": code_tools("teacher_recruitment"),
+        "training_mentorship": [speech_synthesis_tool],
+        "incentive_management": code_tools("incentive_management"),
+        "community_engagement": [translation_tool, speech_synthesis_tool],
+        "progress_monitoring": code_tools("progress_monitoring")
+    }
+
+
+def render_contexts(data_frames):
+    """Compact table text within each agent's token budget; tables shared by
+    several agents are serialized once"""
+    from rendering import ContextRenderer
+    from retrain_agents import AGENT_TABLES, AGENT_TOKEN_BUDGETS
+
+    renderer = ContextRenderer()
+    contexts = {
+        agent: renderer.render_tables(data_frames, tables, AGENT_TOKEN_BUDGETS[agent], agent=agent)
+        for agent, tables in AGENT_TABLES.items()
+    }
+    print(f"Context tokens per table:\n{renderer.format_report()}")
+    return contexts
+
+
+def create_agents(data_frames, stock=None, history_dir=None):
+    """Create the five specialist agents and the team agent."""
+    from aixplain.factories import AgentFactory, TeamAgentFactory
+
+    tools = create_tools(data_frames, stock, history_dir)
+    contexts = render_contexts(data_frames)
 
-# Speech synthesis tool
-speech_synthesis_tool = ModelTool(
-    model="6171efa6159531495cadefc2",  # aiXplain - Text to Speech
-    description="Converts text to speech for creating audio learning materials"
-)
-
-# Translation tool
-translation_tool = ModelTool(
-    model="61b097551efecf30109d32da",  # aiXplain - Translation (OPUS-MT)
-    description="Translates content between languages to support multilingual education"
-)
-
-# Create Individual Agents
-teacher_recruitment_agent = AgentFactory.create(
-    name="Teacher Recruitment Agent",
-    description="""You are an agent that helps identify and recruit educated rural youth
-    to become part-time teachers in their villages. You prioritize women candidates when
-    appropriate and match candidates with teaching opportunities based on their skills,
-    education level, and village proximity. You explain the non-monetary incentive system
-    (farming tools, food supplies, scholarships) to candidates. 
+    # Create Individual Agents
+    teacher_recruitment_agent = timed("create", "teacher_recruitment", AgentFactory.create)(
+        name="Teacher Recruitment Agent",
+        description="""You are an agent that helps identify and recruit educated rural youth
+        to become part-time teachers in their villages. You prioritize women candidates when
+        appropriate and match candidates with teaching opportunities based on their skills,
+        education level, and village proximity. You explain the non-monetary incentive system
+        (farming tools, food supplies, scholarships) to candidates. 
     
-    Here's the teacher data you have access to:
-    """ + pd.DataFrame(data_frames.get('teacher_data', pd.DataFrame())).to_string() + """
+        Here's the teacher data you have access to:
+        """ + contexts['teacher_recruitment']['teacher_data'] + """
     
-    Here's the community data you have access to:
-    """ + pd.DataFrame(data_frames.get('community_data', pd.DataFrame())).to_string(),
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
-
-training_mentorship_agent = AgentFactory.create(
-    name="Training and Mentorship Agent",
-    description="""You are an agent that provides educational resources, training materials,
-    and ongoing mentorship to rural part-time teachers. You help simplify complex educational
-    concepts, suggest interactive teaching methods for rural settings with limited resources,
-    and provide guidance on engaging students effectively. You particularly focus on strategies
-    to promote girls' education and create inclusive learning environments.
+        Here's the community data you have access to:
+        """ + contexts['teacher_recruitment']['community_data'],
+        tools=tools['teacher_recruitment'],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    training_mentorship_agent = timed("create", "training_mentorship", AgentFactory.create)(
+        name="Training and Mentorship Agent",
+        description="""You are an agent that provides educational resources, training materials,
+        and ongoing mentorship to rural part-time teachers. You help simplify complex educational
+        concepts, suggest interactive teaching methods for rural settings with limited resources,
+        and provide guidance on engaging students effectively. You particularly focus on strategies
+        to promote girls' education and create inclusive learning environments.
     
-    Here's the training data you have access to:
-    """ + pd.DataFrame(data_frames.get('training_data', pd.DataFrame())).to_string() + """
+        Here's the training data you have access to:
+        """ + contexts['training_mentorship']['training_data'] + """
     
-    Basic mathematics teaching methods for rural settings: Focus on using everyday objects for counting, 
-    measuring, and basic arithmetic. Use local contexts like farming calculations, market transactions, 
-    and household budgeting to make concepts relevant.
+        Basic mathematics teaching methods for rural settings: Focus on using everyday objects for counting, 
+        measuring, and basic arithmetic. Use local contexts like farming calculations, market transactions, 
+        and household budgeting to make concepts relevant.
     
-    Language teaching in multilingual rural contexts: Start with familiar local language, 
-    use storytelling from local traditions, gradually introduce national language, 
-    use practical applications like letter writing and form filling.
+        Language teaching in multilingual rural contexts: Start with familiar local language, 
+        use storytelling from local traditions, gradually introduce national language, 
+        use practical applications like letter writing and form filling.
     
-    Science teaching with minimal resources: Use nature as laboratory, observe local plants and animals, 
-    study agricultural practices, discuss weather patterns and seasonal changes, 
-    use simple household items for experiments.
+        Science teaching with minimal resources: Use nature as laboratory, observe local plants and animals, 
+        study agricultural practices, discuss weather patterns and seasonal changes, 
+        use simple household items for experiments.
     
-    Effective teaching methods for mixed-age classrooms: Group activities by ability rather than age, 
-    use peer teaching where older students help younger ones, rotate attention between groups, 
-    use self-directed activities, incorporate games and interactive learning.""",
-    tools=[speech_synthesis_tool],
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
-
-incentive_management_agent = AgentFactory.create(
-    name="Incentive Management Agent",
-    description="""You are an agent that tracks teacher participation and manages the 
-    non-monetary incentives program. You help match teachers with appropriate incentives 
-    such as farming tools, ration kits, school supplies, or scholarships based on their 
-    needs and teaching contributions. You ensure fair distribution of resources and maintain
-    records of allocated incentives.
+        Effective teaching methods for mixed-age classrooms: Group activities by ability rather than age, 
+        use peer teaching where older students help younger ones, rotate attention between groups, 
+        use self-directed activities, incorporate games and interactive learning.""",
+        tools=tools['training_mentorship'],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    incentive_management_agent = timed("create", "incentive_management", AgentFactory.create)(
+        name="Incentive Management Agent",
+        description="""You are an agent that tracks teacher participation and manages the 
+        non-monetary incentives program. You help match teachers with appropriate incentives 
+        such as farming tools, ration kits, school supplies, or scholarships based on their 
+        needs and teaching contributions. You ensure fair distribution of resources and maintain
+        records of allocated incentives.
     
-    Here's the incentives data you have access to:
-    """ + pd.DataFrame(data_frames.get('incentives_data', pd.DataFrame())).to_string() + """
+        Here's the incentives data you have access to:
+        """ + contexts['incentive_management']['incentives_data'] + """
     
-    Here's the teacher data you have access to:
-    """ + pd.DataFrame(data_frames.get('teacher_data', pd.DataFrame())).to_string(),
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
-
-community_engagement_agent = AgentFactory.create(
-    name="Community Engagement Agent",
-    description="""You are an agent that facilitates communication between teachers, parents, 
-    and village elders. You help organize community meetings, gather feedback from parents, 
-    and ensure education is valued as a shared responsibility. You promote parental involvement
-    in children's education and help address community concerns about education, especially
-    for girls.
+        Here's the teacher data you have access to:
+        """ + contexts['incentive_management']['teacher_data'],
+        tools=tools['incentive_management'],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    community_engagement_agent = timed("create", "community_engagement", AgentFactory.create)(
+        name="Community Engagement Agent",
+        description="""You are an agent that facilitates communication between teachers, parents, 
+        and village elders. You help organize community meetings, gather feedback from parents, 
+        and ensure education is valued as a shared responsibility. You promote parental involvement
+        in children's education and help address community concerns about education, especially
+        for girls.
     
-    Here's the community data you have access to:
-    """ + pd.DataFrame(data_frames.get('community_data', pd.DataFrame())).to_string(),
-    tools=[translation_tool, speech_synthesis_tool],
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
-
-progress_monitoring_agent = AgentFactory.create(
-    name="Progress Monitoring Agent",
-    description="""You are an agent that tracks student attendance, learning outcomes, 
-    and program growth. You analyze data to identify trends, success stories, and areas 
-    needing improvement. You create progress reports for stakeholders and suggest 
-    interventions for students or villages showing concerning patterns.
+        Here's the community data you have access to:
+        """ + contexts['community_engagement']['community_data'],
+        tools=tools['community_engagement'],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    progress_monitoring_agent = timed("create", "progress_monitoring", AgentFactory.create)(
+        name="Progress Monitoring Agent",
+        description="""You are an agent that tracks student attendance, learning outcomes, 
+        and program growth. You analyze data to identify trends, success stories, and areas 
+        needing improvement. You create progress reports for stakeholders and suggest 
+        interventions for students or villages showing concerning patterns.
     
-    Here's the student data you have access to:
-    """ + pd.DataFrame(data_frames.get('student_data', pd.DataFrame())).to_string() + """
+        Here's the student data you have access to:
+        """ + contexts['progress_monitoring']['student_data'] + """
     
-    Here's the teacher data you have access to:
-    """ + pd.DataFrame(data_frames.get('teacher_data', pd.DataFrame())).to_string() + """
+        Here's the teacher data you have access to:
+        """ + contexts['progress_monitoring']['teacher_data'] + """
     
-    Here's the community data you have access to:
-    """ + pd.DataFrame(data_frames.get('community_data', pd.DataFrame())).to_string(),
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
-
-# Create Team Agent
-rural_education_team = TeamAgentFactory.create(
-    name="Rural Education Team",
-    description="""You are a team that empowers educated rural youth—especially women—to 
-    become part-time teachers in their villages. You coordinate the recruitment, training, 
-    incentive management, community engagement, and progress monitoring aspects of the 
-    rural education program. You focus on creating sustainable education cycles within 
-    communities through non-monetary incentive systems.""",
-    agents=[
-        teacher_recruitment_agent,
-        training_mentorship_agent,
-        incentive_management_agent,
-        community_engagement_agent,
-        progress_monitoring_agent
-    ],
-    llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
-)
+        Here's the community data you have access to:
+        """ + contexts['progress_monitoring']['community_data'],
+        tools=tools['progress_monitoring'],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    # Create Team Agent
+    rural_education_team = timed("create", "team", TeamAgentFactory.create)(
+        name="Rural Education Team",
+        description="""You are a team that empowers educated rural youth—especially women—to 
+        become part-time teachers in their villages. You coordinate the recruitment, training, 
+        incentive management, community engagement, and progress monitoring aspects of the 
+        rural education program. You focus on creating sustainable education cycles within 
+        communities through non-monetary incentive systems.""",
+        agents=[
+            teacher_recruitment_agent,
+            training_mentorship_agent,
+            incentive_management_agent,
+            community_engagement_agent,
+            progress_monitoring_agent
+        ],
+        llm_id="6646261c6eb563165658bbb1"  # aiXplain - OpenAI GPT-4
+    )
+
+    return {
+        "teacher_recruitment": teacher_recruitment_agent,
+        "training_mentorship": training_mentorship_agent,
+        "incentive_management": incentive_management_agent,
+        "community_engagement": community_engagement_agent,
+        "progress_monitoring": progress_monitoring_agent,
+        "team": rural_education_team
+    }
+
 
 # Test Individual Agents
-print("Testing Teacher Recruitment Agent:")
-recruitment_response = teacher_recruitment_agent.run(
-    "Find qualified female candidates with at least high school education who can teach Mathematics in their villages."
-)
-print(recruitment_response)
-
-print("\nTesting Training & Mentorship Agent:")
-training_response = training_mentorship_agent.run(
-    "Suggest interactive mathematics teaching methods for a classroom with no electricity and limited supplies."
-)
-print(training_response)
-
-print("\nTesting Incentive Management Agent:")
-incentive_response = incentive_management_agent.run(
-    "Which incentives are currently available for teachers who have completed at least 3 months of teaching?"
-)
-print(incentive_response)
-
-print("\nTesting Community Engagement Agent:")
-community_response = community_engagement_agent.run(
-    "How can we increase parental support for girls' education in traditional communities?"
-)
-print(community_response)
-
-print("\nTesting Progress Monitoring Agent:")
-progress_response = progress_monitoring_agent.run(
-    "Which village shows the most improvement in student attendance over the last three months?"
-)
-print(progress_response)
-
-# Test Team Agent
-print("\nTesting Rural Education Team Agent:")
-team_response = rural_education_team.run("""
+TEST_QUERIES = {
+    "teacher_recruitment": ("Teacher Recruitment Agent",
+        "Find qualified female candidates with at least high school education who can teach Mathematics in their villages."),
+    "training_mentorship": ("Training & Mentorship Agent",
+        "Suggest interactive mathematics teaching methods for a classroom with no electricity and limited supplies."),
+    "incentive_management": ("Incentive Management Agent",
+        "Which incentives are currently available for teachers who have completed at least 3 months of teaching?"),
+    "community_engagement": ("Community Engagement Agent",
+        "How can we increase parental support for girls' education in traditional communities?"),
+    "progress_monitoring": ("Progress Monitoring Agent",
+        "Which village shows the most improvement in student attendance over the last three months?"),
+    "team": ("Rural Education Team Agent", """
 We need to expand our program to a new district with 5 villages. 
 How should we approach recruitment, training, incentives, community engagement, 
 and progress tracking?
 """)
-print(team_response)
+}
+
+
+def test_agents(agents):
+    """Run one sample query against each agent and print the answers."""
+    for agent_name, (label, query) in TEST_QUERIES.items():
+        print(f"\nTesting {label}:")
+        print(timed("run", agent_name, agents[agent_name].run)(query))
+
 
 # Deploy Agents
-print("\nDeploying all agents...")
-agent_ids = {
-    "Teacher Recruitment Agent": teacher_recruitment_agent.deploy(),
-    "Training & Mentorship Agent": training_mentorship_agent.deploy(),
-    "Incentive Management Agent": incentive_management_agent.deploy(),
-    "Community Engagement Agent": community_engagement_agent.deploy(),
-    "Progress Monitoring Agent": progress_monitoring_agent.deploy(),
-    "Rural Education Team": rural_education_team.deploy()
+DEPLOY_LABELS = {
+    "teacher_recruitment": "Teacher Recruitment Agent",
+    "training_mentorship": "Training & Mentorship Agent",
+    "incentive_management": "Incentive Management Agent",
+    "community_engagement": "Community Engagement Agent",
+    "progress_monitoring": "Progress Monitoring Agent",
+    "team": "Rural Education Team"
 }
 
-print("\nDeployment complete! Here are your agent IDs:")
-for agent_name, agent_id in agent_ids.items():
-    print(f"{agent_name} ID: {agent_id}")
 
-print("\nYou can now access these agents via the aixplain platform or API.")
\ No newline at end of file
+def deploy_agents(agents):
+    """Deploy every agent; returns {label: deploy result}."""
+    print("\nDeploying all agents...")
+    return {label: timed("deploy", agent_name, agents[agent_name].deploy)()
+            for agent_name, label in DEPLOY_LABELS.items()}
+
+
+def main():
+    from allocation import data_stock
+    from analytics import data_history_dir
+
+    data_frames = upload_data()
+    # An incentive_stock.json uploaded with the CSVs, else the one in SampleData
+    stock = data_stock(".") or data_stock("SampleData")
+    # Village snapshots for progress deltas, next to the data retrain_agents reads
+    history_dir = data_history_dir("SampleData" if os.path.isdir("SampleData") else ".")
+    agents = create_agents(data_frames, stock, history_dir)
+    test_agents(agents)
+    agent_ids = deploy_agents(agents)
+
+    print("\nDeployment complete! Here are your agent IDs:")
+    for agent_name, agent_id in agent_ids.items():
+        print(f"{agent_name} ID: {agent_id}")
+
+    print("\nYou can now access these agents via the aixplain platform or API.")
+    print(f"Cache hit rates: {get_metrics().hit_rates()}")
+    return agents
+
+
+if __name__ == "__main__":
+    agents = main()
+    # Keep the agent objects in the session for scripts/PipeLineAndRunTest.py
+    teacher_recruitment_agent = agents["teacher_recruitment"]
+    training_mentorship_agent = agents["training_mentorship"]
+    incentive_management_agent = agents["incentive_management"]
+    community_engagement_agent = agents["community_engagement"]
+    progress_monitoring_agent = agents["progress_monitoring"]
+    rural_education_team = agents["team"]
@@ -0,0 +1,191 @@
+"""Conversation sessions for coordinator follow-up questions.
+
+Without sessions every request is stateless, and coordinators paste
+earlier answers back into their next question, so prompts grow with every
+follow-up. A session keeps the conversation instead: recent turns are
+sent verbatim, and once the history passes max_tokens the oldest turns
+are folded into a running summary that is itself capped at
+summary_tokens, so a follow-up prompt stays about the same size however
+long the conversation gets.
+
+A session is pinned to the village_id/teacher_id of its first request.
+Follow-ups without ids inherit that scope; a follow-up about another
+village or teacher starts a fresh history rather than mixing scopes.
+
+Sessions live in memory with LRU eviction (MemorySessionStore), or in a
+SQLite file that survives restarts (SqliteSessionStore).
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from tokens import CHARS_PER_TOKEN, estimate_tokens
+
+SESSION_FILE = ".sessions.sqlite"
+
+
+class Session:
+    """One conversation: its scope, recent turns and the summary of older ones."""
+
+    def __init__(self, session_id, village_id=None, teacher_id=None, turns=None, summary="", updated=None):
+        self.session_id = session_id
+        self.village_id = village_id
+        self.teacher_id = teacher_id
+        self.turns = list(turns or [])
+        self.summary = summary
+        self.updated = updated or time.time()
+
+    def to_dict(self):
+        return {"session_id": self.session_id, "village_id": self.village_id, "teacher_id": self.teacher_id,
+                "turns": self.turns, "summary": self.summary, "updated": self.updated}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class MemorySessionStore:
+    """In-process sessions; the least recently used are evicted past max_sessions."""
+
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def put(self, session):
+        with self.lock:
+            self.sessions[session.session_id] = session
+            self.sessions.move_to_end(session.session_id)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+
+class SqliteSessionStore:
+    """Sessions in a SQLite file, with the same LRU bound."""
+
+    def __init__(self, path=SESSION_FILE, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, updated REAL, data TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS sessions_lru ON sessions (updated)")
+        self.db.commit()
+
+    def get(self, session_id):
+        with self.lock:
+            row = self.db.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return None if row is None else Session.from_dict(json.loads(row[0]))
+
+    def put(self, session):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                            (session.session_id, session.updated, json.dumps(session.to_dict())))
+            overflow = self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+            if overflow > 0:
+                self.db.execute("DELETE FROM sessions WHERE session_id IN"
+                                " (SELECT session_id FROM sessions ORDER BY updated LIMIT ?)", (overflow,))
+            self.db.commit()
+
+    def delete(self, session_id):
+        with self.lock:
+            self.db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def first_sentence(text, max_chars=200):
+    """First sentence of a text, cut to max_chars."""
+    text = re.sub(r"\s+", " ", str(text)).strip()
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3].rstrip() + "..."
+
+
+def extractive_summary(turns):
+    """One line per turn: the question and the first sentence of its answer."""
+    return "\n".join(f"- Q: {first_sentence(query, 120)} A: {first_sentence(answer)}" for query, answer in turns)
+
+
+def format_turns(turns):
+    return "\n\n".join(f"Coordinator: {query}\nAssistant: {answer}" for query, answer in turns)
+
+
+class SessionManager:
+    """Opens sessions, renders their history for a prompt and records new turns.
+
+    summarize(turns) folds turns into summary text; the default keeps the
+    question and first sentence of each answer, without a model call.
+    """
+
+    def __init__(self, store=None, max_tokens=1500, summary_tokens=400, answer_tokens=300, summarize=None):
+        self.store = store or MemorySessionStore()
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.answer_tokens = answer_tokens
+        self.summarize = summarize or extractive_summary
+
+    def open(self, session_id, village_id=None, teacher_id=None):
+        """The session, created or re-scoped as needed, with its scope filled in."""
+        session = self.store.get(session_id)
+        if session is None:
+            return Session(session_id, village_id, teacher_id)
+        if (village_id and village_id != session.village_id) or (teacher_id and teacher_id != session.teacher_id):
+            # A different village or teacher: keep the session id, not the history
+            return Session(session_id, village_id or session.village_id, teacher_id or session.teacher_id)
+        return session
+
+    def history(self, session):
+        """Summary and recent turns as prompt text ("" for a new session)."""
+        parts = []
+        if session.summary:
+            parts.append(f"Summary of earlier questions:\n{session.summary}")
+        if session.turns:
+            parts.append(format_turns(session.turns))
+        return "\n\n".join(parts)
+
+    def record(self, session, query, answer):
+        """Add a turn, compact the history if it is over budget, and save the session."""
+        answer = str(answer)
+        max_chars = self.answer_tokens * CHARS_PER_TOKEN
+        if len(answer) > max_chars:
+            answer = answer[:max_chars].rstrip() + " ..."
+        session.turns.append((query, answer))
+        self.compact(session)
+        session.updated = time.time()
+        self.store.put(session)
+
+    def compact(self, session):
+        """Fold the oldest turns into the summary until the history fits max_tokens.
+
+        Returns the number of turns folded.
+        """
+        folded = 0
+        while len(session.turns) > 1 and estimate_tokens(self.history(session)) > self.max_tokens:
+            turn = session.turns.pop(0)
+            session.summary = self._trim("\n".join(filter(None, [session.summary, self.summarize([turn])])))
+            folded += 1
+        return folded
+
+    def _trim(self, summary):
+        """The newest lines of a summary that fit summary_tokens."""
+        lines = summary.splitlines()
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""Village-sharded agent contexts.
+
+Most coordinator queries name a village, yet every agent holds data for
+all villages. In sharded mode each table is partitioned by village_id
+(one shard per village, per run of villages, or per district group from a
+JSON file of {group: [village_ids]}) and every specialist agent gets one
+copy per shard, named "<agent>@<shard>", whose description holds only
+that shard's rows. The unsharded agents become global summary agents
+whose descriptions hold per-village aggregates instead of rows.
+
+Queries with a village_id are routed to the agent of that village's
+shard; queries without one, and team queries, go to the global agent.
+The village-to-shard map is written to SHARD_FILE by retrain_agents and
+read back on the query side.
+"""
+import json
+import os
+
+import pandas as pd
+
+SHARD_FILE = ".shards.json"
+SHARD_SEPARATOR = "@"
+
+
+def shard_agent_name(agent_name, shard=None):
+    """Name of an agent's copy for a shard ("teacher_recruitment@V001")."""
+    return f"{agent_name}{SHARD_SEPARATOR}{shard}" if shard else agent_name
+
+
+def base_agent_name(name):
+    """Agent name without its shard."""
+    return name.split(SHARD_SEPARATOR, 1)[0]
+
+
+def shard_of_name(name):
+    """Shard of a sharded agent name, or None for a global agent."""
+    parts = name.split(SHARD_SEPARATOR, 1)
+    return parts[1] if len(parts) == 2 else None
+
+
+def village_column(data_frames, table):
+    """village_id of every row of a table, or None when the table has no village.
+
+    Tables keyed by teacher_id (incentives_data) take the teacher's village.
+    """
+    df = data_frames[table]
+    if "village_id" in df.columns:
+        return df["village_id"].astype("string")
+    teachers = data_frames.get("teacher_data")
+    if "teacher_id" in df.columns and teachers is not None and table != "teacher_data":
+        villages = teachers.drop_duplicates("teacher_id", keep="last").set_index("teacher_id")["village_id"]
+        return df["teacher_id"].map(villages.astype("string")).astype("string")
+    return None
+
+
+class ShardMap:
+    """Maps village ids to shard names."""
+
+    def __init__(self, shards):
+        self.shards = dict(shards)
+
+    @classmethod
+    def build(cls, data_frames, groups=None, villages_per_shard=1):
+        """Shard every village found in the tables.
+
+        With groups ({group: [village_ids]}) villages are sharded by group;
+        villages in no group, or all villages without groups, are sharded in
+        sorted runs of villages_per_shard.
+        """
+        villages = set()
+        for table in data_frames:
+            column = village_column(data_frames, table)
+            if column is not None:
+                villages.update(column.dropna().unique())
+        shards = {}
+        for group, members in (groups or {}).items():
+            for village in members:
+                shards[str(village)] = str(group)
+        ungrouped = sorted(village for village in villages if village not in shards)
+        for start in range(0, len(ungrouped), villages_per_shard):
+            run = ungrouped[start:start + villages_per_shard]
+            name = run[0] if len(run) == 1 else f"{run[0]}-{run[-1]}"
+            shards.update(dict.fromkeys(run, name))
+        return cls(shards)
+
+    def shard_of(self, village_id):
+        """Shard of a village, or None for an unknown village."""
+        return self.shards.get(str(village_id).strip()) if village_id else None
+
+    def names(self):
+        """Shard names, sorted."""
+        return sorted(set(self.shards.values()))
+
+    def save(self, path=SHARD_FILE):
+        """Write the shard map atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"shards": self.shards}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=SHARD_FILE):
+        """The saved shard map, or None when agents are not sharded."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls(json.load(f)["shards"])
+
+
+def load_groups(path):
+    """District groups from a JSON file of {group: [village_ids]}."""
+    with open(path) as f:
+        return {str(group): [str(village) for village in villages] for group, villages in json.load(f).items()}
+
+
+def partition(data_frames, shard_map):
+    """Split every table by shard. Returns {shard: {table: rows}}.
+
+    Tables without a village are copied into every shard.
+    """
+    names = shard_map.names()
+    shards = {name: {} for name in names}
+    for table, df in data_frames.items():
+        column = village_column(data_frames, table)
+        if column is None:
+            for name in names:
+                shards[name][table] = df
+            continue
+        keys = column.map(shard_map.shards)
+        groups = dict(list(df.groupby(keys.to_numpy(), sort=False)))
+        for name in names:
+            rows = groups.get(name)
+            shards[name][table] = (df.iloc[0:0] if rows is None else rows).reset_index(drop=True)
+    return shards
+
+
+def summary_frames(data_frames):
+    """Per-village aggregates of every table, for the global summary agents.
+
+    Each table becomes one row per village with its row count and the mean
+    of its numeric columns. Tables without a village are kept as they are.
+    """
+    summaries = {}
+    for table, df in data_frames.items():
+        column = village_column(data_frames, table)
+        if column is None:
+            summaries[table] = df
+            continue
+        grouped = df.groupby(column.to_numpy(), sort=True)
+        summary = pd.DataFrame({"rows": grouped.size()})
+        numeric = list(df.select_dtypes("number").columns)
+        if numeric:
+            means = grouped[numeric].mean().astype("float64").round(2)
+            summary = summary.join(means.add_suffix("_mean"))
+        summaries[table] = summary.rename_axis("village_id").reset_index()
+    return summaries
+
+
+def route(agent_name, village_id=None, shard_map=None):
+    """Agent to send a query to: the village's shard agent, else the global one."""
+    if shard_map is None or agent_name in (None, "team"):
+        return agent_name
+    shard = shard_map.shard_of(village_id)
+    return shard_agent_name(agent_name, shard) if shard else agent_name
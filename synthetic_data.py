@@ -0,0 +1,190 @@
+"""Synthetic program data at any scale.
+
+generate() produces the five tables with the same columns and value
+vocabularies as SampleData, from a handful of villages up to 10k villages
+and millions of students. Keys are consistent across tables: every
+student, teacher, training and community row names a generated village,
+and every incentive row a generated teacher. Village sizes are skewed
+(log-normal), so a few large villages hold many students and most hold
+few, as in real districts.
+
+    python synthetic_data.py --villages 10000 --students 1000000 --out /tmp/data
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ["Amit", "Neha", "Preeti", "Ravi", "Sunita", "Anjali", "Arjun", "Kavita", "Rahul", "Pooja",
+               "Suresh", "Meena", "Vikram", "Lakshmi", "Deepak", "Ananya", "Rohit", "Divya", "Manoj", "Priya"]
+LAST_NAMES = ["Sharma", "Gupta", "Singh", "Kumar", "Patel", "Verma", "Reddy", "Nair", "Patil", "Tiwari",
+              "Mehta", "Devi", "Yadav", "Joshi", "Das"]
+EDUCATION_LEVELS = ["High School", "Associate's", "Bachelor's", "Master's", "Ph.D."]
+EDUCATION_WEIGHTS = [0.35, 0.2, 0.3, 0.12, 0.03]
+SUBJECTS = ["Math", "Science", "English", "Hindi", "Social Studies", "Biology", "Chemistry", "Physics",
+            "Geography", "History", "Computer Science", "Agriculture", "Art", "Music", "Math,Science",
+            "English,Hindi", "Biology,Chemistry"]
+VILLAGE_NEEDS = ["Primary Education", "Secondary Education", "Girls' Education", "Digital Skills",
+                 "Adult Literacy", "Vocational Training", "Child Development", "Environmental Conservation",
+                 "Health Awareness", "Disability Support"]
+MODULES = ["Basic Pedagogy", "Classroom Management", "Assessment Techniques", "Inclusive Education",
+           "Digital Literacy", "Child Development", "Adult Literacy", "Art Integration", "Career Guidance",
+           "Agriculture Basics", "Science Experiments", "Storytelling"]
+MATERIALS = ["Projector", "Textbooks", "Activity Kits", "Art Supplies", "Assessment Tools", "Computers",
+             "Charts", "Science Kits", "Storybooks", "Community Handbook"]
+STATUSES = ["Completed", "Ongoing", "Planned"]
+INCENTIVES = {
+    "Farming Tools": "Seeds, Fertilizer, Farming Tools",
+    "Ration Kits": "Rice, Lentils, Rations",
+    "Scholarship": "Scholarship, Books, Stationery",
+    "Books": "Books, Magazines, Encyclopedias",
+    "School Supplies": "Notebooks, Pens, School Bags",
+    "Bicycles": "Bicycles, Bus Passes, Fuel Allowance",
+    "Solar Lamps": "Solar Lamps, Batteries, Chargers",
+    "Sports Gear": "Balls, Sports Gear, Uniforms",
+    "Health Kits": "First Aid Kits, Medicines, Hygiene Kits",
+    "Career Books": "Career Books, Exam Guides, Mentoring"
+}
+OCCUPATIONS = ["Farming", "Agriculture", "Dairy", "Fishing", "Handicrafts", "Weaving", "Forestry",
+               "Construction", "Beekeeping", "Trade"]
+
+TABLES = ["teacher_data", "training_data", "incentives_data", "community_data", "student_data"]
+
+
+def _ids(prefix, count, start=0, width=3):
+    width = max(width, len(str(start + count)))
+    return [f"{prefix}{i:0{width}d}" for i in range(start + 1, start + count + 1)]
+
+
+def _names(rng, count):
+    first = rng.choice(FIRST_NAMES, count)
+    last = rng.choice(LAST_NAMES, count)
+    return pd.Series(first, dtype="string").str.cat(pd.Series(last, dtype="string"), sep=" ")
+
+
+def _dates(rng, count, start, days):
+    return (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, count), unit="D")).strftime("%Y-%m-%d")
+
+
+def village_sizes(villages, students, skew=1.0, rng=None):
+    """Students per village: log-normal weights, at least one student each.
+
+    With fewer students than villages a random subset of villages gets one
+    student each and the rest none, so the sizes always add up to students.
+    """
+    if students < 0:
+        raise ValueError(f"students must not be negative, got {students}")
+    rng = rng or np.random.default_rng(0)
+    if students < villages:
+        sizes = np.zeros(villages, dtype=int)
+        sizes[rng.choice(villages, students, replace=False)] = 1
+        return sizes
+    weights = rng.lognormal(0.0, skew, villages)
+    return rng.multinomial(students - villages, weights / weights.sum()) + 1
+
+
+def generate(villages=10, students=None, students_per_teacher=30, trainings_per_village=2, skew=1.0, seed=0):
+    """The five program tables for a synthetic district.
+
+    students defaults to 100 per village. Teachers follow students (one per
+    students_per_teacher, at least one per village), each teacher has one
+    incentive row, and each village one community row.
+    """
+    rng = np.random.default_rng(seed)
+    students = villages * 100 if students is None else students
+    village_ids = np.array(_ids("V", villages))
+    sizes = village_sizes(villages, students, skew, rng)
+
+    student_villages = np.repeat(village_ids, sizes)
+    student_count = len(student_villages)
+    ability = rng.normal(0, 8, student_count)
+    student_data = pd.DataFrame({
+        "student_id": _ids("S", student_count),
+        "name": _names(rng, student_count),
+        "village_id": student_villages,
+        "attendance_percent": np.clip(rng.normal(82, 9, student_count), 30, 100).round().astype(int),
+        "math_score": np.clip(72 + ability + rng.normal(0, 7, student_count), 0, 100).round().astype(int),
+        "english_score": np.clip(74 + ability + rng.normal(0, 7, student_count), 0, 100).round().astype(int),
+        "science_score": np.clip(73 + ability + rng.normal(0, 7, student_count), 0, 100).round().astype(int)
+    })
+
+    teachers_per_village = np.maximum(1, np.ceil(sizes / students_per_teacher)).astype(int)
+    teacher_count = int(teachers_per_village.sum())
+    teacher_ids = _ids("T", teacher_count)
+    teacher_data = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "name": _names(rng, teacher_count),
+        "age": rng.integers(19, 45, teacher_count),
+        "education_level": rng.choice(EDUCATION_LEVELS, teacher_count, p=EDUCATION_WEIGHTS),
+        "subjects": rng.choice(SUBJECTS, teacher_count),
+        "village_id": np.repeat(village_ids, teachers_per_village),
+        "village_needs": rng.choice(VILLAGE_NEEDS, teacher_count),
+        "suitability_score": rng.uniform(0.6, 0.99, teacher_count).round(2)
+    })
+
+    preferred = rng.choice(list(INCENTIVES), teacher_count)
+    allocated = np.where(rng.random(teacher_count) < 0.6, preferred, rng.choice(list(INCENTIVES), teacher_count))
+    incentives_data = pd.DataFrame({
+        "teacher_id": teacher_ids,
+        "preferred_incentive": preferred,
+        "available_resources": pd.Series(preferred).map(INCENTIVES).to_numpy(),
+        "allocated_incentive": allocated
+    })
+
+    training_count = villages * trainings_per_village
+    training_data = pd.DataFrame({
+        "training_id": _ids("TR", training_count),
+        "module_name": rng.choice(MODULES, training_count),
+        "duration_days": rng.integers(1, 6, training_count),
+        "materials_required": rng.choice(MATERIALS, training_count),
+        "schedule_date": _dates(rng, training_count, "2024-03-01", 180),
+        "village_id": np.repeat(village_ids, trainings_per_village),
+        "status": rng.choice(STATUSES, training_count, p=[0.4, 0.2, 0.4])
+    })
+
+    community_data = pd.DataFrame({
+        "village_id": village_ids,
+        "population": (sizes * rng.uniform(5, 9, villages)).round().astype(int) + 200,
+        "students_count": sizes,
+        "main_occupation": rng.choice(OCCUPATIONS, villages),
+        "community_leader": _names(rng, villages),
+        "contact_number": [f"+91 9{number:04d} {rest:05d}" for number, rest in
+                           zip(rng.integers(0, 10_000, villages), rng.integers(0, 100_000, villages))],
+        "last_meeting_date": _dates(rng, villages, "2024-01-01", 90)
+    })
+
+    return {
+        "teacher_data": teacher_data,
+        "training_data": training_data,
+        "incentives_data": incentives_data,
+        "community_data": community_data,
+        "student_data": student_data
+    }
+
+
+def write(data_frames, data_dir):
+    """Write the tables as <table>.csv files in data_dir."""
+    os.makedirs(data_dir, exist_ok=True)
+    for table, df in data_frames.items():
+        df.to_csv(os.path.join(data_dir, f"{table}.csv"), index=False)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic program data")
+    parser.add_argument("--villages", type=int, default=100)
+    parser.add_argument("--students", type=int, help="total students (default: 100 per village)")
+    parser.add_argument("--skew", type=float, default=1.0, help="spread of village sizes (log-normal sigma)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="directory to write the CSV files to")
+    args = parser.parse_args(argv)
+
+    data_frames = generate(args.villages, args.students, skew=args.skew, seed=args.seed)
+    write(data_frames, args.out)
+    for table, df in data_frames.items():
+        print(f"{table:16} {len(df):>10,} rows")
+
+
+if __name__ == "__main__":
+    main()
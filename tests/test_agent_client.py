@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+pytest.importorskip("requests")
+
+from agent_client import AgentClient, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.12)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.12)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+@pytest.fixture
+def server():
+    """Local endpoint answering with the queued (status, headers) replies, then 200."""
+    replies, hits = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            hits.append(time.monotonic())
+            status, headers = replies.pop(0) if replies else (200, {})
+            body = json.dumps({"status": status}).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.replies, httpd.hits = replies, hits
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+
+
+def test_retry_after_is_honoured(server):
+    server.replies.append((429, {"Retry-After": "1"}))
+    client = AgentClient(base_url=server.url, api_key="test", backoff=0.0, max_backoff=5.0)
+    try:
+        assert client.run_agent("a1", "hello") == {"status": 200}
+    finally:
+        client.close()
+    assert len(server.hits) == 2
+    assert server.hits[1] - server.hits[0] >= 0.9
+
+
+def test_retry_after_is_capped_by_max_backoff(server):
+    server.replies.append((503, {"Retry-After": "120"}))
+    client = AgentClient(base_url=server.url, api_key="test", max_backoff=0.2)
+    started = time.monotonic()
+    try:
+        client.run_agent("a1", "hello")
+    finally:
+        client.close()
+    assert time.monotonic() - started < 2.0
+
+
+def test_repeated_upstream_failures_open_the_circuit_per_agent(server):
+    server.replies.extend([(502, {})] * 4)
+    client = AgentClient(base_url=server.url, api_key="test", retries=1, backoff=0.0, failure_threshold=2)
+    try:
+        for _ in range(2):
+            with pytest.raises(Exception) as raised:
+                client.run_agent("a1", "hello")
+            assert not isinstance(raised.value, CircuitOpenError)
+        with pytest.raises(CircuitOpenError):
+            client.run_agent("a1", "hello")
+        # Other agents are unaffected, and client errors do not count
+        assert client.run_agent("a2", "hello") == {"status": 200}
+        server.replies.extend([(400, {})] * 3)
+        for _ in range(3):
+            with pytest.raises(Exception):
+                client.run_agent("a2", "hello")
+        assert client.breaker("a2").state == "closed"
+    finally:
+        client.close()
+    assert len(server.hits) == 4 + 1 + 3
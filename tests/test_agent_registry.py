@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent_registry import AgentRegistry, is_not_found  # noqa: E402
+
+
+class NotFound(Exception):
+    status_code = 404
+
+
+class StubAgent:
+    def __init__(self, agent_id, status="onboarded"):
+        self.id = agent_id
+        self.status = status
+        self.deployed = 0
+
+    def deploy(self):
+        self.deployed += 1
+        self.status = "onboarded"
+
+
+class StubFactory:
+    """Stands in for AgentFactory: get() raises for unknown ids or the given error."""
+
+    def __init__(self, agents=None, error=None):
+        self.agents = dict(agents or {})
+        self.error = error
+        self.created = []
+
+    def get(self, agent_id):
+        if self.error is not None:
+            raise self.error
+        if agent_id not in self.agents:
+            raise NotFound(f"Agent {agent_id} not found")
+        return self.agents[agent_id]
+
+    def create(self, name, description, llm_id, **extra):
+        agent = StubAgent(f"new-{len(self.created)}", status="draft")
+        self.created.append((name, extra))
+        self.agents[agent.id] = agent
+        return agent
+
+
+class StubRegistry(AgentRegistry):
+    def __init__(self, factory, *args, **kwargs):
+        self.factory = factory
+        super().__init__(*args, **kwargs)
+
+    def _factory(self, agent_name):
+        return self.factory
+
+
+def test_known_agents_are_fetched_once():
+    agent = StubAgent("a1")
+    registry = StubRegistry(StubFactory({"a1": agent}), {"progress_monitoring": "a1"}, registry_path=None)
+    threads = [threading.Thread(target=registry.get, args=("progress_monitoring",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.get("progress_monitoring") is agent
+    assert registry.factory_calls == 1
+    assert agent.deployed == 0
+
+
+def test_missing_agents_are_created_deployed_and_saved(tmp_path):
+    path = str(tmp_path / "registry.json")
+    factory = StubFactory()
+    registry = StubRegistry(factory, {"progress_monitoring": "gone"}, registry_path=path)
+    agent = registry.get("progress_monitoring")
+    assert agent.deployed == 1
+    assert [name for name, _ in factory.created] == ["Progress Monitoring Agent"]
+    with open(path) as f:
+        assert json.load(f) == {"progress_monitoring": agent.id}
+    # A later process reuses the saved id instead of creating another agent
+    later = StubRegistry(factory, {"progress_monitoring": "gone"}, registry_path=path)
+    assert later.get("progress_monitoring") is agent
+    assert len(factory.created) == 1
+
+
+def test_fetch_errors_other_than_not_found_are_raised():
+    factory = StubFactory(error=ConnectionError("connection reset"))
+    registry = StubRegistry(factory, {"progress_monitoring": "a1"}, registry_path=None)
+    with pytest.raises(ConnectionError):
+        registry.get("progress_monitoring")
+    assert factory.created == []
+
+
+def test_draft_agents_are_deployed_and_shards_copy_their_spec():
+    draft = StubAgent("a1", status="draft")
+    factory = StubFactory({"a1": draft})
+    registry = StubRegistry(factory, {"progress_monitoring": "a1"}, registry_path=None)
+    assert registry.get("progress_monitoring").deployed == 1
+    registry.get("progress_monitoring@north")
+    assert factory.created[-1][0] == "Progress Monitoring Agent (north)"
+    with pytest.raises(KeyError):
+        registry.get("weather")
+
+
+def test_is_not_found():
+    assert is_not_found(NotFound())
+    assert not is_not_found(ConnectionError("timed out"))
+    assert is_not_found(Exception("Agent does not exist"))
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_query import call_handler  # noqa: E402
+
+
+def test_session_id_only_reaches_handlers_that_take_it():
+    calls = []
+
+    async def rest_like(query, action_type, village_id=None, teacher_id=None):
+        calls.append("rest")
+        return {"data": {"output": query}}
+
+    def coordinator_like(query, action_type, village_id=None, teacher_id=None, session_id=None):
+        calls.append(session_id)
+        return {"data": {"output": query}}
+
+    record = {"query": "And in V002?", "action_type": "progress", "session_id": "s1"}
+    assert asyncio.run(call_handler(rest_like, record)) == {"data": {"output": "And in V002?"}}
+    asyncio.run(call_handler(coordinator_like, record))
+    assert calls == ["rest", "s1"]
+
+
+def test_sessions_import_without_pandas():
+    probe = "import sys, sessions; print(sorted({'pandas', 'numpy'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from coordinator_service import CoordinatorService  # noqa: E402
+
+
+async def echo_handler(query, action_type, village_id=None, teacher_id=None):
+    return {"data": {"output": f"{action_type}: {query}"}}
+
+
+async def read_response(reader):
+    status_line, *lines = (await reader.readuntil(b"\r\n\r\n")).decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines if line)
+    return int(status_line.split()[1]), json.loads(await reader.readexactly(int(headers["Content-Length"])))
+
+
+def test_stop_closes_idle_keep_alive_connections():
+    async def run():
+        service = CoordinatorService(echo_handler, workers=2, shutdown_timeout=30.0)
+        port = await service.start(port=0)
+        # One client that has made a request and keeps the connection open,
+        # and one that connected but never sent anything
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"query": "How is V001 doing?"}).encode()
+        writer.write(b"POST /actions/progress HTTP/1.1\r\nHost: test\r\nConnection: keep-alive\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        status, response = await read_response(reader)
+        assert status == 200
+        assert response["response"]["data"]["output"] == "progress: How is V001 doing?"
+        _, silent = await asyncio.open_connection("127.0.0.1", port)
+        await asyncio.sleep(0.1)
+
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(service.stop(), 5.0)
+        # Idle connections are closed at once rather than waited on
+        assert asyncio.get_running_loop().time() - started < 0.5
+        assert not service._connections
+        assert await reader.read() == b""
+        writer.close()
+        silent.close()
+
+    asyncio.run(run())
+
+
+def test_batch_of_non_objects_is_a_bad_request():
+    async def run():
+        service = CoordinatorService(echo_handler, workers=2)
+        port = await service.start(port=0)
+        try:
+            for body in (b"[1]", b'["How is V001 doing?"]', b'"q"\n'):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /batch HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                status, response = await read_response(reader)
+                assert status == 400
+                assert "JSON object" in response["error"]
+                writer.close()
+        finally:
+            await service.stop()
+
+    asyncio.run(run())
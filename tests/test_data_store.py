@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+pd = pytest.importorskip("pandas")
+
+from data_store import DataStore  # noqa: E402
+
+
+def community(*rows):
+    return pd.DataFrame(rows, columns=["village_id", "population"])
+
+
+def test_upserts_survive_a_restart(tmp_path):
+    path = str(tmp_path / "store")
+    # A large snapshot keeps the first upsert in the log rather than compacting it
+    base = community(*[(f"V{i:03d}", 100 + i) for i in range(1, 21)])
+    store = DataStore({"community_data": base}, path=path)
+    assert store.upsert("community_data", community(("V001", 999), ("V021", 50))) == 1
+
+    reopened = DataStore(path=path)
+    frame = reopened.snapshot("community_data").set_index("village_id")
+    assert len(frame) == 21
+    assert frame.loc["V001", "population"] == 999
+    assert frame.loc["V021", "population"] == 50
+    assert frame.loc["V002", "population"] == 102
@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fanout import DOMAINS, FanOut  # noqa: E402
+
+
+class Status:
+    value = "FAILED"
+
+
+class FailedResponse:
+    """Shape of a failed SDK AgentResponse."""
+    status = Status()
+    error_message = "model overloaded"
+    data = None
+
+
+def test_failed_sdk_response_is_reported_as_failed():
+    def ask(domain, prompt, **context):
+        return FailedResponse() if domain == "progress" else {"data": {"output": domain}}
+
+    fan_out = FanOut(ask, lambda prompt: "merged", deadline=5.0)
+    try:
+        result = fan_out.run("Plan the next term")
+    finally:
+        fan_out.close()
+    assert result["specialists"]["progress"] == {"status": "failed", "error": "model overloaded"}
+    assert result["specialists"]["recruitment"]["status"] == "ok"
+
+
+def test_deadline_counts_from_when_a_call_starts():
+    # Two requests share a pool of five threads: the second one's calls wait
+    # for the first one's, but still get their full deadline once running
+    def ask(domain, prompt, **context):
+        time.sleep(0.3)
+        return {"data": {"output": domain}}
+
+    fan_out = FanOut(ask, lambda prompt: "merged", deadline=0.5, max_workers=len(DOMAINS), queue_timeout=1.0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fan_out.run("Plan the next term"))) for _ in range(2)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        fan_out.close()
+    assert all(status["status"] == "ok" for result in results for status in result["specialists"].values())
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from intent_router import EXAMPLES, TEAM_ACTION, IntentRouter, content_terms  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter()
+
+
+def test_training_examples_route_to_their_label(router):
+    for query, label in EXAMPLES:
+        assert router.classify(query)["action"] == label, query
+
+
+@pytest.mark.parametrize("query, action", [
+    ("Is T004 eligible for a scholarship?", "incentives"),
+    ("Which village shows the most improvement?", "progress"),
+    ("How do I talk to parents about girls education?", "community"),
+    ("Find qualified teachers for V003", "recruitment"),
+])
+def test_single_domain_queries_go_to_the_specialist(router, query, action):
+    decision = router.classify(query)
+    assert (decision["action"], decision["reason"]) == (action, "confident")
+    assert decision["confidence"] >= router.threshold
+
+
+@pytest.mark.parametrize("query", [
+    "What is the weather in V001",
+    "Who won the cricket match yesterday?",
+    "Tell me a joke",
+])
+def test_out_of_domain_queries_go_to_the_team(router, query):
+    assert router.classify(query)["action"] == TEAM_ACTION
+
+
+def test_ids_and_function_words_are_not_evidence(router):
+    assert content_terms("What is the weather in V001") == ["weather"]
+    assert router.coverage("What is the weather in V001") == 0.0
+    assert router.classify("What is the weather in V001")["reason"] == "unknown_terms"
+
+
+def test_multi_domain_and_ambiguous_queries_go_to_the_team(router):
+    assert router.classify("Give me a roadmap for the schools")["reason"] == "multi_domain_cue"
+    decision = router.classify("Recruit candidates, run a training workshop and allocate rewards")
+    assert (decision["action"], decision["reason"]) == (TEAM_ACTION, "multi_domain_keywords")
+    strict = IntentRouter(threshold=0.99)
+    assert strict.classify("Is T004 eligible for a scholarship?")["reason"] == "low_confidence"
+
+
+def test_only_full_cycle_queries_are_rerouted(router):
+    assert router.route("Is T004 eligible for a scholarship?", "progress") == "progress"
+    before = router.stats()["routed"]
+    assert router.route("Is T004 eligible for a scholarship?") == "incentives"
+    assert router.route("What is the weather in V001") == TEAM_ACTION
+    stats = router.stats()
+    assert stats["routed"] == before + 2
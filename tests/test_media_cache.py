@@ -0,0 +1,79 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from media_cache import SPEECH_MODEL_ID, TRANSLATION_MODEL_ID, MediaCache  # noqa: E402
+
+
+class StubModels:
+    """Local stand-in for the translation and speech models."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, model_id, payload):
+        self.calls.append((model_id, payload))
+        if model_id == TRANSLATION_MODEL_ID:
+            return "\n".join(f"[{payload['targetlanguage']}] {line}" for line in payload["data"].split("\n"))
+        return f"audio:{payload.get('voice')}:{payload['data']}".encode()
+
+
+def test_localize_translates_once_per_language(tmp_path):
+    models = StubModels()
+    cache = MediaCache(str(tmp_path), run_model=models)
+    languages = {f"V{i:03d}": "hi" for i in range(50)}
+    languages.update({"V100": "ta", "V101": "en"})
+    by_village = cache.localize("Meeting on Friday", languages)
+    assert by_village["V001"] == "[hi] Meeting on Friday"
+    assert by_village["V100"] == "[ta] Meeting on Friday"
+    assert by_village["V101"] == "Meeting on Friday"
+    assert cache.model_calls == 2
+    # A second run is served from the cache
+    assert cache.localize("Meeting on Friday", languages) == by_village
+    assert cache.model_calls == 2
+    cache.close()
+
+
+def test_short_texts_are_batched_and_split_back(tmp_path):
+    models = StubModels()
+    cache = MediaCache(str(tmp_path), run_model=models)
+    texts = ["Lesson one", "Lesson two", "Lesson one", "Lesson three"]
+    assert cache.translate(texts, "hi") == ["[hi] Lesson one", "[hi] Lesson two", "[hi] Lesson one",
+                                            "[hi] Lesson three"]
+    assert len(models.calls) == 1
+    assert models.calls[0][1]["data"] == "Lesson one\nLesson two\nLesson three"
+    # Only the new text is sent
+    assert cache.translate(["Lesson two", "Lesson four"], "hi") == ["[hi] Lesson two", "[hi] Lesson four"]
+    assert models.calls[-1][1]["data"] == "Lesson four"
+    assert cache.model_calls == 2
+    cache.close()
+
+
+def test_speech_is_synthesized_once(tmp_path):
+    models = StubModels()
+    cache = MediaCache(str(tmp_path), run_model=models)
+    path = cache.synthesize("Namaste", voice="hi")
+    assert cache.synthesize("Namaste", voice="hi") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"audio:hi:Namaste"
+    assert [model_id for model_id, _ in models.calls] == [SPEECH_MODEL_ID]
+    # A deleted audio file is synthesized again
+    os.remove(path)
+    assert cache.synthesize("Namaste", voice="hi") == path
+    assert os.path.exists(path)
+    assert cache.model_calls == 2
+    cache.close()
+
+
+def test_eviction_keeps_the_entry_just_stored(tmp_path):
+    models = StubModels()
+    cache = MediaCache(str(tmp_path), max_bytes=20, run_model=models)
+    first = cache.synthesize("First notice for the village", voice="hi")
+    second = cache.synthesize("Second notice for the village", voice="hi")
+    # Each file is over max_bytes alone; the older one goes, the new one stays
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    assert cache.stats()["entries"] == {"speech": 1}
+    cache.close()
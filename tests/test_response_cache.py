@@ -0,0 +1,69 @@
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import response_cache  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for the cache's TTL and LRU timestamps."""
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(response_cache, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    cache.put("progress_monitoring", "How is V001?", "v1", {"data": "ok"})
+    clock.value += 59
+    assert cache.get("progress_monitoring", "How is V001?", "v1") == {"data": "ok"}
+    clock.value += 2
+    assert cache.get("progress_monitoring", "How is V001?", "v1") is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("agent", "first", "v1", 1)
+    clock.value += 1
+    cache.put("agent", "second", "v1", 2)
+    clock.value += 1
+    assert cache.get("agent", "first", "v1") == 1  # "second" is now the least recently used
+    clock.value += 1
+    cache.put("agent", "third", "v1", 3)
+    assert cache.get("agent", "second", "v1") is None
+    assert cache.get("agent", "first", "v1") == 1
+    assert cache.get("agent", "third", "v1") == 3
+    cache.close()
+
+
+def test_data_version_and_whitespace(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    cache.put("agent", "How is  V001?\n", "v1", "answer")
+    assert cache.get("agent", "How is V001?", "v1") == "answer"
+    assert cache.get("agent", "how is V001?", "v1") is None
+    assert cache.get("agent", "How is V001?", "v2") is None
+    cache.close()
+
+
+def test_failures_are_not_cached(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    calls = []
+
+    def run(prompt):
+        calls.append(prompt)
+        return {"status": "FAILED"} if len(calls) == 1 else {"status": "SUCCESS", "data": "ok"}
+
+    assert cache.cached("agent", "q", "v1", run)["status"] == "FAILED"
+    assert cache.cached("agent", "q", "v1", run)["status"] == "SUCCESS"
+    assert cache.cached("agent", "q", "v1", run)["status"] == "SUCCESS"
+    assert len(calls) == 2
+    cache.close()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from retrain_daemon import RetrainDaemon  # noqa: E402
+
+
+class QuietWatcher:
+    def changes(self, timeout):
+        time.sleep(timeout)
+        return set()
+
+    def close(self):
+        pass
+
+
+def test_failing_retrain_is_retried_once_per_retry_delay():
+    calls = []
+
+    def retrain(data_frames):
+        calls.append(time.monotonic())
+        raise RuntimeError("agent API unavailable")
+
+    daemon = RetrainDaemon(debounce=0.05, watcher=QuietWatcher(), retrain=retrain, retry_delay=0.5, status_path=None)
+    daemon.reload = lambda tables: None
+    daemon.load = lambda: None
+    daemon.start(initial_push=False)
+    try:
+        daemon.notify({"teacher_data"})
+        time.sleep(1.3)
+    finally:
+        daemon.stop(timeout=1.0)
+
+    # First push after the debounce, then one retry per retry_delay: 0.05s, ~0.55s, ~1.05s
+    assert 2 <= len(calls) <= 3
+    assert all(later - earlier >= 0.45 for earlier, later in zip(calls, calls[1:]))
+    assert daemon.status()["pending"] == ["teacher_data"]
+
+
+def test_stock_file_is_watched_like_a_table(tmp_path):
+    from retrain_daemon import STOCK_TABLE, PollingWatcher, table_of
+
+    assert table_of("incentive_stock.json") == STOCK_TABLE
+    assert table_of("teacher_data.csv") == "teacher_data"
+    assert table_of("incentive_stock.csv") is None and table_of("notes.json") is None
+
+    watcher = PollingWatcher(str(tmp_path), interval=0.0)
+    (tmp_path / "incentive_stock.json").write_text('{"Books": 2}')
+    assert watcher.changes(0.0) == {STOCK_TABLE}
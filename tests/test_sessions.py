@@ -0,0 +1,80 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sessions import MemorySessionStore, Session, SessionManager, SqliteSessionStore  # noqa: E402
+from tokens import estimate_tokens  # noqa: E402
+
+
+def test_history_is_compacted_under_max_tokens():
+    manager = SessionManager(max_tokens=200, summary_tokens=60, answer_tokens=50)
+    session = manager.open("s1", village_id="V001")
+    for i in range(20):
+        manager.record(session, f"Question {i} about V001?", f"Answer {i} is fine. " + "Details follow. " * 20)
+        assert estimate_tokens(manager.history(session)) <= 200
+    assert session.turns[-1][0] == "Question 19 about V001?"
+    assert len(session.turns) < 20
+    # Folded turns keep the question and the first sentence of the answer, newest last
+    assert session.summary.splitlines()[-1] == f"- Q: Question {19 - len(session.turns)} about V001? " \
+                                               f"A: Answer {19 - len(session.turns)} is fine."
+    assert estimate_tokens(session.summary) <= 60
+    assert manager.history(session).startswith("Summary of earlier questions:\n")
+
+
+def test_long_answers_are_cut_to_answer_tokens():
+    manager = SessionManager(answer_tokens=10)
+    session = manager.open("s1")
+    manager.record(session, "q", "x" * 1000)
+    assert session.turns[0][1] == "x" * 40 + " ..."
+
+
+def test_follow_ups_inherit_the_scope_and_another_village_starts_fresh():
+    manager = SessionManager()
+    session = manager.open("s1", village_id="V001")
+    manager.record(session, "How is attendance?", "Attendance is 90%.")
+
+    follow_up = manager.open("s1")
+    assert follow_up is session
+    assert follow_up.village_id == "V001"
+
+    other = manager.open("s1", village_id="V002")
+    assert other.village_id == "V002"
+    assert other.turns == [] and manager.history(other) == ""
+    # A teacher within the same village is a new scope too, but keeps the village
+    teacher = manager.open("s1", teacher_id="T004")
+    assert (teacher.village_id, teacher.teacher_id, teacher.turns) == ("V001", "T004", [])
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_sessions=2)
+    store.put(Session("a"))
+    store.put(Session("b"))
+    store.get("a")
+    store.put(Session("c"))
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_sqlite_store_round_trip_and_bound(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+    store = SqliteSessionStore(path, max_sessions=2)
+    manager = SessionManager(store)
+    session = manager.open("s1", village_id="V001", teacher_id="T004")
+    manager.record(session, "How is T004 doing?", "T004 is doing well.")
+    store.close()
+
+    store = SqliteSessionStore(path, max_sessions=2)
+    loaded = SessionManager(store).open("s1")
+    assert (loaded.village_id, loaded.teacher_id) == ("V001", "T004")
+    assert [tuple(turn) for turn in loaded.turns] == [("How is T004 doing?", "T004 is doing well.")]
+    assert loaded.updated == session.updated
+
+    store.put(Session("s2", updated=session.updated + 1))
+    store.put(Session("s3", updated=session.updated + 2))
+    assert store.get("s1") is None
+    assert store.get("s2") is not None and store.get("s3") is not None
+    store.close()
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tokens import CHARS_PER_TOKEN, estimate_tokens  # noqa: E402
+
+
+def test_estimate_rounds_up_to_whole_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+    assert estimate_tokens("a" * CHARS_PER_TOKEN) == 1
+    assert estimate_tokens("a" * (CHARS_PER_TOKEN + 1)) == 2
+
+
+def test_split_budget_passes_unused_share_on():
+    pytest.importorskip("pandas")
+    from rendering import split_budget
+
+    shares = split_budget({"small": 10, "medium": 60, "large": 500}, 300)
+    assert shares == {"small": 10, "medium": 60, "large": 230}
+    assert split_budget({"a": 500, "b": 500}, 301) == {"a": 150, "b": 151}
+    assert sum(split_budget({"a": 5, "b": 7}, 1000).values()) == 12
+
+
+def test_tables_are_cut_to_fit_the_budget():
+    pd = pytest.importorskip("pandas")
+    from rendering import ContextRenderer
+
+    frames = {
+        "villages": pd.DataFrame({"village_id": [f"V{i:03d}" for i in range(200)], "score": range(200)}),
+        "teachers": pd.DataFrame({"teacher_id": ["T1", "T2"]}),
+    }
+    renderer = ContextRenderer("csv")
+    rendered = renderer.render_tables(frames, ["villages", "teachers"], budget=150, agent="progress")
+    assert sum(estimate_tokens(text) for text in rendered.values()) <= 150
+    assert rendered["teachers"] == "teacher_id\nT1\nT2"
+    assert "of 200 rows, evenly sampled" in rendered["villages"]
+    report = {row["table"]: row for row in renderer.report}
+    assert report["teachers"]["rows"] == 2
+    assert 0 < report["villages"]["rows"] < 200
+    # The full, unbudgeted render is untouched
+    text, info = renderer.render(frames["villages"])
+    assert info["rows"] == 200 and info["tokens"] == estimate_tokens(text)
@@ -0,0 +1,13 @@
+"""Prompt token estimates.
+
+Standard library only, so sessions and metrics can count tokens without
+importing the table renderer (and pandas with it).
+"""
+
+# Rough size of a prompt token; exact counts depend on the model's tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Approximate number of prompt tokens in a text."""
+    return -(-len(text) // CHARS_PER_TOKEN)